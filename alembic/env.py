@@ -1,12 +1,13 @@
 from logging.config import fileConfig
 from pathlib import Path
 
-from sqlalchemy import engine_from_config
+from sqlalchemy import engine_from_config, event
 from sqlalchemy import pool
 
 from alembic import context
 
 from models import Base
+from core.compression import register_functions
 from core.db import DB_URL
 
 config = context.config
@@ -18,6 +19,14 @@ config.set_main_option("sqlalchemy.url", DB_URL)
 
 target_metadata = Base.metadata
 
+
+def include_name(name, type_, parent_names) -> bool:
+    """Keep autogenerate away from FTS5 indexes and their shadow tables (see 84c846cf879b)."""
+    if type_ == "table" and name and "_fts" in name:
+        return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -42,6 +51,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -60,10 +70,13 @@ def run_migrations_online() -> None:
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
     )
+    # The FTS triggers call jobb_text() (see fb2a7c58c52d).
+    event.listen(connectable, "connect", lambda dbapi_connection, _: register_functions(dbapi_connection))
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,62 @@
+"""add full text search
+
+Revision ID: 84c846cf879b
+Revises: 5f2b5c1f9077
+Create Date: 2026-10-17 02:31:08.412977
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '84c846cf879b'
+down_revision: Union[str, Sequence[str], None] = '5f2b5c1f9077'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# FTS5 index -> (content table, indexed columns). The indexes are external-content
+# tables: they store only the inverted index and read text back from the source rows.
+FTS_TABLES = {
+    'jobs_fts': ('jobs', ['title', 'company', 'description']),
+    'research_fts': ('research', ['summary']),
+    'documents_fts': ('documents', ['markdown_content']),
+}
+TOKENIZER = "unicode61 remove_diacritics 2"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for fts, (table, columns) in FTS_TABLES.items():
+        cols = ', '.join(columns)
+        new_values = ', '.join(f'new.{c}' for c in columns)
+        old_values = ', '.join(f'old.{c}' for c in columns)
+
+        op.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5("
+            f"{cols}, content='{table}', content_rowid='id', tokenize='{TOKENIZER}')"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END"
+        )
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for fts in FTS_TABLES:
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {fts}")
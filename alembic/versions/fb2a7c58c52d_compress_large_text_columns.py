@@ -0,0 +1,134 @@
+"""compress large text columns
+
+Revision ID: fb2a7c58c52d
+Revises: 7ffd408b0970
+Create Date: 2026-10-17 02:51:51.247623
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from core.compression import compress_text, decompress_text
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fb2a7c58c52d'
+down_revision: Union[str, Sequence[str], None] = '7ffd408b0970'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Columns that become CompressedText.
+COMPRESSED = {
+    'jobs': ['description'],
+    'research': ['summary', 'company_website', 'glassdoor', 'news', 'linkedin'],
+    'company_research': ['summary'],
+    'documents': ['markdown_content', 'cv_json'],
+}
+CHUNK_ROWS = 500
+
+# FTS5 index -> (content table, indexed columns), as created in 84c846cf879b. The indexes
+# are external-content tables that read text back from their content table, which can't
+# be a compressed column. They are re-pointed at views that decompress with jobb_text().
+FTS_TABLES = {
+    'jobs_fts': ('jobs', ['title', 'company', 'description']),
+    'research_fts': ('research', ['summary']),
+    'documents_fts': ('documents', ['markdown_content']),
+}
+TOKENIZER = "unicode61 remove_diacritics 2"
+
+
+def _text(table: str, column: str, prefix: str = '') -> str:
+    return f"jobb_text({prefix}{column})" if column in COMPRESSED[table] else f"{prefix}{column}"
+
+
+def _drop_fts() -> None:
+    for fts in FTS_TABLES:
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        op.execute(f"DROP TABLE IF EXISTS {fts}")
+        op.execute(f"DROP VIEW IF EXISTS {fts}_content")
+
+
+def _create_fts(decompress: bool) -> None:
+    for fts, (table, columns) in FTS_TABLES.items():
+        cols = ', '.join(columns)
+        if decompress:
+            content = f"{fts}_content"
+            op.execute(
+                f"CREATE VIEW {content} AS SELECT id, "
+                + ', '.join(f"{_text(table, c)} AS {c}" for c in columns)
+                + f" FROM {table}"
+            )
+            new_values = ', '.join(_text(table, c, 'new.') for c in columns)
+            old_values = ', '.join(_text(table, c, 'old.') for c in columns)
+        else:
+            content = table
+            new_values = ', '.join(f'new.{c}' for c in columns)
+            old_values = ', '.join(f'old.{c}' for c in columns)
+
+        op.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5("
+            f"{cols}, content='{content}', content_rowid='id', tokenize='{TOKENIZER}')"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END"
+        )
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def _convert(convert) -> None:
+    """
+    Rewrite every compressed column with convert(value), CHUNK_ROWS rows per write
+    transaction, so the app can keep using the database while this runs. Rows that are
+    already converted are left alone, so an interrupted run can simply be restarted.
+    """
+    conn = op.get_bind()
+    with op.get_context().autocommit_block():
+        for table, columns in COMPRESSED.items():
+            cols = ', '.join(columns)
+            assignments = ', '.join(f"{c} = ?" for c in columns)
+            last_id = 0
+            while True:
+                rows = conn.exec_driver_sql(
+                    f"SELECT id, {cols} FROM {table} WHERE id > ? ORDER BY id LIMIT ?", (last_id, CHUNK_ROWS)
+                ).fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1][0]
+                changed = []
+                for row_id, *values in rows:
+                    converted = [convert(v) for v in values]
+                    if converted != values:
+                        changed.append((*converted, row_id))
+                if changed:
+                    conn.exec_driver_sql("BEGIN IMMEDIATE")
+                    conn.exec_driver_sql(f"UPDATE {table} SET {assignments} WHERE id = ?", changed)
+                    conn.exec_driver_sql("COMMIT")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The indexes are rebuilt once at the end rather than updated row by row.
+    _drop_fts()
+    _convert(compress_text)
+    _create_fts(decompress=True)
+    # Freed pages are only returned to the filesystem by VACUUM: run 'jobb db maintain'.
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _drop_fts()
+    _convert(decompress_text)
+    _create_fts(decompress=False)
@@ -0,0 +1,281 @@
+"""
+Benchmarks for the database, template and PDF hot paths.
+
+For each size in --sizes a synthetic database is generated (benchmarks.synthetic; kept
+in --data-dir until the schema changes) and 'jobb job list' and 'jobb status list' are
+timed against it, first and last page, in a separate interpreter pointed at it with
+JOBB_DB. The CV and cover letter templates are rendered, _html_to_pdf is timed on HTML
+the render cache has never seen, and cold starts are measured as in benchmarks.startup.
+
+Results are written as JSON (default benchmarks/results/<commit>.json). With --baseline,
+every timing that got slower by more than --threshold, and by at least --min-delta-ms,
+is reported as a regression and the exit code is 1.
+
+    python -m benchmarks.run
+    python -m benchmarks.run --sizes 1000 --skip-pdf --baseline benchmarks/results/c54db97.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from benchmarks import startup, synthetic
+
+ROOT = Path(__file__).parent.parent
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+DEFAULT_DATA_DIR = Path(tempfile.gettempdir()) / "jobb-bench"
+
+PAGE = 100   # rows per page, as the list commands default to
+
+
+def timed(fn, runs: int, warmup: int = 1) -> dict:
+    """Call fn warmup + runs times; wall times in ms of the measured runs."""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "max_ms": max(timings),
+        "runs": runs,
+    }
+
+
+def _label(size: int) -> str:
+    return f"{size // 1000}k" if size % 1000 == 0 else str(size)
+
+
+def _db_worker(runs: int) -> None:
+    """Runs in a child process with JOBB_DB set: time the list commands, print JSON."""
+    from cli.main import app
+    from core.db import DB_PATH
+
+    with sqlite3.connect(DB_PATH) as conn:
+        last_job = conn.execute("SELECT max(id) FROM jobs").fetchone()[0] or 0
+        last_application = conn.execute("SELECT max(id) FROM applications").fetchone()[0] or 0
+
+    commands = {
+        "job list": ["job", "list"],
+        "job list, last page": ["job", "list", "--after", str(max(last_job - PAGE, 0))],
+        "status list": ["status", "list"],
+        "status list, last page": ["status", "list", "--after", str(max(last_application - PAGE, 0))],
+    }
+
+    def invoke(args: list[str]) -> None:
+        with contextlib.redirect_stdout(io.StringIO()):
+            app(args, prog_name="jobb", standalone_mode=False)
+
+    results = {name: timed(lambda args=args: invoke(args), runs) for name, args in commands.items()}
+    print("\n" + json.dumps(results))
+
+
+def bench_database(sizes: list[int], data_dir: Path, runs: int) -> dict:
+    results = {}
+    for size in sizes:
+        db = data_dir / f"synthetic-{size}.sqlite"
+        if not synthetic.is_current(db):
+            start = time.perf_counter()
+            synthetic.generate(db, size)
+            print(f"  generated {db} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", "--db-worker", "--runs", str(runs)],
+            cwd=ROOT, capture_output=True, text=True, check=True, env={**os.environ, "JOBB_DB": str(db)},
+        ).stdout
+        for name, stats in json.loads(out.strip().splitlines()[-1]).items():
+            results[f"db/{_label(size)}/{name}"] = stats
+    return results
+
+
+def _sample_cv():
+    from services.generation import CVContent
+
+    return CVContent(
+        name="Kari Nordmann", email="kari@example.com", phone="+47 900 00 000", location="Oslo",
+        linkedin_url="https://linkedin.com/in/kari", github_url="https://github.com/kari", language="NO",
+        summary="Backend-utvikler med ti års erfaring fra skytjenester, dataplattformer og team-ledelse. " * 3,
+        experiences=[
+            {
+                "company": f"Selskap {i}", "title": "Senior utvikler", "period": f"{2012 + 3 * i} – {2015 + 3 * i}",
+                "bullets": [f"Ledet overgangen til Kubernetes for {k + 3} produktteam og halverte driftskostnadene." for k in range(4)],
+            }
+            for i in range(5)
+        ],
+        educations=[{"institution": "NTNU", "degree": "Master", "field": "Datateknologi", "period": "2007 – 2012"}],
+        skills=[{"category": c, "names": ["Python", "Go", "Kubernetes", "PostgreSQL", "Kafka", "Terraform"]}
+                for c in ("Språk", "Plattform", "Data")],
+        interests="Fjellturer, orientering og open source.",
+    )
+
+
+def bench_templates(data_dir: Path, runs: int) -> dict:
+    import services.assets as assets
+    from services import pdf
+
+    assets.ASSET_DIR = data_dir / "assets"
+    cv = _sample_cv()
+    letter = "\n\n".join("Jeg søker stillingen fordi den passer min erfaring. " * 6 for _ in range(5))
+    cv_html = pdf._cv_html(cv)
+    return {
+        "templates/cv.html": timed(lambda: pdf._cv_html(cv), runs),
+        "templates/cover_letter.html": timed(
+            lambda: pdf._cover_letter_html(cv, letter, "Backend Developer", "Nord Data AS"), runs
+        ),
+        "templates/inline assets": timed(lambda: assets.inline_assets(cv_html), runs),
+    }
+
+
+def bench_pdf(data_dir: Path, runs: int) -> dict:
+    from playwright.async_api import Error as PlaywrightError
+
+    from services import pdf
+
+    pdf.RENDER_CACHE_DIR = data_dir / "pdf-cache"
+    out_dir = data_dir / "pdf"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    cv_html = pdf._cv_html(_sample_cv())
+    counter = iter(range(1_000_000))
+
+    def print_one() -> None:
+        # A new comment each time, so the render cache never has the PDF.
+        n = next(counter)
+        pdf._html_to_pdf(f"{cv_html}<!-- {time.time_ns()} {n} -->", out_dir / f"{n % 8}.pdf")
+
+    results = {}
+    start = time.perf_counter()
+    try:
+        print_one()
+    except PlaywrightError as e:
+        # Only a missing browser is a skip; any other failure is a broken benchmark.
+        if "Executable doesn't exist" not in str(e):
+            raise
+        results["pdf/_html_to_pdf"] = {"skipped": "Chromium is not installed (run 'playwright install chromium')"}
+        return results
+    results["pdf/first document (browser launch)"] = {
+        "median_ms": (time.perf_counter() - start) * 1000, "runs": 1,
+    }
+    results["pdf/_html_to_pdf"] = stats = timed(print_one, runs, warmup=0)
+    stats["docs_per_s"] = 1000 / stats["median_ms"]
+
+    documents = [(f"{cv_html}<!-- pool {time.time_ns()} {i} -->", out_dir / f"pool-{i}.pdf") for i in range(8)]
+    start = time.perf_counter()
+    outcomes = pdf.get_renderer().render_pool(documents, workers=4, force=True)
+    elapsed = (time.perf_counter() - start) * 1000
+    errors = [o for o in outcomes if isinstance(o, Exception)]
+    if errors:
+        raise errors[0]
+    results["pdf/render_pool 8 docs, 4 workers"] = {
+        "median_ms": elapsed, "runs": 1, "docs_per_s": len(documents) * 1000 / elapsed,
+    }
+    return results
+
+
+def bench_startup(largest_db: Path | None, runs: int) -> dict:
+    results = {}
+    commands = [(command, None) for command in startup.LIGHT_COMMANDS]
+    if largest_db is not None:
+        commands.append((["job", "list"], {"JOBB_DB": str(largest_db)}))
+    for command, env in commands:
+        median_ms, _ = startup.measure(command, runs, env)
+        results[f"startup/jobb {' '.join(command)}"] = {"median_ms": median_ms, "runs": runs}
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta_ms: float) -> list[tuple[str, float, float]]:
+    """Timings more than threshold (a fraction) and min_delta_ms slower than in baseline."""
+    regressions = []
+    for name, stats in results.items():
+        old = baseline.get(name, {}).get("median_ms")
+        new = stats.get("median_ms")
+        if old is None or new is None:
+            continue
+        if new > old * (1 + threshold) and new - old >= min_delta_ms:
+            regressions.append((name, old, new))
+    return regressions
+
+
+def _commit() -> str:
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return f"{sha}-dirty" if dirty else sha
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)), help="Synthetic database sizes, in jobs")
+    parser.add_argument("--runs", type=int, default=5, help="Measured runs per benchmark")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR, help="Where synthetic databases are kept")
+    parser.add_argument("--out", type=Path, help="Results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--baseline", type=Path, help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Slowdown that counts as a regression (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore slowdowns smaller than this")
+    parser.add_argument("--skip-pdf", action="store_true", help="Don't start Chromium")
+    parser.add_argument("--db-worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.db_worker:
+        _db_worker(args.runs)
+        return 0
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    results: dict = {}
+    results |= bench_database(sizes, args.data_dir, args.runs)
+    results |= bench_templates(args.data_dir, args.runs)
+    if not args.skip_pdf:
+        results |= bench_pdf(args.data_dir, args.runs)
+    largest = args.data_dir / f"synthetic-{max(sizes)}.sqlite" if sizes else None
+    results |= bench_startup(largest, args.runs)
+
+    for name, stats in results.items():
+        if "skipped" in stats:
+            print(f"{name:<48} skipped: {stats['skipped']}")
+        else:
+            rate = f"  {stats['docs_per_s']:.1f} docs/s" if "docs_per_s" in stats else ""
+            print(f"{name:<48} {stats['median_ms']:9.2f} ms{rate}")
+
+    commit = _commit()
+    out = args.out or RESULTS_DIR / f"{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({
+        "commit": commit,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": sizes,
+        "results": results,
+    }, indent=2) + "\n")
+    print(f"\nWrote {out}")
+
+    if args.baseline is None:
+        return 0
+    baseline = json.loads(args.baseline.read_text())
+    regressions = compare(results, baseline["results"], args.threshold, args.min_delta_ms)
+    for name, old, new in regressions:
+        print(f"REGRESSION {name}: {old:.2f} ms -> {new:.2f} ms (+{(new / old - 1):.0%})")
+    if not regressions:
+        print(f"No regressions against {baseline.get('commit', args.baseline)} (threshold {args.threshold:.0%}).")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
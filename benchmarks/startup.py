@@ -0,0 +1,81 @@
+"""
+Cold-start budget check for lightweight CLI commands.
+
+Runs each command in a fresh interpreter several times, takes the median wall time
+and fails (exit code 1) if it goes over the budget, or if any heavy dependency that
+only apply/research/render need was imported along the way.
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --budget-ms 600 --runs 7
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+LIGHT_COMMANDS = [
+    ["job", "list", "--help"],
+    ["status", "update", "--help"],
+    ["profile", "show", "--help"],
+]
+HEAVY_MODULES = ["anthropic", "playwright", "jinja2", "dotenv", "PIL", "numpy"]
+
+_PROBE = """
+import json, sys
+from cli.main import app
+try:
+    app(sys.argv[1:], prog_name="jobb", standalone_mode=False)
+except SystemExit:
+    pass
+heavy = {heavy!r}
+print("\\n" + json.dumps(sorted(m for m in heavy if m in sys.modules)))
+"""
+
+
+def measure(command: list[str], runs: int, env: dict[str, str] | None = None) -> tuple[float, list[str]]:
+    """
+    Median wall time in ms for a cold start of `jobb <command>`, and heavy modules it loaded.
+    env is added to the environment, e.g. JOBB_DB to run against another database.
+    """
+    timings = []
+    loaded: list[str] = []
+    probe = _PROBE.format(heavy=HEAVY_MODULES)
+    for _ in range(runs):
+        start = time.perf_counter()
+        out = subprocess.run(
+            [sys.executable, "-c", probe, *command],
+            cwd=ROOT, capture_output=True, text=True, check=True, env={**os.environ, **(env or {})},
+        ).stdout
+        timings.append((time.perf_counter() - start) * 1000)
+        loaded = json.loads(out.strip().splitlines()[-1])
+    return statistics.median(timings), loaded
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=700.0, help="Maximum median cold start per command")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts per command")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for command in LIGHT_COMMANDS:
+        median_ms, loaded = measure(command, args.runs)
+        problems = []
+        if median_ms > args.budget_ms:
+            problems.append(f"over budget ({args.budget_ms:.0f} ms)")
+        if loaded:
+            problems.append(f"imported {', '.join(loaded)}")
+        status = "FAIL " + "; ".join(problems) if problems else "ok"
+        print(f"jobb {' '.join(command):<28} {median_ms:7.1f} ms  {status}")
+        failed |= bool(problems)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+"""
+Synthetic databases for the benchmarks.
+
+Builds a database with the real schema (alembic upgrade head, so FTS indexes, triggers
+and compressed columns behave as in use) and fills it with generated jobs,
+applications, documents and research of realistic size. The same size and seed always
+give the same rows, with dates relative to today.
+
+    python -m benchmarks.synthetic --jobs 10000 --out /tmp/jobb-10k.sqlite
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, event, insert
+
+from core.compression import register_functions
+from models import Application, CompanyResearch, Document, Job, Research, company_key, job_dedupe_key
+
+ROOT = Path(__file__).parent.parent
+CHUNK_ROWS = 2_000
+
+# Share of jobs that have been applied for / researched, and how those applications stand.
+APPLIED = 0.4
+RESEARCHED = 0.5
+STATUS_WEIGHTS = {"draft": 40, "sent": 35, "interview": 10, "rejected": 12, "offer": 3}
+
+_WORDS = (
+    "vi søker en erfaren utvikler som vil jobbe med skybaserte løsninger i et tverrfaglig team "
+    "du får ansvar for arkitektur drift og videreutvikling av plattformen sammen med kunder "
+    "we are looking for an engineer who enjoys building reliable backend services and data "
+    "pipelines in python kotlin typescript and go on kubernetes aws azure and gcp with a strong "
+    "focus on security observability testing and continuous delivery across several product teams "
+    "erfaring med sql postgres kafka terraform docker react og moderne utviklingsprosesser er en fordel "
+    "the role includes mentoring code review incident handling and close collaboration with design "
+    "vi tilbyr fleksibel arbeidstid gode forsikringer pensjon hjemmekontor og et inkluderende miljø i oslo bergen trondheim"
+).split()
+_TITLES = [
+    "Backend Developer", "Senior Software Engineer", "Data Engineer", "Platform Engineer",
+    "Frontend Developer", "Fullstack Utvikler", "DevOps Engineer", "Systemutvikler",
+    "Machine Learning Engineer", "Tech Lead", "Site Reliability Engineer", "Løsningsarkitekt",
+]
+_COMPANY_PARTS = (
+    ["Nord", "Fjord", "Vest", "Aurora", "Polar", "Bryggen", "Kyst", "Solberg", "Viken", "Midgard"],
+    ["Data", "Tech", "Energi", "Finans", "Helse", "Logistikk", "Digital", "Systems", "Analytics", "Cloud"],
+    ["AS", "ASA", "Group", "AS", ""],
+)
+
+
+def _text(rnd: random.Random, words: int) -> str:
+    """Sentences of filler words, in paragraphs, about `words` long."""
+    sentences, n = [], 0
+    while n < words:
+        k = rnd.randint(8, 18)
+        sentence = " ".join(rnd.choices(_WORDS, k=k))
+        sentences.append(sentence[0].upper() + sentence[1:] + ".")
+        n += k
+    paragraphs = [" ".join(sentences[i:i + 5]) for i in range(0, len(sentences), 5)]
+    return "\n\n".join(paragraphs)
+
+
+def _companies(count: int) -> list[str]:
+    first, second, forms = _COMPANY_PARTS
+    names = []
+    for i in range(count):
+        base = f"{first[i % len(first)]} {second[i // len(first) % len(second)]}"
+        number = i // (len(first) * len(second))
+        names.append(f"{base}{f' {number}' if number else ''} {forms[i % len(forms)]}".strip())
+    return names
+
+
+def _slug(company: str) -> str:
+    return "".join(c if c.isalnum() else "-" for c in company.casefold()).strip("-")
+
+
+def _cv_json(rnd: random.Random, language: str) -> str:
+    return json.dumps({
+        "language": language,
+        "summary": _text(rnd, 60),
+        "experiences": [
+            {"company": f"Company {i}", "title": rnd.choice(_TITLES), "period": f"{2010 + 3 * i} – {2013 + 3 * i}",
+             "bullets": [_text(rnd, 16) for _ in range(3)]}
+            for i in range(4)
+        ],
+        "skills": [{"category": "Languages", "names": rnd.sample(_WORDS, 8)}],
+    }, ensure_ascii=False)
+
+
+def _insert(conn, table, rows: list[dict]) -> None:
+    for start in range(0, len(rows), CHUNK_ROWS):
+        conn.execute(insert(table), rows[start:start + CHUNK_ROWS])
+
+
+def schema_head() -> str:
+    return ScriptDirectory.from_config(Config(str(ROOT / "alembic.ini"))).get_current_head()
+
+
+def is_current(path: Path) -> bool:
+    """True if path is a generated database on the latest migration."""
+    if not path.exists():
+        return False
+    with sqlite3.connect(path) as conn:
+        try:
+            (version,) = conn.execute("SELECT version_num FROM alembic_version").fetchone()
+        except sqlite3.Error:
+            return False
+    return version == schema_head()
+
+
+def generate(path: Path, jobs: int, seed: int = 0) -> Path:
+    """Create (or replace) a synthetic database with `jobs` jobs at path."""
+    for suffix in ("", "-wal", "-shm"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=ROOT, env={**os.environ, "JOBB_DB": str(path)}, check=True, capture_output=True,
+    )
+
+    rnd = random.Random(seed)
+    today = date.today()
+    now = datetime.now().replace(microsecond=0)
+    companies = _companies(max(10, jobs // 8))
+
+    job_rows, app_rows, doc_rows, research_rows, company_rows = [], [], [], [], {}
+    for job_id in range(1, jobs + 1):
+        company = rnd.choice(companies)
+        title = rnd.choice(_TITLES)
+        language = "NO" if rnd.random() < 0.7 else "EN"
+        description = _text(rnd, rnd.randint(150, 450))
+        url = f"https://jobs.example.com/{_slug(company)}/{job_id}"
+        job_rows.append({
+            "id": job_id, "company": company, "title": title, "description": description, "url": url,
+            "deadline": today + timedelta(days=rnd.randint(-30, 60)) if rnd.random() < 0.8 else None,
+            "language": language, "notes": _text(rnd, 12) if rnd.random() < 0.1 else None,
+            "dedupe_key": job_dedupe_key(url, company, title, description),
+        })
+
+        if rnd.random() < APPLIED:
+            app_id = len(app_rows) + 1
+            updated = now - timedelta(days=rnd.randint(0, 120), minutes=rnd.randint(0, 1440))
+            app_rows.append({
+                "id": app_id, "job_id": job_id, "created_at": updated - timedelta(days=rnd.randint(0, 14)),
+                "updated_at": updated, "status": rnd.choices(list(STATUS_WEIGHTS), list(STATUS_WEIGHTS.values()))[0],
+            })
+            out = f"data/output/{_slug(company)}_{job_id}_{updated:%Y%m%d_%H%M%S}"
+            doc_rows.append({
+                "application_id": app_id, "type": "cv", "language": language, "markdown_content": _text(rnd, 80),
+                "cv_json": _cv_json(rnd, language), "pdf_path": f"{out}/cv.pdf", "created_at": updated,
+            })
+            doc_rows.append({
+                "application_id": app_id, "type": "cover_letter", "language": language,
+                "markdown_content": _text(rnd, 320), "cv_json": None, "pdf_path": f"{out}/cover_letter.pdf",
+                "created_at": updated,
+            })
+
+        if rnd.random() < RESEARCHED:
+            key = company_key(company)
+            if key not in company_rows:
+                company_rows[key] = {
+                    "id": len(company_rows) + 1, "company_key": key, "company": company,
+                    "summary": _text(rnd, 250), "researched_at": now,
+                }
+            company_id = company_rows[key]["id"]
+            research_rows.append({
+                "job_id": job_id, "company_research_id": company_id, "scraped_at": now,
+                "company_website": _text(rnd, 500), "glassdoor": _text(rnd, 180), "news": _text(rnd, 180),
+                "linkedin": _text(rnd, 90), "role_notes": _text(rnd, 80), "summary": _text(rnd, 220),
+            })
+
+    engine = create_engine(f"sqlite:///{path}")
+    event.listen(engine, "connect", lambda dbapi_connection, _: register_functions(dbapi_connection))
+    with engine.begin() as conn:
+        conn.exec_driver_sql("PRAGMA synchronous=OFF")
+        _insert(conn, Job.__table__, job_rows)
+        _insert(conn, Application.__table__, app_rows)
+        _insert(conn, Document.__table__, doc_rows)
+        _insert(conn, CompanyResearch.__table__, list(company_rows.values()))
+        _insert(conn, Research.__table__, research_rows)
+    with engine.connect() as conn:
+        conn.exec_driver_sql("ANALYZE")
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    engine.dispose()
+    return path
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=10_000, help="Number of jobs to generate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, required=True, help="Database file to write (replaced if it exists)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    generate(args.out, args.jobs, args.seed)
+    size = args.out.stat().st_size / 1024 / 1024
+    print(f"{args.out}: {args.jobs} jobs, {size:.1f} MB in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,24 @@
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from pathlib import Path
+
 import typer
 from rich import print as rprint
-from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn
+from rich.table import Table
 
+from cli.profiling import profiled
+from cli.streaming import StreamView
 from core.db import get_session
 from models import Job, Profile, Application, Document, Research
-from services.generation import generate_application
-from services.pdf import render_cv, render_cover_letter
+from services.batches import submit_cv_batch
+from services.generation import (
+    generate_application, generate_cover_letter, GeneratedApplication, add_usage, get_client, profile_selection,
+)
+from services.pdf import render_application, render_cover_letter
+from services.scheduler import BACKGROUND, set_priority
+from services.tracing import span
 
 def _safe_dirname(company: str, title: str, job_id: int) -> str:
     raw = f"{company}_{title}_{job_id}"
@@ -16,74 +27,353 @@ def _safe_dirname(company: str, title: str, job_id: int) -> str:
     return f"{base}_{timestamp}"
 
 
+def _save_documents(session, job: Job, result: GeneratedApplication, cv_pdf, cl_pdf) -> None:
+    """Store the generated documents. cv_pdf is None when only the cover letter was redone."""
+    application = session.query(Application).filter_by(job_id=job.id).first()
+    if not application:
+        application = Application(job_id=job.id, status="draft")
+        session.add(application)
+        session.flush()
+
+    if cv_pdf is not None:
+        session.add(Document(
+            application_id=application.id,
+            type="cv",
+            language=job.language,
+            markdown_content=result.cv.summary,
+            cv_json=result.cv_json,
+            pdf_path=str(cv_pdf),
+        ))
+    session.add(Document(
+        application_id=application.id,
+        type="cover_letter",
+        language=job.language,
+        markdown_content=result.cover_letter,
+        pdf_path=str(cl_pdf),
+    ))
+    session.commit()
+
+
+def _usage_line(usage: dict[str, int]) -> str:
+    if not usage or not any(usage.values()):
+        return "Tokens: all responses served from the local cache"
+    return (
+        f"Tokens: {usage['input_tokens']} input, "
+        f"{usage['cache_read_input_tokens']} read from prompt cache, "
+        f"{usage['cache_creation_input_tokens']} written to prompt cache, "
+        f"{usage['output_tokens']} output"
+    )
+
+
+def _latest_cv(session, job_id: int) -> Document | None:
+    """The newest CV document for job_id that has its CV JSON stored."""
+    return (
+        session.query(Document)
+        .join(Document.application)
+        .filter(Application.job_id == job_id, Document.type == "cv", Document.cv_json.is_not(None))
+        .order_by(Document.created_at.desc(), Document.id.desc())
+        .first()
+    )
+
+
+def _pending_job_ids(session) -> list[int]:
+    rows = session.query(Job.id).filter(~Job.application.has()).order_by(Job.id).all()
+    return [job_id for (job_id,) in rows]
+
+
 def apply(
-    job_id: int = typer.Argument(..., help="ID of the job to apply for"),
-    feedback: str = typer.Option(None, "--feedback", "-f", help="Feedback to improve the cover letter (e.g. 'make it less formal')"),
+    job_ids: list[int] = typer.Argument(None, help="ID(s) of the job(s) to apply for"),
+    all_pending: bool = typer.Option(False, "--all-pending", help="Apply for every job that has no application yet"),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", min=1, help="How many jobs to process at once in batch mode"),
+    feedback: str = typer.Option(None, "--feedback", "-f", help="Feedback to improve the cover letter (e.g. 'make it less formal'); keeps the last CV if there is one"),
+    cover_letter_only: bool = typer.Option(False, "--cover-letter-only", help="Rewrite only the cover letter, reusing the last generated CV"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Always call Claude, ignoring cached responses"),
+    batch: bool = typer.Option(False, "--batch", help="Submit through the Message Batches API and collect later with 'jobb batch poll'"),
+    full_profile: bool = typer.Option(False, "--full-profile", help="Send the whole profile instead of the entries that matter for the job"),
+    show_selection: bool = typer.Option(False, "--show-selection", help="Show which profile entries were left out and the tokens saved"),
+    profile: bool = typer.Option(False, "--profile", help="Print a timing breakdown of every stage when done"),
+    trace: Path = typer.Option(None, "--trace", help="Write the timing breakdown as JSON to this file"),
 ):
-    """Generate CV and cover letter PDF for a job."""
+    """Generate CV and cover letter PDF for one or more jobs."""
+    job_ids = list(dict.fromkeys(job_ids or []))   # a repeated ID would race itself in _apply_batch
+    if all_pending:
+        with get_session() as session:
+            job_ids += [i for i in _pending_job_ids(session) if i not in job_ids]
+        if not job_ids:
+            rprint("[yellow]No pending jobs — every job already has an application.[/yellow]")
+            raise typer.Exit()
+    if not job_ids:
+        rprint("[red]Give one or more job IDs, or use --all-pending.[/red]")
+        raise typer.Exit(1)
+
+    if batch and cover_letter_only:
+        rprint("[red]--cover-letter-only can't be combined with --batch.[/red]")
+        raise typer.Exit(1)
+
+    # Feedback only changes the cover letter, so a stored CV is reused rather than rewritten.
+    reuse_cv = cover_letter_only or feedback is not None
+    with profiled(f"apply {' '.join(map(str, job_ids))}", profile, trace):
+        if batch:
+            _submit_batch(job_ids, feedback)
+        elif len(job_ids) == 1 and not all_pending:
+            _apply_single(job_ids[0], feedback, reuse_cv, not no_cache, full_profile, show_selection)
+        else:
+            _apply_batch(job_ids, feedback, concurrency, reuse_cv, not no_cache, full_profile, show_selection)
+
+
+def _submit_batch(job_ids: list[int], feedback: str | None) -> None:
     with get_session() as session:
-        job = session.get(Job, job_id)
+        profile = session.query(Profile).first()
+        if not profile:
+            rprint("[red]No profile found. Run 'jobb profile setup' first.[/red]")
+            raise typer.Exit(1)
+
+        jobs = session.query(Job).filter(Job.id.in_(job_ids)).order_by(Job.id).all()
+        missing = sorted(set(job_ids) - {j.id for j in jobs})
+        if missing:
+            rprint(f"[yellow]Skipping unknown job IDs: {', '.join(map(str, missing))}[/yellow]")
+        if not jobs:
+            rprint("[red]No jobs to submit.[/red]")
+            raise typer.Exit(1)
+
+        record = submit_cv_batch(get_client(), session, profile, jobs, feedback=feedback)
+
+        rprint(f"[green]Submitted {len(jobs)} CV requests[/green] as batch [cyan]{record.anthropic_batch_id}[/cyan].")
+        rprint("[dim]Run 'jobb batch poll' later to collect results; cover letters are submitted automatically once the CVs are in.[/dim]")
+
+
+def _print_selection(profile: Profile, job: Job) -> None:
+    selection = profile_selection(profile, job)
+    if not selection.trimmed:
+        rprint(f"[dim]Whole profile sent (~{selection.full_tokens:,} tokens, within the budget).[/dim]\n")
+        return
+    rprint(
+        f"[bold]Profile for this job:[/bold] ~{selection.tokens:,} of {selection.full_tokens:,} tokens "
+        f"([green]{selection.saved_tokens:,} saved[/green])"
+    )
+    for w in selection.roles:
+        rprint(f"  [green]kept[/green]        {w.title} at {w.company}  [dim]relevance {selection.scores[id(w)]:.2f}[/dim]")
+    for w in selection.older_roles:
+        rprint(f"  [yellow]one line[/yellow]    {w.title} at {w.company}  [dim]relevance {selection.scores[id(w)]:.2f}[/dim]")
+    if selection.dropped_skills:
+        rprint(f"  [red]dropped[/red]     skills: {', '.join(s.name for s in selection.dropped_skills)}")
+    rprint()
+
+
+def _apply_single(
+    job_id: int, feedback: str | None, reuse_cv: bool = False, use_cache: bool = True,
+    full_profile: bool = False, show_selection: bool = False,
+) -> None:
+    with get_session() as session:
+        with span("db: load job"):
+            job = session.get(Job, job_id)
         if not job:
             rprint(f"[red]Job {job_id} not found.[/red]")
             raise typer.Exit(1)
 
-        profile = session.query(Profile).first()
+        with span("db: load profile & research"):
+            profile = session.query(Profile).first()
+            research = session.query(Research).filter_by(job_id=job_id).first()
+            stored_cv = _latest_cv(session, job_id) if reuse_cv else None
         if not profile:
             rprint("[red]No profile found. Run 'jobb profile setup' first.[/red]")
             raise typer.Exit(1)
 
-        research = session.query(Research).filter_by(job_id=job_id).first()
         if not research:
             rprint("[yellow]No research found for this job — generating without company context.[/yellow]")
             rprint("[dim]Tip: run 'jobb research <job-id>' first for better results.[/dim]\n")
 
+        if show_selection and not full_profile:
+            _print_selection(profile, job)
+
+        if stored_cv:
+            _rewrite_cover_letter(session, job, profile, research, stored_cv, feedback, use_cache, full_profile)
+            return
+        if reuse_cv:
+            rprint("[yellow]No stored CV for this job yet — generating the CV as well.[/yellow]")
+
         rprint(f"[bold]Generating application:[/bold] {job.title} @ {job.company}  [{job.language}]\n")
         if feedback:
             rprint(f"[dim]Cover letter feedback: {feedback}[/dim]\n")
 
+        with StreamView("Cover letter") as view:
+            result = generate_application(
+                profile, job, research, feedback=feedback, use_cache=use_cache,
+                on_step=view.step, on_text=view.write, full_profile=full_profile,
+            )
+
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             transient=True,
         ) as progress:
-            task = progress.add_task("Asking Claude to write your CV and cover letter...", total=None)
-            result = generate_application(profile, job, research, feedback=feedback)
-            progress.update(task, description="Rendering HTML and PDFs...")
-
+            progress.add_task("Rendering HTML and PDFs...", total=None)
             subdir = _safe_dirname(job.company, job.title, job_id)
-            cv_pdf, cv_html = render_cv(result.cv, subdir)
-            cl_pdf, cl_html = render_cover_letter(
-                result.cv, result.cover_letter, job.title, job.company, subdir
-            )
+            with span("render"):
+                (cv_pdf, cv_html), (cl_pdf, cl_html) = render_application(
+                    result.cv, result.cover_letter, job.title, job.company, subdir
+                )
 
-        # Persist to DB
-        application = session.query(Application).filter_by(job_id=job_id).first()
-        if not application:
-            application = Application(job_id=job_id, status="draft")
-            session.add(application)
-            session.flush()
-
-        session.add(Document(
-            application_id=application.id,
-            type="cv",
-            language=job.language,
-            markdown_content=result.cv.summary,
-            pdf_path=str(cv_pdf),
-        ))
-        session.add(Document(
-            application_id=application.id,
-            type="cover_letter",
-            language=job.language,
-            markdown_content=result.cover_letter,
-            pdf_path=str(cl_pdf),
-        ))
-        session.commit()
+        with span("db: save documents"):
+            _save_documents(session, job, result, cv_pdf, cl_pdf)
 
         rprint("[green]Done.[/green]")
         rprint(f"  CV PDF:              [cyan]{cv_pdf}[/cyan]")
         rprint(f"  CV HTML:             [cyan]{cv_html}[/cyan]")
         rprint(f"  Cover letter PDF:    [cyan]{cl_pdf}[/cyan]")
         rprint(f"  Cover letter HTML:   [cyan]{cl_html}[/cyan]")
+        rprint(f"[dim]{_usage_line(result.usage)}[/dim]")
         rprint(f"\n[dim]Edit the HTML then run 'jobb render <html-file>' to re-export as PDF.[/dim]")
         rprint(f"[dim]Run 'jobb apply {job_id} --feedback \"your notes\"' to regenerate with guidance.[/dim]")
         rprint(f"[dim]Run 'jobb status update {job_id} --status sent' when you send it.[/dim]")
+
+
+def _rewrite_cover_letter(
+    session, job: Job, profile: Profile, research, stored_cv: Document, feedback, use_cache: bool, full_profile: bool,
+) -> None:
+    """Single-job path when a CV is kept: one API call, one PDF."""
+    rprint(f"[bold]Rewriting cover letter:[/bold] {job.title} @ {job.company}  [{job.language}]")
+    rprint(f"[dim]Keeping the CV from {stored_cv.created_at:%Y-%m-%d %H:%M}.[/dim]\n")
+    if feedback:
+        rprint(f"[dim]Cover letter feedback: {feedback}[/dim]\n")
+
+    with StreamView("Cover letter") as view:
+        result = generate_cover_letter(
+            profile, job, stored_cv.cv_json, research, feedback=feedback, use_cache=use_cache,
+            on_step=view.step, on_text=view.write, full_profile=full_profile,
+        )
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        transient=True,
+    ) as progress:
+        progress.add_task("Rendering cover letter...", total=None)
+        subdir = _safe_dirname(job.company, job.title, job.id)
+        with span("render"):
+            cl_pdf, cl_html = render_cover_letter(result.cv, result.cover_letter, job.title, job.company, subdir)
+
+    with span("db: save documents"):
+        _save_documents(session, job, result, None, cl_pdf)
+
+    rprint("[green]Done.[/green]")
+    rprint(f"  CV PDF (unchanged):  [cyan]{stored_cv.pdf_path}[/cyan]")
+    rprint(f"  Cover letter PDF:    [cyan]{cl_pdf}[/cyan]")
+    rprint(f"  Cover letter HTML:   [cyan]{cl_html}[/cyan]")
+    rprint(f"[dim]{_usage_line(result.usage)}[/dim]")
+    rprint(f"\n[dim]Run 'jobb apply {job.id} --feedback \"your notes\"' to refine it again.[/dim]")
+
+
+def _apply_job(
+    job_id: int, feedback: str | None, progress: Progress, task, reuse_cv: bool = False, use_cache: bool = True,
+    full_profile: bool = False, count_saved: bool = False,
+) -> tuple[str, str, dict[str, int], int]:
+    """
+    Generate, render and persist one application in its own session. Used by batch mode.
+    The tokens saved by profile trimming are only worked out (else 0) when count_saved is set.
+    """
+    with get_session() as session, span(f"apply #{job_id}"):
+        job = session.get(Job, job_id)
+        if not job:
+            raise LookupError(f"Job {job_id} not found")
+        profile = session.query(Profile).first()
+        research = session.query(Research).filter_by(job_id=job_id).first()
+
+        stored_cv = _latest_cv(session, job_id) if reuse_cv else None
+        if stored_cv:
+            progress.update(task, label=f"#{job_id} {job.company}", description="Rewriting cover letter...")
+            result = generate_cover_letter(
+                profile, job, stored_cv.cv_json, research, feedback=feedback, use_cache=use_cache, full_profile=full_profile,
+            )
+            progress.update(task, advance=1, description="Rendering PDF...")
+            cl_pdf, _ = render_cover_letter(
+                result.cv, result.cover_letter, job.title, job.company, _safe_dirname(job.company, job.title, job_id)
+            )
+            progress.update(task, advance=1, description="Saving...")
+            _save_documents(session, job, result, None, cl_pdf)
+            progress.update(task, advance=1, description="[green]Done[/green]")
+            return stored_cv.pdf_path, str(cl_pdf), result.usage, _saved_tokens(profile, job, count_saved)
+
+        progress.update(task, label=f"#{job_id} {job.company}", description="Writing CV and cover letter...")
+        result = generate_application(profile, job, research, feedback=feedback, use_cache=use_cache, full_profile=full_profile)
+
+        progress.update(task, advance=1, description="Rendering PDFs...")
+        subdir = _safe_dirname(job.company, job.title, job_id)
+        (cv_pdf, _), (cl_pdf, _) = render_application(
+            result.cv, result.cover_letter, job.title, job.company, subdir
+        )
+
+        progress.update(task, advance=1, description="Saving...")
+        _save_documents(session, job, result, cv_pdf, cl_pdf)
+        progress.update(task, advance=1, description="[green]Done[/green]")
+        return str(cv_pdf), str(cl_pdf), result.usage, _saved_tokens(profile, job, count_saved)
+
+
+def _saved_tokens(profile: Profile, job: Job, count_saved: bool) -> int:
+    return profile_selection(profile, job).saved_tokens if count_saved else 0
+
+
+def _apply_batch(
+    job_ids: list[int], feedback: str | None, concurrency: int, reuse_cv: bool = False, use_cache: bool = True,
+    full_profile: bool = False, show_selection: bool = False,
+) -> None:
+    with get_session() as session:
+        if not session.query(Profile).first():
+            rprint("[red]No profile found. Run 'jobb profile setup' first.[/red]")
+            raise typer.Exit(1)
+
+    set_priority(BACKGROUND)
+    rprint(f"[bold]Generating {len(job_ids)} applications[/bold] (concurrency {concurrency})\n")
+    if feedback:
+        rprint(f"[dim]Cover letter feedback: {feedback}[/dim]\n")
+
+    succeeded: dict[int, tuple[str, str, dict[str, int], int]] = {}
+    failed: dict[int, str] = {}
+    count_saved = show_selection and not full_profile
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("{task.fields[label]}", style="bold"),
+        BarColumn(bar_width=20),
+        TextColumn("[progress.description]{task.description}"),
+    ) as progress:
+        tasks = {
+            job_id: progress.add_task("Queued", total=3, label=f"#{job_id}")
+            for job_id in job_ids
+        }
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            futures = {
+                pool.submit(
+                    _apply_job, job_id, feedback, progress, tasks[job_id], reuse_cv, use_cache, full_profile, count_saved,
+                ): job_id
+                for job_id in job_ids
+            }
+            for future in as_completed(futures):
+                job_id = futures[future]
+                try:
+                    succeeded[job_id] = future.result()
+                except Exception as e:
+                    failed[job_id] = f"{type(e).__name__}: {e}"
+                    progress.update(tasks[job_id], description="[red]Failed[/red]")
+
+    table = Table(title="Batch results")
+    table.add_column("Job", style="bold")
+    table.add_column("Result")
+    for job_id in job_ids:
+        if job_id in succeeded:
+            table.add_row(str(job_id), f"[green]{succeeded[job_id][0]}[/green]")
+        else:
+            table.add_row(str(job_id), f"[red]{failed[job_id]}[/red]")
+    rprint(table)
+
+    rprint(f"\n[green]{len(succeeded)} succeeded[/green], [red]{len(failed)} failed[/red].")
+    total_usage: dict[str, int] = {}
+    for _, _, usage, _ in succeeded.values():
+        add_usage(total_usage, usage)
+    rprint(f"[dim]{_usage_line(total_usage)}[/dim]")
+    if count_saved:
+        saved = sum(saved for *_, saved in succeeded.values())
+        rprint(f"[dim]Profile trimming left out ~{saved:,} tokens over {len(succeeded)} jobs, in both the CV and the cover letter prompt.[/dim]")
+    if failed:
+        rprint(f"[dim]Retry failures with 'jobb apply {' '.join(map(str, failed))}'.[/dim]")
+        raise typer.Exit(1)
@@ -0,0 +1,124 @@
+import typer
+from rich import print as rprint
+from rich.table import Table
+
+from cli.apply import _safe_dirname, _save_documents
+from core.db import get_session
+from models import Profile, GenerationBatch
+from services.batches import (
+    refresh_status, collect_cv_batch, collect_cover_letter_batch, pending_applications, mark_rendered, finish_if_rendered,
+)
+from services.generation import get_client
+from services.pdf import render_application
+
+app = typer.Typer(help="Track bulk generation submitted with 'jobb apply --batch'.")
+
+
+@app.command("list")
+def list_batches():
+    """Show submitted Message Batches and their state."""
+    with get_session() as session:
+        batches = session.query(GenerationBatch).order_by(GenerationBatch.id.desc()).all()
+        if not batches:
+            rprint("[yellow]No batches yet. Run 'jobb apply --batch <job-ids>' to submit one.[/yellow]")
+            raise typer.Exit()
+
+        table = Table(title="Batches")
+        table.add_column("ID", style="bold")
+        table.add_column("Batch")
+        table.add_column("Stage")
+        table.add_column("Status")
+        table.add_column("Jobs", justify="right")
+        table.add_column("Errors", justify="right")
+        table.add_column("Created")
+
+        for b in batches:
+            errors = sum(1 for i in b.items if i.error)
+            table.add_row(
+                str(b.id),
+                b.anthropic_batch_id,
+                b.stage,
+                b.status,
+                str(len(b.items)),
+                f"[red]{errors}[/red]" if errors else "0",
+                str(b.created_at),
+            )
+
+        rprint(table)
+
+
+@app.command("poll")
+def poll_batches():
+    """Collect finished batches: submit cover letters for finished CVs, render finished applications."""
+    with get_session() as session:
+        profile = session.query(Profile).first()
+        if not profile:
+            rprint("[red]No profile found. Run 'jobb profile setup' first.[/red]")
+            raise typer.Exit(1)
+
+        open_batches = (
+            session.query(GenerationBatch)
+            .filter(GenerationBatch.status != "collected")
+            .order_by(GenerationBatch.id)
+            .all()
+        )
+        if not open_batches:
+            rprint("[dim]No batches waiting for results.[/dim]")
+            raise typer.Exit()
+
+        client = get_client()
+        for batch in open_batches:
+            if batch.status == "in_progress":
+                state = refresh_status(client, batch)
+                if batch.status != "ended":
+                    rprint(f"[cyan]{batch.anthropic_batch_id}[/cyan] ({batch.stage}): still {state}.")
+                    continue
+
+            if batch.stage == "cv":
+                next_batch = collect_cv_batch(client, session, batch, profile)
+                failed = [i for i in batch.items if i.error]
+                if next_batch:
+                    rprint(
+                        f"[green]CVs collected[/green] from [cyan]{batch.anthropic_batch_id}[/cyan]; "
+                        f"submitted cover letters as [cyan]{next_batch.anthropic_batch_id}[/cyan]."
+                    )
+                for item in failed:
+                    rprint(f"  [red]Job {item.job_id}: {item.error}[/red]")
+                continue
+
+            if batch.status == "ended":
+                collect_cover_letter_batch(client, session, batch)
+                rprint(f"[green]Cover letters collected[/green] from [cyan]{batch.anthropic_batch_id}[/cyan].")
+                for item in batch.items:
+                    if item.cover_letter is None:
+                        rprint(f"  [red]Job {item.job_id}: {item.error}[/red]")
+            _render_batch(session, batch, profile)
+
+
+def _render_batch(session, batch: GenerationBatch, profile: Profile) -> None:
+    """Render and save every application of the batch that has no documents yet, committing each."""
+    pending = pending_applications(batch, profile)
+    if pending:
+        rprint(f"Rendering {len(pending)} applications from [cyan]{batch.anthropic_batch_id}[/cyan]...")
+    for item, result in pending:
+        job = item.job
+        try:
+            subdir = _safe_dirname(job.company, job.title, job.id)
+            (cv_pdf, _), (cl_pdf, _) = render_application(
+                result.cv, result.cover_letter, job.title, job.company, subdir
+            )
+            mark_rendered(item)
+            _save_documents(session, job, result, cv_pdf, cl_pdf)   # commits the documents and rendered_at together
+        except Exception as e:
+            session.rollback()
+            item.error = f"render failed: {type(e).__name__}: {e}"
+            session.commit()
+            rprint(f"  [red]Job {job.id}: {item.error}[/red]")
+        else:
+            rprint(f"  Job {job.id}: [cyan]{cv_pdf}[/cyan]")
+
+    if finish_if_rendered(batch):
+        session.commit()
+    else:
+        left = sum(1 for item in batch.items if item.cover_letter is not None and item.rendered_at is None)
+        rprint(f"[yellow]{left} applications not rendered yet; 'jobb batch poll' retries them.[/yellow]")
@@ -0,0 +1,50 @@
+import typer
+from rich import print as rprint
+from rich.prompt import Confirm
+from rich.table import Table
+
+from services.cache import get_cache
+
+app = typer.Typer(help="Inspect or clear the local Claude response cache.")
+
+
+def _human_size(n: int) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+@app.command("stats")
+def cache_stats():
+    """Show cache size, hit rate and entries per model."""
+    stats = get_cache().stats()
+    lookups = stats["hits"] + stats["misses"]
+    hit_rate = f"{stats['hits'] / lookups:.0%}" if lookups else "—"
+
+    rprint(f"[bold]Cache:[/bold] [cyan]{stats['path']}[/cyan]")
+    rprint(f"  Entries:    {stats['entries']}")
+    rprint(f"  Size:       {_human_size(stats['bytes'])} of {_human_size(stats['max_bytes'])}")
+    rprint(f"  TTL:        {stats['ttl_seconds'] // 86400} days")
+    rprint(f"  Hits:       {stats['hits']}  Misses: {stats['misses']}  Hit rate: {hit_rate}")
+    rprint(f"  Evictions:  {stats['evictions']}")
+
+    if stats["by_model"]:
+        table = Table(title="Entries by model")
+        table.add_column("Model")
+        table.add_column("Entries", justify="right")
+        table.add_column("Size", justify="right")
+        for model, count, size in stats["by_model"]:
+            table.add_row(model or "—", str(count), _human_size(size))
+        rprint(table)
+
+
+@app.command("clear")
+def cache_clear(
+    yes: bool = typer.Option(False, "--yes", "-y", help="Don't ask for confirmation"),
+):
+    """Delete every cached response."""
+    if not yes and not Confirm.ask("Delete all cached Claude responses?"):
+        raise typer.Exit()
+    removed = get_cache().clear()
+    rprint(f"[green]Removed {removed} cached responses.[/green]")
@@ -0,0 +1,52 @@
+import time
+
+import typer
+from rich import print as rprint
+from sqlalchemy import text
+
+from core.db import engine, DB_PATH
+from cli.cache import _human_size
+
+app = typer.Typer(help="Database housekeeping.")
+
+
+def _db_size() -> int:
+    return sum(
+        p.stat().st_size
+        for p in (DB_PATH, DB_PATH.with_name(DB_PATH.name + "-wal"))
+        if p.exists()
+    )
+
+
+@app.command("maintain")
+def maintain(
+    vacuum: bool = typer.Option(True, "--vacuum/--no-vacuum", help="Rebuild the file to reclaim free pages"),
+):
+    """Refresh query planner statistics, compact the database and report its size."""
+    if not DB_PATH.exists():
+        rprint(f"[red]No database at {DB_PATH}. Run 'alembic upgrade head' first.[/red]")
+        raise typer.Exit(1)
+
+    before = _db_size()
+    # VACUUM refuses to run inside a transaction, so use an autocommit connection.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        steps = [("ANALYZE", "ANALYZE")]
+        if vacuum:
+            steps.append(("VACUUM", "VACUUM"))
+        steps += [
+            ("PRAGMA optimize", "PRAGMA optimize"),
+            ("WAL checkpoint", "PRAGMA wal_checkpoint(TRUNCATE)"),
+        ]
+        for label, sql in steps:
+            start = time.perf_counter()
+            conn.execute(text(sql))
+            rprint(f"  {label:<16} [dim]{(time.perf_counter() - start) * 1000:.0f} ms[/dim]")
+
+        page_size = conn.execute(text("PRAGMA page_size")).scalar()
+        page_count = conn.execute(text("PRAGMA page_count")).scalar()
+        freelist = conn.execute(text("PRAGMA freelist_count")).scalar()
+
+    after = _db_size()
+    rprint(f"\n[green]Done.[/green] [cyan]{DB_PATH}[/cyan]")
+    rprint(f"  Size:        {_human_size(before)} → {_human_size(after)}")
+    rprint(f"  Pages:       {page_count} × {page_size} B ({freelist} free)")
@@ -0,0 +1,59 @@
+from collections import Counter
+
+import typer
+from rich import print as rprint
+from rich.prompt import Confirm
+from rich.table import Table
+
+from cli.cache import _human_size
+from core.db import get_session
+from services.outputs import OUTPUT_DIR, plan_gc, run_gc
+
+
+def gc(
+    keep: int = typer.Option(3, "--keep", "-k", min=0, help="Outputs to keep per job, newest first"),
+    referenced_only: bool = typer.Option(
+        False, "--referenced-only", help="Keep only outputs holding a job's newest CV or cover letter"
+    ),
+    dry_run: bool = typer.Option(False, "--dry-run", "-n", help="List what would be deleted, delete nothing"),
+    yes: bool = typer.Option(False, "--yes", "-y", help="Don't ask for confirmation"),
+):
+    """Delete old and orphaned output directories and unused shared assets."""
+    with get_session() as session:
+        plan = plan_gc(session, keep=keep, referenced_only=referenced_only)
+
+        removed = plan.removed
+        if not removed and not plan.assets:
+            rprint(f"[green]Nothing to clean up in {OUTPUT_DIR}.[/green]")
+            return
+
+        if dry_run:
+            table = Table(title=f"Would delete from {OUTPUT_DIR}")
+            table.add_column("Directory")
+            table.add_column("Job", justify="right")
+            table.add_column("Reason")
+            table.add_column("Size", justify="right")
+            for d in removed:
+                table.add_row(d.path.name, str(d.job_id), d.reason, _human_size(d.size))
+            if plan.assets:
+                table.add_row(
+                    f"{len(plan.assets)} unused assets", "—", "unreferenced",
+                    _human_size(sum(size for _, size in plan.assets)),
+                )
+            rprint(table)
+
+        kept = len(plan.dirs) - len(removed)
+        reasons = Counter(d.reason for d in removed)
+        summary = ", ".join(f"{n} {reason}" for reason, n in reasons.most_common())
+        rprint(
+            f"{len(removed)} of {len(plan.dirs)} directories to delete"
+            + (f" ({summary})" if summary else "")
+            + f", {kept} kept, {len(plan.assets)} unused assets: {_human_size(plan.reclaimable)}"
+        )
+        if dry_run:
+            return
+        if not yes and not Confirm.ask("Delete them?"):
+            raise typer.Exit()
+
+        freed = run_gc(session, plan)
+        rprint(f"[green]Reclaimed {_human_size(freed)}.[/green]")
@@ -1,10 +1,14 @@
+import time
 import typer
 from datetime import date
+from pathlib import Path
 from rich import print as rprint
 from rich.prompt import Prompt, Confirm
-from rich.table import Table
+from rich.progress import Progress, SpinnerColumn, TextColumn
+from sqlalchemy.orm import contains_eager, load_only
 from core.db import get_session
-from models import Job
+from cli.paging import LimitOption, OffsetOption, AfterOption, paginate, stream_table, print_next_page_hint
+from models import Job, Application, Profile, job_dedupe_key
 
 app = typer.Typer(help="Manage job listings.")
 
@@ -33,6 +37,12 @@ def add_job():
 
         notes = Prompt.ask("\nNotes (optional)", default="") or None
 
+        dedupe_key = job_dedupe_key(url, company, title, description)
+        existing = session.query(Job.id).filter_by(dedupe_key=dedupe_key).first()
+        if existing:
+            rprint(f"\n[yellow]This posting is already saved as job {existing.id}.[/yellow]")
+            raise typer.Exit()
+
         job = Job(
             company=company,
             title=title,
@@ -41,6 +51,7 @@ def add_job():
             language=language,
             deadline=deadline,
             notes=notes,
+            dedupe_key=dedupe_key,
         )
         session.add(job)
         session.commit()
@@ -50,32 +61,119 @@ def add_job():
         rprint(f"Next: [cyan]uv run jobb research {job.id}[/cyan]")
 
 
-@app.command("list")
-def list_jobs():
-    """List all saved jobs."""
+@app.command("import")
+def import_jobs(
+    path: Path = typer.Argument(..., help="CSV, JSONL or HTML file, or a directory of them"),
+    language: str = typer.Option("NO", "--language", "-l", help="Language for records that don't specify one (NO or EN)"),
+):
+    """Bulk-import job postings, skipping ones that are already saved."""
+    from services.importer import import_jobs as run_import
+
+    if not path.exists():
+        rprint(f"[red]Not found: {path}[/red]")
+        raise typer.Exit(1)
+
+    start = time.perf_counter()
     with get_session() as session:
-        jobs = session.query(Job).all()
-        if not jobs:
-            rprint("[yellow]No jobs found. Run 'jobb job add' to add one.[/yellow]")
-            raise typer.Exit()
+        with Progress(SpinnerColumn(), TextColumn("{task.description}"), transient=True) as progress:
+            task = progress.add_task("Importing...", total=None)
+            stats = run_import(
+                session, path, default_language=language.upper(),
+                on_chunk=lambda s: progress.update(task, description=f"Imported {s.inserted} of {s.read} read..."),
+            )
+    elapsed = time.perf_counter() - start
 
-        table = Table(title="Jobs")
-        table.add_column("ID", style="bold")
-        table.add_column("Company")
-        table.add_column("Title")
-        table.add_column("Lang")
-        table.add_column("Deadline")
-        table.add_column("Applied?")
-
-        for j in jobs:
-            applied = "[green]Yes[/green]" if j.application else "No"
-            table.add_row(
-                str(j.id),
+    rprint(f"[green]Imported {stats.inserted} jobs[/green] in {elapsed:.1f}s.")
+    rprint(f"  Read:        {stats.read}")
+    rprint(f"  Duplicates:  {stats.duplicates}")
+    if stats.skipped:
+        rprint(f"  [yellow]Skipped:     {stats.skipped} (malformed, or missing company, title or description)[/yellow]")
+
+
+@app.command("list")
+def list_jobs(
+    limit: int = LimitOption,
+    offset: int = OffsetOption,
+    after: int = AfterOption,
+):
+    """List saved jobs."""
+    with get_session() as session:
+        # One query: the application is joined in and only the displayed columns are
+        # loaded, so description/notes never leave the database.
+        query = (
+            session.query(Job)
+            .outerjoin(Job.application)
+            .options(
+                load_only(Job.id, Job.company, Job.title, Job.language, Job.deadline),
+                contains_eager(Job.application).load_only(Application.id),
+            )
+        )
+        rows = (
+            (
+                j.id,
                 j.company,
                 j.title,
                 j.language,
                 str(j.deadline) if j.deadline else "—",
-                applied,
+                "[green]Yes[/green]" if j.application else "No",
             )
+            for j in paginate(query, Job.id, limit, offset, after)
+        )
+        count, last = stream_table(
+            "Jobs",
+            [("ID", {"style": "bold"}), ("Company", {}), ("Title", {}), ("Lang", {}), ("Deadline", {}), ("Applied?", {})],
+            rows,
+        )
+        if not count:
+            rprint("[yellow]No jobs found. Run 'jobb job add' to add one.[/yellow]")
+            raise typer.Exit()
+        print_next_page_hint(count, limit, last[0])
+
+
+@app.command("rank")
+def rank_jobs(
+    limit: int = typer.Option(20, "--limit", "-n", min=0, help="Maximum rows to show (0 = all)"),
+    unapplied: bool = typer.Option(False, "--unapplied", help="Only rank jobs without an application"),
+):
+    """Rank saved jobs by how well they match your profile (local BM25, no API calls)."""
+    from services.ranking import rank_jobs as run_rank
+
+    with get_session() as session:
+        profile = session.query(Profile).first()
+        if not profile:
+            rprint("[red]No profile found. Run 'jobb profile setup' first.[/red]")
+            raise typer.Exit(1)
 
-        rprint(table)
+        exclude = [row.job_id for row in session.query(Application.job_id)] if unapplied else []
+        with Progress(SpinnerColumn(), TextColumn("{task.description}"), transient=True) as progress:
+            progress.add_task("Updating term index...", total=None)
+            result = run_rank(session, profile, top=limit, exclude_ids=exclude)
+
+        if not len(result.job_ids):
+            rprint("[yellow]No jobs found. Run 'jobb job add' to add one.[/yellow]")
+            raise typer.Exit()
+
+        ids = result.job_ids.tolist()
+        query = session.query(Job).options(load_only(Job.id, Job.company, Job.title))
+        if limit:
+            query = query.filter(Job.id.in_(ids))
+        jobs = {j.id: j for j in query}
+        rows = (
+            (
+                rank,
+                job_id,
+                f"{score:.2f}",
+                jobs[job_id].company,
+                jobs[job_id].title,
+                ", ".join(result.matched.get(job_id, [])) or "—",
+            )
+            for rank, (job_id, score) in enumerate(zip(ids, result.scores.tolist()), start=1)
+        )
+        stream_table(
+            "Best matching jobs",
+            [("#", {"style": "dim"}), ("ID", {"style": "bold"}), ("Score", {"justify": "right"}),
+             ("Company", {}), ("Title", {}), ("Matched terms", {"style": "cyan"})],
+            rows,
+        )
+    note = f", index updated for {result.changed} jobs" if result.changed else ""
+    rprint(f"[dim]Ranked in {result.elapsed * 1000:.0f} ms{note}.[/dim]")
@@ -1,21 +1,65 @@
+"""
+Entry point for the `jobb` CLI.
+
+Subcommands are registered by name only and their modules are imported the first
+time click resolves them, so `jobb job list` never pays for importing anthropic,
+playwright or jinja2. Add new commands to COMMANDS rather than importing them here.
+"""
+import importlib
+
 import typer
-from cli import profile, job, status
-from cli.apply import apply
-from cli.research import research
-from cli.render import render
+from typer.core import TyperGroup
+
+# name -> (module, attribute). The attribute is either a Typer sub-app or a command function.
+COMMANDS: dict[str, tuple[str, str]] = {
+    "research": ("cli.research", "research"),
+    "apply": ("cli.apply", "apply"),
+    "render": ("cli.render", "render"),
+    "search": ("cli.search", "search"),
+    "profile": ("cli.profile", "app"),
+    "job": ("cli.job", "app"),
+    "status": ("cli.status", "app"),
+    "batch": ("cli.batch", "app"),
+    "cache": ("cli.cache", "app"),
+    "db": ("cli.db", "app"),
+    "stats": ("cli.stats", "stats"),
+    "gc": ("cli.gc", "gc"),
+}
+
+
+class LazyGroup(TyperGroup):
+    """Click group that imports a subcommand's module only when that subcommand is used."""
+
+    def list_commands(self, ctx) -> list[str]:
+        return list(COMMANDS) + [n for n in super().list_commands(ctx) if n not in COMMANDS]
+
+    def get_command(self, ctx, name: str):
+        if name not in COMMANDS:
+            return super().get_command(ctx, name)
+
+        module_name, attr = COMMANDS[name]
+        target = getattr(importlib.import_module(module_name), attr)
+        if isinstance(target, typer.Typer):
+            command = typer.main.get_group(target)
+        else:
+            single = typer.Typer()
+            single.command(name)(target)
+            command = typer.main.get_command(single)
+        command.name = name
+        return command
+
 
 app = typer.Typer(
     name="jobb",
+    cls=LazyGroup,
     help="Job application assistant — research, generate, track.",
     no_args_is_help=True,
 )
 
-app.add_typer(profile.app, name="profile")
-app.add_typer(job.app, name="job")
-app.command("research")(research)
-app.command("apply")(apply)
-app.command("render")(render)
-app.add_typer(status.app, name="status")
+
+@app.callback()
+def main():
+    """Job application assistant — research, generate, track."""
 
 
 if __name__ == "__main__":
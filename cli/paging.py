@@ -0,0 +1,71 @@
+"""
+Shared helpers for list commands that may page through thousands of rows.
+
+Rows are printed in chunks as the query yields them instead of being collected into
+one big table, so memory and time-to-first-row stay flat as the database grows.
+"""
+from typing import Iterable
+
+import typer
+from rich import print as rprint
+from rich.table import Table
+from rich.text import Text
+
+CHUNK_SIZE = 200
+
+LimitOption = typer.Option(100, "--limit", "-n", min=0, help="Maximum rows to show (0 = all)")
+OffsetOption = typer.Option(0, "--offset", min=0, help="Skip this many rows first")
+AfterOption = typer.Option(None, "--after", help="Keyset pagination: only rows with an ID greater than this")
+
+
+def paginate(query, id_column, limit: int, offset: int, after: int | None):
+    """Apply keyset/offset/limit paging and stream results in batches."""
+    query = query.order_by(id_column)
+    if after is not None:
+        query = query.filter(id_column > after)
+    if offset:
+        query = query.offset(offset)
+    if limit:
+        query = query.limit(limit)
+    return query.yield_per(CHUNK_SIZE)
+
+
+def stream_table(title: str, columns: list[tuple[str, dict]], rows: Iterable[tuple]) -> tuple[int, tuple | None]:
+    """
+    Print rows as a table, flushing every CHUNK_SIZE rows. Column widths are fixed from
+    the first chunk so later chunks line up. Returns (row count, last row).
+    """
+    count = 0
+    last = None
+    widths: list[int] | None = None
+    chunk: list[tuple] = []
+
+    def flush() -> None:
+        nonlocal widths
+        if widths is None:
+            widths = [
+                max([len(name)] + [Text.from_markup(str(r[i])).cell_len for r in chunk])
+                for i, (name, _) in enumerate(columns)
+            ]
+        table = Table(title=title if count <= CHUNK_SIZE else None, show_header=count <= CHUNK_SIZE)
+        for (name, kwargs), width in zip(columns, widths):
+            table.add_column(name, min_width=width, **kwargs)
+        for r in chunk:
+            table.add_row(*map(str, r))
+        rprint(table)
+        chunk.clear()
+
+    for row in rows:
+        chunk.append(row)
+        count += 1
+        last = row
+        if len(chunk) == CHUNK_SIZE:
+            flush()
+    if chunk:
+        flush()
+    return count, last
+
+
+def print_next_page_hint(count: int, limit: int, last_id) -> None:
+    if limit and count == limit:
+        rprint(f"[dim]Showing {count} rows. Next page: --after {last_id}[/dim]")
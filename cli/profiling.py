@@ -0,0 +1,64 @@
+"""
+--profile / --trace support for commands instrumented with services.tracing.
+
+profiled() wraps a command body: it records a trace when either option is given, then
+prints a waterfall of the spans and/or writes the trace as JSON, even if the command
+failed part-way.
+"""
+from contextlib import contextmanager
+from pathlib import Path
+
+from rich import print as rprint
+from rich.table import Table
+
+from services.tracing import Trace, tracing
+
+BAR_WIDTH = 32
+
+
+@contextmanager
+def profiled(command: str, profile: bool, trace_path: Path | None):
+    if not profile and trace_path is None:
+        yield
+        return
+    with tracing(command) as trace:
+        try:
+            yield
+        finally:
+            trace.finish()
+            if profile:
+                rprint(waterfall(trace))
+            if trace_path is not None:
+                trace.write(trace_path)
+                rprint(f"[dim]Trace written to {trace_path}[/dim]")
+
+
+def _bar(start: float, duration: float, total: float) -> str:
+    if total <= 0:
+        return ""
+    offset = min(BAR_WIDTH - 1, int(start / total * BAR_WIDTH))
+    length = max(1, round(duration / total * BAR_WIDTH))
+    return " " * offset + "█" * min(length, BAR_WIDTH - offset)
+
+
+def _details(attrs: dict) -> str:
+    return ", ".join(f"{key}={value}" for key, value in attrs.items() if value is not None)
+
+
+def waterfall(trace: Trace) -> Table:
+    total = trace.total
+    table = Table(title=f"Timing: {trace.command} ({total * 1000:,.0f} ms)", title_justify="left")
+    table.add_column("Stage", no_wrap=True)
+    table.add_column("Start", justify="right", style="dim")
+    table.add_column("Time", justify="right")
+    table.add_column("", style="cyan", no_wrap=True)
+    table.add_column("Details", style="dim", overflow="fold")
+    for s in trace.ordered():
+        table.add_row(
+            "  " * s.depth + s.name,
+            f"{s.start * 1000:,.0f} ms",
+            f"{s.duration * 1000:,.0f} ms",
+            _bar(s.start, s.duration, total),
+            _details(s.attrs),
+        )
+    return table
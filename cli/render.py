@@ -2,19 +2,70 @@ from pathlib import Path
 
 import typer
 from rich import print as rprint
+from rich.progress import BarColumn, MofNCompleteColumn, Progress, SpinnerColumn, TextColumn
 
-from services.pdf import html_to_pdf
+from services.pdf import render_files
 
 
-def render(html_file: Path = typer.Argument(..., help="Path to the HTML file to convert")):
-    """Convert an edited HTML file back to PDF with the same styling."""
-    if not html_file.exists():
-        rprint(f"[red]File not found: {html_file}[/red]")
+def render(
+    path: Path = typer.Argument(..., help="HTML file to convert, or a directory of them (e.g. data/output)"),
+    recursive: bool = typer.Option(False, "--recursive", "-r", help="Include HTML files in subdirectories"),
+    workers: int = typer.Option(4, "--workers", "-w", min=1, help="Browser processes to print with in parallel"),
+    force: bool = typer.Option(False, "--force", help="Re-print even if the HTML hasn't changed"),
+):
+    """Convert edited HTML files back to PDF with the same styling. Unchanged files are skipped."""
+    if not path.exists():
+        rprint(f"[red]File not found: {path}[/red]")
         raise typer.Exit(1)
-    if html_file.suffix.lower() != ".html":
+
+    if path.is_dir():
+        html_files = sorted(path.rglob("*.html") if recursive else path.glob("*.html"))
+        if not html_files:
+            rprint(f"[yellow]No HTML files in {path}{' (use --recursive for subdirectories)' if not recursive else ''}.[/yellow]")
+            raise typer.Exit()
+        _render_dir(html_files, workers, force)
+        return
+
+    if path.suffix.lower() != ".html":
         rprint("[red]File must be an .html file.[/red]")
         raise typer.Exit(1)
 
-    rprint(f"Rendering [cyan]{html_file.name}[/cyan] → PDF...")
-    pdf_path = html_to_pdf(html_file)
-    rprint(f"[green]Done.[/green] PDF saved to [cyan]{pdf_path}[/cyan]")
+    rprint(f"Rendering [cyan]{path.name}[/cyan] → PDF...")
+    [result] = render_files([path], workers=1, force=force)
+    if result.error:
+        rprint(f"[red]Rendering failed: {result.error}[/red]")
+        raise typer.Exit(1)
+    if result.cached:
+        rprint(f"[green]Unchanged.[/green] Reused the existing PDF at [cyan]{result.pdf_path}[/cyan]")
+    else:
+        rprint(f"[green]Done.[/green] PDF saved to [cyan]{result.pdf_path}[/cyan]")
+
+
+def _render_dir(html_files: list[Path], workers: int, force: bool) -> None:
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("[progress.description]{task.description}"),
+        BarColumn(),
+        MofNCompleteColumn(),
+        transient=True,
+    ) as progress:
+        task = progress.add_task(f"Rendering {len(html_files)} HTML files...", total=len(html_files))
+        results = render_files(
+            html_files, workers=workers, force=force,
+            on_done=lambda item: progress.advance(task),
+        )
+
+    failed = [r for r in results if r.error]
+    printed = [r for r in results if not r.error and not r.cached]
+    for r in printed:
+        rprint(f"  [green]Rendered[/green] [cyan]{r.pdf_path}[/cyan]")
+    for r in failed:
+        rprint(f"  [red]Failed[/red]   {r.html_path}: {r.error}")
+
+    reused = len(results) - len(printed) - len(failed)
+    rprint(
+        f"\n[green]{len(printed)} rendered[/green], [dim]{reused} unchanged[/dim]"
+        + (f", [red]{len(failed)} failed[/red]." if failed else ".")
+    )
+    if failed:
+        raise typer.Exit(1)
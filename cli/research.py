@@ -1,18 +1,59 @@
-from datetime import datetime, timezone
+import asyncio
+from contextlib import ExitStack
+from pathlib import Path
 
 import typer
 from rich import print as rprint
 from rich.progress import Progress, SpinnerColumn, TextColumn
+from rich.table import Table
 
+from cli.profiling import profiled
+from cli.streaming import StreamView
 from core.db import get_session
-from models import Job, Research
-from services.research import research_company
+from models import Job
+from services.research import FULL, REUSED, ROLE_ONLY, research_job, research_jobs
+from services.scheduler import BACKGROUND, set_priority
 
 app = typer.Typer(help="Research a company using web search.")
 
+OUTCOME_LABELS = {
+    FULL: "[green]Researched[/green]",
+    ROLE_ONLY: "[green]Reused company research[/green], wrote role notes",
+    REUSED: "[dim]Already up to date[/dim]",
+}
 
-def research(job_id: int = typer.Argument(..., help="ID of the job to research")):
-    """Search the web and build a company research summary for a job."""
+
+def research(
+    job_ids: list[int] = typer.Argument(None, help="ID(s) of the job(s) to research"),
+    all_missing: bool = typer.Option(False, "--all", help="Research every job that has no research yet"),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", min=1, help="How many API calls to run at once when researching several jobs"),
+    refresh: bool = typer.Option(False, "--refresh", help="Re-run the company web search even if stored research is still fresh"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Always call Claude, ignoring cached responses"),
+    profile: bool = typer.Option(False, "--profile", help="Print a timing breakdown of every stage when done"),
+    trace: Path = typer.Option(None, "--trace", help="Write the timing breakdown as JSON to this file"),
+):
+    """Search the web and build a company research summary for one or more jobs."""
+    job_ids = list(job_ids or [])
+    if all_missing:
+        with get_session() as session:
+            rows = session.query(Job.id).filter(~Job.research.has()).order_by(Job.id).all()
+        given = set(job_ids)
+        job_ids += [job_id for (job_id,) in rows if job_id not in given]
+        if not job_ids:
+            rprint("[yellow]Every job already has research.[/yellow]")
+            raise typer.Exit()
+    if not job_ids:
+        rprint("[red]Give one or more job IDs, or use --all.[/red]")
+        raise typer.Exit(1)
+
+    with profiled(f"research {' '.join(map(str, job_ids))}", profile, trace):
+        if len(job_ids) == 1 and not all_missing:
+            _research_single(job_ids[0], refresh, use_cache=not no_cache)
+        else:
+            _research_many(job_ids, concurrency, refresh, use_cache=not no_cache)
+
+
+def _research_single(job_id: int, refresh: bool, use_cache: bool = True) -> None:
     with get_session() as session:
         job = session.get(Job, job_id)
         if not job:
@@ -21,24 +62,75 @@ def research(job_id: int = typer.Argument(..., help="ID of the job to research")
 
         rprint(f"[bold]Researching:[/bold] {job.company} — {job.title}\n")
 
-        with Progress(
-            SpinnerColumn(),
-            TextColumn("[progress.description]{task.description}"),
-            transient=True,
-        ) as progress:
-            progress.add_task("Searching the web with Claude...", total=None)
-            summary = research_company(job)
-
-        record = session.query(Research).filter_by(job_id=job_id).first()
-        if not record:
-            record = Research(job_id=job_id)
-            session.add(record)
-
-        record.summary = summary
-        record.scraped_at = datetime.now(timezone.utc)
+        # The live view opens on the first API call, so reused research prints nothing extra.
+        with ExitStack() as stack:
+            view: StreamView | None = None
+
+            def on_step(text: str) -> None:
+                nonlocal view
+                if view is None:
+                    view = stack.enter_context(StreamView(f"{job.company} research"))
+                view.step(text)
+
+            record, outcome = research_job(
+                session, job, refresh=refresh, use_cache=use_cache,
+                on_step=on_step, on_text=lambda delta: view.write(delta),
+            )
         session.commit()
 
-        rprint("[green]Research complete.[/green]\n")
-        preview = summary[:700] + "\n[dim]...[/dim]" if len(summary) > 700 else summary
-        rprint(preview)
+        researched_at = record.company_research.researched_at.strftime("%Y-%m-%d")
+        if outcome == REUSED:
+            rprint(f"[green]Research is up to date[/green] (company researched {researched_at}). Use --refresh to redo it.\n")
+        elif outcome == FULL:
+            rprint("[green]Research complete.[/green]\n")
+        else:
+            rprint(f"[green]Reused company research from {researched_at}[/green]; wrote role-specific notes.\n")
+
+        if outcome == REUSED:  # otherwise the text was just streamed
+            summary = record.summary
+            preview = summary[:700] + "\n[dim]...[/dim]" if len(summary) > 700 else summary
+            rprint(preview)
         rprint(f"\n[dim]Run 'jobb apply {job_id}' to generate your application.[/dim]")
+
+
+def _research_many(job_ids: list[int], concurrency: int, refresh: bool, use_cache: bool = True) -> None:
+    set_priority(BACKGROUND)
+    rprint(f"[bold]Researching {len(job_ids)} jobs[/bold] (concurrency {concurrency})\n")
+
+    with Progress(
+        SpinnerColumn(),
+        TextColumn("{task.fields[label]}", style="bold"),
+        TextColumn("[progress.description]{task.description}"),
+    ) as progress:
+        tasks = {job_id: progress.add_task("Queued", total=1, label=f"#{job_id}") for job_id in job_ids}
+
+        def on_update(job_id: int, text: str) -> None:
+            progress.update(tasks[job_id], description=text)
+
+        def on_done(job_id: int, result) -> None:
+            if isinstance(result, Exception):
+                progress.update(tasks[job_id], description="[red]Failed[/red]")
+            else:
+                progress.update(tasks[job_id], completed=1, description="[green]Done[/green]")
+
+        results = asyncio.run(research_jobs(
+            job_ids, concurrency=concurrency, refresh=refresh, use_cache=use_cache,
+            on_update=on_update, on_done=on_done,
+        ))
+
+    failed = {job_id: r for job_id, r in results.items() if isinstance(r, Exception)}
+    table = Table(title="Research results")
+    table.add_column("Job", style="bold")
+    table.add_column("Result")
+    for job_id in job_ids:
+        result = results[job_id]
+        if isinstance(result, Exception):
+            table.add_row(str(job_id), f"[red]{type(result).__name__}: {result}[/red]")
+        else:
+            table.add_row(str(job_id), OUTCOME_LABELS[result])
+    rprint(table)
+
+    rprint(f"\n[green]{len(results) - len(failed)} succeeded[/green], [red]{len(failed)} failed[/red].")
+    if failed:
+        rprint(f"[dim]Retry failures with 'jobb research {' '.join(map(str, failed))}'.[/dim]")
+        raise typer.Exit(1)
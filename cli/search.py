@@ -0,0 +1,63 @@
+import time
+
+import typer
+from rich import print as rprint
+from rich.markup import escape
+from rich.table import Table
+from sqlalchemy.exc import OperationalError
+
+from core.db import get_session
+from services.search import SOURCES, HIGHLIGHT_START, HIGHLIGHT_END, search as run_search, collapse_whitespace
+
+
+def _highlight(snippet: str) -> str:
+    return (
+        escape(collapse_whitespace(snippet))
+        .replace(HIGHLIGHT_START, "[bold yellow]")
+        .replace(HIGHLIGHT_END, "[/bold yellow]")
+    )
+
+
+def search(
+    query: str = typer.Argument(..., help="Words to look for, e.g. 'kubernetes' or 'sustain*'"),
+    source: list[str] = typer.Option(None, "--in", help=f"Limit to: {', '.join(SOURCES)} (repeatable)"),
+    limit: int = typer.Option(20, "--limit", "-n", min=1, help="Maximum results"),
+    raw: bool = typer.Option(False, "--raw", help="Pass the query through as FTS5 syntax (OR, NEAR, column filters)"),
+):
+    """Full-text search across jobs, company research and generated documents."""
+    sources = source or list(SOURCES)
+    unknown = [s for s in sources if s not in SOURCES]
+    if unknown:
+        rprint(f"[red]Unknown source: {', '.join(unknown)}. Choose from: {', '.join(SOURCES)}[/red]")
+        raise typer.Exit(1)
+
+    start = time.perf_counter()
+    with get_session() as session:
+        try:
+            hits = run_search(session, query, sources=sources, limit=limit, raw=raw)
+        except OperationalError as e:
+            rprint(f"[red]Search failed: {e.orig}[/red]")
+            if "no such table" in str(e.orig):
+                rprint("[dim]Run 'alembic upgrade head' to create the search index.[/dim]")
+            raise typer.Exit(1)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    if not hits:
+        rprint(f"[yellow]No matches for '{escape(query)}'.[/yellow]")
+        raise typer.Exit()
+
+    table = Table(title=f"Results for '{escape(query)}'", show_lines=True)
+    table.add_column("Job", style="bold")
+    table.add_column("Found in")
+    table.add_column("Company / Title")
+    table.add_column("Match", ratio=1)
+    for hit in hits:
+        found_in = hit.source if not hit.detail else f"{hit.source} ({hit.detail})"
+        table.add_row(
+            str(hit.job_id),
+            found_in,
+            f"{escape(hit.company)}\n[dim]{escape(hit.title)}[/dim]",
+            _highlight(hit.snippet),
+        )
+    rprint(table)
+    rprint(f"[dim]{len(hits)} results in {elapsed:.0f} ms[/dim]")
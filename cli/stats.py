@@ -0,0 +1,83 @@
+import typer
+from rich import print as rprint
+from rich.table import Table
+from sqlalchemy.exc import OperationalError
+
+from core.db import get_session
+from services.call_log import application_tokens, call_stats
+
+GROUPINGS = ("stage", "day")
+
+
+def _ms(value: float | None) -> str:
+    if value is None:
+        return "—"
+    return f"{value:,.0f} ms" if value < 1000 else f"{value / 1000:,.1f} s"
+
+
+def _stats_table(title: str, label: str, rows: list[dict]) -> Table:
+    table = Table(title=title, title_justify="left")
+    table.add_column(label, style="bold")
+    table.add_column("Calls", justify="right")
+    table.add_column("Input", justify="right")
+    table.add_column("Cache read", justify="right")
+    table.add_column("Cache write", justify="right")
+    table.add_column("Output", justify="right")
+    table.add_column("Searches", justify="right")
+    table.add_column("TTFT p50", justify="right")
+    table.add_column("Latency p50", justify="right")
+    table.add_column("Latency p95", justify="right")
+    for row in rows:
+        table.add_row(
+            str(row["group"]),
+            f"{row['calls']:,}",
+            f"{row['input_tokens']:,}",
+            f"{row['cache_read_input_tokens']:,}",
+            f"{row['cache_creation_input_tokens']:,}",
+            f"{row['output_tokens']:,}",
+            f"{row['web_search_requests']:,}",
+            _ms(row["ttft_p50_ms"]),
+            _ms(row["latency_p50_ms"]),
+            _ms(row["latency_p95_ms"]),
+        )
+    return table
+
+
+def stats(
+    days: int = typer.Option(30, "--days", "-d", min=1, help="How many days back to include"),
+    by: list[str] = typer.Option(None, "--by", help=f"Group by: {', '.join(GROUPINGS)} (repeatable; default both)"),
+):
+    """Token usage and latency of Claude calls, per stage and per day."""
+    groupings = by or list(GROUPINGS)
+    unknown = [g for g in groupings if g not in GROUPINGS]
+    if unknown:
+        rprint(f"[red]Unknown grouping: {', '.join(unknown)}. Choose from: {', '.join(GROUPINGS)}[/red]")
+        raise typer.Exit(1)
+
+    with get_session() as session:
+        try:
+            tables = {g: call_stats(session, g, days) for g in groupings}
+            per_application = application_tokens(session, days)
+        except OperationalError as e:
+            rprint(f"[red]Could not read the call log: {e.orig}[/red]")
+            if "no such table" in str(e.orig):
+                rprint("[dim]Run 'alembic upgrade head' to create it.[/dim]")
+            raise typer.Exit(1)
+
+    if not any(tables.values()):
+        rprint(f"[yellow]No Claude calls logged in the last {days} days.[/yellow]")
+        raise typer.Exit()
+
+    if "stage" in tables:
+        rprint(_stats_table(f"By stage, last {days} days", "Stage", tables["stage"]))
+    if "day" in tables:
+        rprint(_stats_table(f"By day, last {days} days", "Day", tables["day"]))
+
+    if per_application["applications"]:
+        rprint(
+            f"\n[bold]Per application[/bold] ({per_application['applications']} jobs, research included): "
+            f"{per_application['input_tokens']:,.0f} input tokens, "
+            f"{per_application['output_tokens']:,.0f} output tokens, "
+            f"{per_application['web_search_requests']:.1f} web searches"
+        )
+    rprint("[dim]Latency excludes rate-limit waits; Message Batches results have no latency.[/dim]")
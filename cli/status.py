@@ -1,8 +1,9 @@
 import typer
 from rich import print as rprint
-from rich.table import Table
+from sqlalchemy.orm import contains_eager, load_only
 from core.db import get_session
-from models import Application
+from cli.paging import LimitOption, OffsetOption, AfterOption, paginate, stream_table, print_next_page_hint
+from models import Application, Job
 
 app = typer.Typer(help="Track application statuses.")
 
@@ -15,33 +16,46 @@ STATUS_COLORS = {
 }
 
 
-@app.command("list")
-def list_status():
-    """Show all applications and their current status."""
-    with get_session() as session:
-        applications = session.query(Application).all()
-        if not applications:
-            rprint("[yellow]No applications yet. Run 'jobb apply <job-id>' to generate one.[/yellow]")
-            raise typer.Exit()
+def _status_cell(status: str) -> str:
+    color = STATUS_COLORS.get(status, "white")
+    return f"[{color}]{status}[/{color}]"
 
-        table = Table(title="Applications")
-        table.add_column("ID", style="bold")
-        table.add_column("Company")
-        table.add_column("Title")
-        table.add_column("Status")
-        table.add_column("Updated")
 
-        for app in applications:
-            color = STATUS_COLORS.get(app.status, "white")
-            table.add_row(
-                str(app.id),
+@app.command("list")
+def list_status(
+    limit: int = LimitOption,
+    offset: int = OffsetOption,
+    after: int = AfterOption,
+):
+    """Show applications and their current status."""
+    with get_session() as session:
+        query = (
+            session.query(Application)
+            .join(Application.job)
+            .options(
+                load_only(Application.id, Application.status, Application.updated_at),
+                contains_eager(Application.job).load_only(Job.id, Job.company, Job.title),
+            )
+        )
+        rows = (
+            (
+                app.id,
                 app.job.company,
                 app.job.title,
-                f"[{color}]{app.status}[/{color}]",
+                _status_cell(app.status),
                 str(app.updated_at.date()),
             )
-
-        rprint(table)
+            for app in paginate(query, Application.id, limit, offset, after)
+        )
+        count, last = stream_table(
+            "Applications",
+            [("ID", {"style": "bold"}), ("Company", {}), ("Title", {}), ("Status", {}), ("Updated", {})],
+            rows,
+        )
+        if not count:
+            rprint("[yellow]No applications yet. Run 'jobb apply <job-id>' to generate one.[/yellow]")
+            raise typer.Exit()
+        print_next_page_hint(count, limit, last[0])
 
 
 @app.command("update")
@@ -0,0 +1,67 @@
+"""
+Live terminal view for text streamed from Claude.
+
+Shows the tail of the text as it arrives, the current step, a running token estimate
+and the time to first token of the current request. Services report the start of each
+request through their on_step callback and text through on_text, which map onto
+StreamView.step and StreamView.write.
+"""
+import threading
+import time
+
+from rich.console import Group
+from rich.live import Live
+from rich.panel import Panel
+from rich.text import Text
+
+CHARS_PER_TOKEN = 4   # only for the live estimate; exact counts come from the API usage
+
+
+class StreamView:
+    def __init__(self, title: str, max_lines: int = 18) -> None:
+        self.title = title
+        self.max_lines = max_lines
+        self._lock = threading.Lock()
+        self._text = ""
+        self._status = "Waiting..."
+        self._step_started: float | None = None
+        self._first_token: float | None = None
+        self._started = time.perf_counter()
+        self._live = Live(self, refresh_per_second=12)
+
+    def __enter__(self) -> "StreamView":
+        self._live.__enter__()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._status = "Done" if exc[0] is None else "Failed"
+        self._live.__exit__(*exc)
+        if not self._live.console.is_terminal:
+            self._live.console.line()  # Live only ends the last frame with a newline on a terminal
+
+    def step(self, description: str) -> None:
+        """A new request was sent: reset the time-to-first-token clock."""
+        with self._lock:
+            self._status = description
+            self._step_started = time.perf_counter()
+            self._first_token = None
+            if self._text and not self._text.endswith("\n\n"):
+                self._text += "\n\n"
+
+    def write(self, delta: str) -> None:
+        with self._lock:
+            if self._first_token is None and self._step_started is not None:
+                self._first_token = time.perf_counter() - self._step_started
+            self._text += delta
+
+    def __rich__(self) -> Group:
+        with self._lock:
+            lines = self._text.rstrip().splitlines()[-self.max_lines:]
+            tokens = len(self._text) // CHARS_PER_TOKEN
+            first = f"{self._first_token:.1f}s" if self._first_token is not None else "—"
+            status = self._status
+        elapsed = time.perf_counter() - self._started
+        return Group(
+            Panel(Text("\n".join(lines)), title=self.title, title_align="left", border_style="cyan"),
+            Text(f"{status}  ~{tokens} tokens · first token {first} · {elapsed:.0f}s elapsed", style="dim"),
+        )
@@ -0,0 +1,41 @@
+"""
+Compression for large text columns (see models.types.CompressedText).
+
+Values of at least COMPRESS_MIN_BYTES are stored as zlib-compressed BLOBs behind a
+one-byte format marker. Shorter values, and values that don't shrink enough, stay plain
+TEXT. A TEXT-affinity column keeps BLOBs as they are, so both kinds can live in one
+column and the storage class of a value says which it is.
+
+SQL that needs the text itself (the FTS indexes and their triggers) calls jobb_text(),
+which register_functions() adds to every connection.
+"""
+import zlib
+
+COMPRESS_MIN_BYTES = 512
+MIN_SAVING = 0.9        # keep the plain text unless compression gets it below 90%
+ZLIB_LEVEL = 6
+
+_ZLIB = b"\x01"         # format marker; leaves room for other codecs later
+
+
+def compress_text(value: str | None) -> str | bytes | None:
+    if value is None or isinstance(value, bytes):
+        return value
+    raw = value.encode("utf-8")
+    if len(raw) < COMPRESS_MIN_BYTES:
+        return value
+    packed = _ZLIB + zlib.compress(raw, ZLIB_LEVEL)
+    return packed if len(packed) < len(raw) * MIN_SAVING else value
+
+
+def decompress_text(value: str | bytes | None) -> str | None:
+    if not isinstance(value, bytes):
+        return value
+    if value[:1] == _ZLIB:
+        return zlib.decompress(value[1:]).decode("utf-8")
+    raise ValueError(f"Unknown compressed text format: {value[:1]!r}")
+
+
+def register_functions(dbapi_connection) -> None:
+    """Make jobb_text(value) available in SQL on a raw sqlite3 connection."""
+    dbapi_connection.create_function("jobb_text", 1, decompress_text, deterministic=True)
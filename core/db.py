@@ -1,15 +1,40 @@
+import os
 from contextlib import contextmanager
 from pathlib import Path
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 
-DB_PATH = Path(__file__).parent.parent / "data" / "db.sqlite"
+from core.compression import register_functions
+
+# JOBB_DB points the app (and alembic) at another database, e.g. a synthetic one for benchmarks.
+DB_PATH = Path(os.getenv("JOBB_DB") or Path(__file__).parent.parent / "data" / "db.sqlite")
 DB_URL = f"sqlite:///{DB_PATH}"
 
+# Applied to every new DBAPI connection. WAL lets readers and the single writer work at
+# the same time (batch apply writes from several threads); synchronous=NORMAL is safe
+# under WAL and avoids an fsync per commit.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64_000,        # negative = KiB, so ~64 MB of page cache
+    "mmap_size": 256 * 1024 * 1024,
+    "busy_timeout": 5_000,        # ms to wait on a locked database before failing
+    "temp_store": "MEMORY",
+}
+
 engine = create_engine(DB_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(bind=engine)
 
 
+@event.listens_for(engine, "connect")
+def _apply_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+    register_functions(dbapi_connection)
+
+
 @contextmanager
 def get_session():
     session = SessionLocal()
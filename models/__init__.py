@@ -1,15 +1,19 @@
 from .base import Base
 from .profile import Profile, WorkExperience, Education, Skill
-from .job import Job
+from .job import Job, job_dedupe_key, normalize_url
 from .application import Application
 from .document import Document
-from .research import Research
+from .research import Research, CompanyResearch, company_key
+from .batch import GenerationBatch, GenerationBatchItem
+from .llm_call import LLMCall, LLM_STAGES
 
 __all__ = [
     "Base",
     "Profile", "WorkExperience", "Education", "Skill",
-    "Job",
+    "Job", "job_dedupe_key", "normalize_url",
     "Application",
     "Document",
-    "Research",
+    "Research", "CompanyResearch", "company_key",
+    "GenerationBatch", "GenerationBatchItem",
+    "LLMCall", "LLM_STAGES",
 ]
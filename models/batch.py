@@ -0,0 +1,44 @@
+from datetime import datetime
+from sqlalchemy import String, Text, DateTime, ForeignKey, func
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from .base import Base
+
+BATCH_STAGES = ["cv", "cover_letter"]
+BATCH_STATUSES = ["in_progress", "ended", "rendering", "collected"]  # "rendering": cover letters stored, PDFs pending
+
+
+class GenerationBatch(Base):
+    """One Anthropic Message Batch submitted by 'jobb apply --batch'."""
+    __tablename__ = "generation_batches"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    anthropic_batch_id: Mapped[str] = mapped_column(String(100), unique=True)
+    stage: Mapped[str] = mapped_column(String(20))                           # "cv" or "cover_letter"
+    status: Mapped[str] = mapped_column(String(20), default="in_progress", index=True)
+    feedback: Mapped[str | None] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    collected_at: Mapped[datetime | None] = mapped_column(DateTime)
+
+    items: Mapped[list["GenerationBatchItem"]] = relationship(
+        back_populates="batch", cascade="all, delete-orphan"
+    )
+
+    def __repr__(self) -> str:
+        return f"<GenerationBatch {self.anthropic_batch_id} {self.stage} {self.status}>"
+
+
+class GenerationBatchItem(Base):
+    """One job's request inside a batch, and its result once collected."""
+    __tablename__ = "generation_batch_items"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    batch_id: Mapped[int] = mapped_column(ForeignKey("generation_batches.id"), index=True)
+    job_id: Mapped[int] = mapped_column(ForeignKey("jobs.id"), index=True)
+    custom_id: Mapped[str] = mapped_column(String(64))
+    cv_json: Mapped[str | None] = mapped_column(Text)
+    cover_letter: Mapped[str | None] = mapped_column(Text)
+    error: Mapped[str | None] = mapped_column(String(2000))
+    rendered_at: Mapped[datetime | None] = mapped_column(DateTime)   # PDFs and documents saved
+
+    batch: Mapped["GenerationBatch"] = relationship(back_populates="items")
+    job: Mapped["Job"] = relationship()
@@ -1,7 +1,8 @@
 from datetime import datetime
-from sqlalchemy import String, Text, DateTime, ForeignKey, func
+from sqlalchemy import String, DateTime, ForeignKey, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base
+from .types import CompressedText
 
 DOCUMENT_TYPES = ["cv", "cover_letter"]
 
@@ -10,10 +11,11 @@ class Document(Base):
     __tablename__ = "documents"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    application_id: Mapped[int] = mapped_column(ForeignKey("applications.id"))
+    application_id: Mapped[int] = mapped_column(ForeignKey("applications.id"), index=True)
     type: Mapped[str] = mapped_column(String(20))       # "cv" or "cover_letter"
     language: Mapped[str] = mapped_column(String(2))    # "NO" or "EN"
-    markdown_content: Mapped[str] = mapped_column(Text)
+    markdown_content: Mapped[str] = mapped_column(CompressedText)
+    cv_json: Mapped[str | None] = mapped_column(CompressedText)   # full CV JSON from Claude, on "cv" documents
     pdf_path: Mapped[str | None] = mapped_column(String(500))
     created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
@@ -1,7 +1,34 @@
+import hashlib
+import re
 from datetime import date
-from sqlalchemy import String, Text, Date
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from sqlalchemy import String, Text, Date, Integer
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base
+from .types import CompressedText
+
+_TRACKING_PARAMS = re.compile(r"^(utm_.*|fbclid|gclid|mc_[a-z]+|ref|source|trk.*)$", re.IGNORECASE)
+
+
+def normalize_url(url: str) -> str:
+    """Lower-case scheme/host, drop fragments, tracking params and trailing slashes."""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower().removeprefix("www.")
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not _TRACKING_PARAMS.match(k)
+    ))
+    return urlunsplit((parts.scheme.lower() or "https", host, parts.path.rstrip("/"), query, ""))
+
+
+def job_dedupe_key(url: str | None, company: str, title: str, description: str) -> str:
+    """Identity of a posting: its normalized URL if known, otherwise a hash of its content."""
+    if url:
+        raw = "url:" + normalize_url(url)
+    else:
+        text = " ".join(f"{company}\n{title}\n{description}".lower().split())
+        raw = "content:" + text
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
 
 class Job(Base):
@@ -10,11 +37,14 @@ class Job(Base):
     id: Mapped[int] = mapped_column(primary_key=True)
     company: Mapped[str] = mapped_column(String(200))
     title: Mapped[str] = mapped_column(String(200))
-    description: Mapped[str] = mapped_column(Text)
+    description: Mapped[str] = mapped_column(CompressedText)
     url: Mapped[str | None] = mapped_column(String(1000))
     deadline: Mapped[date | None] = mapped_column(Date)
     language: Mapped[str] = mapped_column(String(2), default="NO")  # "NO" or "EN"
     notes: Mapped[str | None] = mapped_column(Text)
+    dedupe_key: Mapped[str | None] = mapped_column(String(64), unique=True, index=True)  # see job_dedupe_key
+    # Bumped by the jobs_text_version trigger whenever title or description is updated.
+    text_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
 
     application: Mapped["Application | None"] = relationship(back_populates="job")
     research: Mapped["Research | None"] = relationship(back_populates="job")
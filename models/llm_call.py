@@ -0,0 +1,26 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, Float, Boolean, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+from .base import Base
+
+LLM_STAGES = ["research", "role_notes", "cv", "cover_letter"]
+
+
+class LLMCall(Base):
+    """One Claude API call: what it was for, what it cost and how long it took."""
+    __tablename__ = "llm_calls"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    stage: Mapped[str] = mapped_column(String(20), index=True)    # see LLM_STAGES
+    # No foreign key: the log keeps its rows when a job is deleted.
+    job_id: Mapped[int | None] = mapped_column(Integer, index=True)
+    model: Mapped[str] = mapped_column(String(100))
+    input_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    output_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    cache_creation_input_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    cache_read_input_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    web_search_requests: Mapped[int] = mapped_column(Integer, default=0)
+    ttft_ms: Mapped[float | None] = mapped_column(Float)          # time to first token, streamed calls only
+    latency_ms: Mapped[float | None] = mapped_column(Float)       # None for Message Batches results
+    batch: Mapped[bool] = mapped_column(Boolean, default=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), index=True)
@@ -35,7 +35,7 @@ class WorkExperience(Base):
     __tablename__ = "work_experiences"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"))
+    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"), index=True)
     company: Mapped[str] = mapped_column(String(200))
     title: Mapped[str] = mapped_column(String(200))
     start_date: Mapped[date] = mapped_column(Date)
@@ -49,7 +49,7 @@ class Education(Base):
     __tablename__ = "educations"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"))
+    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"), index=True)
     institution: Mapped[str] = mapped_column(String(200))
     degree: Mapped[str] = mapped_column(String(200))
     field: Mapped[str | None] = mapped_column(String(200))
@@ -63,7 +63,7 @@ class Skill(Base):
     __tablename__ = "skills"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"))
+    profile_id: Mapped[int] = mapped_column(ForeignKey("profiles.id"), index=True)
     name: Mapped[str] = mapped_column(String(100))
     category: Mapped[str | None] = mapped_column(String(100))  # e.g. "language", "tool", "soft skill"
 
@@ -1,7 +1,36 @@
+import re
 from datetime import datetime
 from sqlalchemy import String, Text, DateTime, ForeignKey, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .base import Base
+from .types import CompressedText
+
+# Legal-form suffixes that don't distinguish companies ("Equinor ASA" == "Equinor").
+_LEGAL_FORMS = {
+    "as", "asa", "ab", "oy", "oyj", "aps", "ans", "da", "sa", "ag", "bv", "nv", "gmbh",
+    "ltd", "limited", "plc", "inc", "incorporated", "llc", "corp", "corporation", "co", "company",
+}
+
+
+def company_key(name: str) -> str:
+    """Normalized company identity: case-folded, punctuation and trailing legal forms removed."""
+    words = re.sub(r"[^\w\s]", " ", name.casefold().replace("&", " and ")).split()
+    while len(words) > 1 and words[-1] in _LEGAL_FORMS:
+        words.pop()
+    return " ".join(words)[:200]
+
+
+class CompanyResearch(Base):
+    """Web research about a company, shared by every job at that company."""
+    __tablename__ = "company_research"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    company_key: Mapped[str] = mapped_column(String(200), unique=True, index=True)  # see company_key
+    company: Mapped[str] = mapped_column(String(200))  # display name as first researched
+    summary: Mapped[str] = mapped_column(CompressedText)
+    researched_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+    research: Mapped[list["Research"]] = relationship(back_populates="company_research")
 
 
 class Research(Base):
@@ -9,15 +38,20 @@ class Research(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True)
     job_id: Mapped[int] = mapped_column(ForeignKey("jobs.id"), unique=True)
+    company_research_id: Mapped[int | None] = mapped_column(ForeignKey("company_research.id"), index=True)
     scraped_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
 
     # Raw scraped content per source
-    company_website: Mapped[str | None] = mapped_column(Text)
-    glassdoor: Mapped[str | None] = mapped_column(Text)
-    news: Mapped[str | None] = mapped_column(Text)
-    linkedin: Mapped[str | None] = mapped_column(Text)
+    company_website: Mapped[str | None] = mapped_column(CompressedText)
+    glassdoor: Mapped[str | None] = mapped_column(CompressedText)
+    news: Mapped[str | None] = mapped_column(CompressedText)
+    linkedin: Mapped[str | None] = mapped_column(CompressedText)
+
+    # Role-specific notes written from the company research and the job description
+    role_notes: Mapped[str | None] = mapped_column(Text)
 
     # AI-generated summary of all research, used as context for generation
-    summary: Mapped[str | None] = mapped_column(Text)
+    summary: Mapped[str | None] = mapped_column(CompressedText)
 
     job: Mapped["Job"] = relationship(back_populates="research")
+    company_research: Mapped["CompanyResearch | None"] = relationship(back_populates="research")
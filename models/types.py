@@ -0,0 +1,16 @@
+from sqlalchemy import Text
+from sqlalchemy.types import TypeDecorator
+
+from core.compression import compress_text, decompress_text
+
+
+class CompressedText(TypeDecorator):
+    """Text that is stored zlib-compressed once it is large (see core.compression)."""
+    impl = Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        return decompress_text(value)
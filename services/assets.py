@@ -0,0 +1,73 @@
+"""
+Content-addressed store for assets shared by the rendered HTML files.
+
+Every apply writes a new output directory, and each used to carry its own copy of the
+stylesheet and the base64-encoded photo. Those now live once in data/output/assets/,
+named by the SHA-256 of their bytes, and the HTML links to them as ../assets/<name>,
+so the files still open from disk in a browser. An unchanged asset is never written
+twice, and a changed one gets a new name, so HTML written earlier keeps its own
+version until 'jobb gc' finds nothing referencing it.
+
+Chromium prints from an HTML string without a base URL, so inline_assets() puts the
+assets back inline, as data URIs, just before printing.
+"""
+import base64
+import hashlib
+import os
+import re
+import threading
+from pathlib import Path
+
+ASSET_DIR = Path(__file__).parent.parent / "data" / "output" / "assets"
+ASSET_PREFIX = "../assets/"
+
+MEDIA_TYPES = {
+    ".css": "text/css",
+    ".jpg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+}
+
+ASSET_REF = re.compile(re.escape(ASSET_PREFIX) + r"([0-9a-f]{64}\.[a-z]+)")
+
+_inline: dict[str, str] = {}    # asset name -> data URI
+_lock = threading.Lock()
+
+
+def store_asset(data: bytes, suffix: str) -> str:
+    """Store data once under its content hash. Returns the href to use in the HTML."""
+    name = f"{hashlib.sha256(data).hexdigest()}{suffix}"
+    path = ASSET_DIR / name
+    if not path.exists():
+        ASSET_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = ASSET_DIR / f"{name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    return ASSET_PREFIX + name
+
+
+def asset_names(html_str: str) -> set[str]:
+    """Names of the stored assets html_str links to."""
+    return set(ASSET_REF.findall(html_str))
+
+
+def _data_uri(name: str) -> str:
+    with _lock:
+        cached = _inline.get(name)
+    if cached is not None:
+        return cached
+    data = base64.b64encode((ASSET_DIR / name).read_bytes()).decode()
+    uri = f"data:{MEDIA_TYPES[Path(name).suffix]};base64,{data}"
+    with _lock:
+        _inline[name] = uri
+    return uri
+
+
+def inline_assets(html_str: str) -> str:
+    """
+    Replace links to stored assets with data URIs. The names are content hashes, so
+    the result only depends on html_str. Raises FileNotFoundError for a missing asset.
+    """
+    if ASSET_PREFIX not in html_str:
+        return html_str
+    return ASSET_REF.sub(lambda m: _data_uri(m.group(1)), html_str)
@@ -0,0 +1,174 @@
+"""
+Bulk generation through Anthropic's Message Batches API.
+
+'jobb apply --batch' puts every CV request into one Message Batch. Polling picks up
+the finished CVs, stores them, and submits a second batch with the cover letters,
+whose prompts need the generated CV summary. Once that batch ends the cover letters
+are stored and the batch moves to "rendering"; it only becomes "collected" when every
+application in it has its PDFs and documents, so an interrupted or failed render is
+retried by the next poll. Batch IDs and per-job results are kept in the
+generation_batches / generation_batch_items tables, so polling can happen in a later
+process — typically the next morning.
+
+Every function takes the client as an argument; tests/fake_anthropic.py is a local
+stand-in for the batch endpoints that runs the whole flow.
+"""
+import json
+from datetime import datetime, timezone
+
+import anthropic
+
+from models import Job, Profile, Research, GenerationBatch, GenerationBatchItem
+from services.call_log import get_call_log
+from services.generation import (
+    GeneratedApplication,
+    cv_request,
+    cover_letter_request,
+    cv_content_from_json,
+    _serialize_profile,
+)
+
+
+def _custom_id(job_id: int) -> str:
+    return f"job-{job_id}"
+
+
+def _research_summary(session, job_id: int) -> str | None:
+    research = session.query(Research).filter_by(job_id=job_id).first()
+    return research.summary if research else None
+
+
+def _submit(client: anthropic.Anthropic, session, stage: str, requests: list[tuple[int, dict]], feedback: str | None) -> GenerationBatch:
+    response = client.messages.batches.create(requests=[
+        {"custom_id": _custom_id(job_id), "params": params}
+        for job_id, params in requests
+    ])
+    batch = GenerationBatch(anthropic_batch_id=response.id, stage=stage, status="in_progress", feedback=feedback)
+    session.add(batch)
+    session.flush()
+    return batch
+
+
+def submit_cv_batch(
+    client: anthropic.Anthropic,
+    session,
+    profile: Profile,
+    jobs: list[Job],
+    feedback: str | None = None,
+) -> GenerationBatch:
+    """Submit one Message Batch with a CV request per job. Commits the batch record."""
+    requests = [
+        (job.id, cv_request(_serialize_profile(profile, job), job, _research_summary(session, job.id), job.language or "NO"))
+        for job in jobs
+    ]
+    batch = _submit(client, session, "cv", requests, feedback)
+    for job in jobs:
+        session.add(GenerationBatchItem(batch_id=batch.id, job_id=job.id, custom_id=_custom_id(job.id)))
+    session.commit()
+    return batch
+
+
+def refresh_status(client: anthropic.Anthropic, batch: GenerationBatch) -> str:
+    """Ask the API whether the batch has ended. Returns the API's processing_status."""
+    remote = client.messages.batches.retrieve(batch.anthropic_batch_id)
+    if remote.processing_status == "ended" and batch.status == "in_progress":
+        batch.status = "ended"
+    return remote.processing_status
+
+
+def _collect_results(client: anthropic.Anthropic, batch: GenerationBatch) -> dict[str, tuple[str | None, str | None]]:
+    """Map custom_id -> (text, error) for every entry in an ended batch, logging each call."""
+    job_ids = {item.custom_id: item.job_id for item in batch.items}
+    results = {}
+    for entry in client.messages.batches.results(batch.anthropic_batch_id):
+        if entry.result.type == "succeeded":
+            message = entry.result.message
+            text = "".join(b.text for b in message.content if b.type == "text").strip()
+            results[entry.custom_id] = (text, None)
+            get_call_log().record(
+                batch.stage, message.model, message.usage, job_id=job_ids.get(entry.custom_id), batch=True,
+            )
+        else:
+            error = getattr(entry.result, "error", None)
+            results[entry.custom_id] = (None, f"{entry.result.type}: {error}" if error else entry.result.type)
+    return results
+
+
+def collect_cv_batch(client: anthropic.Anthropic, session, batch: GenerationBatch, profile: Profile) -> GenerationBatch | None:
+    """
+    Store the CV results of an ended batch and submit the cover letter batch for every
+    job whose CV parsed. Returns the new batch, or None if no CV succeeded.
+    """
+    results = _collect_results(client, batch)
+    follow_up: list[tuple[GenerationBatchItem, dict]] = []
+
+    for item in batch.items:
+        text, error = results.get(item.custom_id, (None, "missing from batch results"))
+        if text is not None:
+            try:
+                cv_json = json.loads(text)
+                cv_json["summary"]
+            except (ValueError, KeyError) as e:
+                error = f"invalid CV JSON: {e}"
+            else:
+                item.cv_json = text
+                job = item.job
+                follow_up.append((item, cover_letter_request(
+                    _serialize_profile(profile, job), job, cv_json["summary"], _research_summary(session, job.id),
+                    job.language or "NO", feedback=batch.feedback,
+                )))
+        item.error = error
+
+    next_batch = None
+    if follow_up:
+        next_batch = _submit(client, session, "cover_letter", [(i.job_id, params) for i, params in follow_up], batch.feedback)
+        for item, _ in follow_up:
+            session.add(GenerationBatchItem(
+                batch_id=next_batch.id, job_id=item.job_id, custom_id=item.custom_id, cv_json=item.cv_json,
+            ))
+
+    batch.status = "collected"
+    batch.collected_at = datetime.now(timezone.utc)
+    session.commit()
+    return next_batch
+
+
+def collect_cover_letter_batch(client: anthropic.Anthropic, session, batch: GenerationBatch) -> None:
+    """
+    Store the cover letter results of an ended batch on its items and move it to
+    "rendering". Commits, so the results are fetched only once.
+    """
+    results = _collect_results(client, batch)
+    for item in batch.items:
+        text, error = results.get(item.custom_id, (None, "missing from batch results"))
+        item.cover_letter = text
+        item.error = error
+    batch.status = "rendering"
+    session.commit()
+
+
+def pending_applications(batch: GenerationBatch, profile: Profile) -> list[tuple[GenerationBatchItem, GeneratedApplication]]:
+    """Applications of a "rendering" batch that have a cover letter but no PDFs yet."""
+    pending = []
+    for item in batch.items:
+        if item.cover_letter is None or item.rendered_at is not None:
+            continue
+        language = item.job.language or "NO"
+        cv = cv_content_from_json(profile, language, json.loads(item.cv_json))
+        pending.append((item, GeneratedApplication(cv=cv, cover_letter=item.cover_letter, cv_json=item.cv_json)))
+    return pending
+
+
+def mark_rendered(item: GenerationBatchItem) -> None:
+    """Record that item's documents are saved. Set it before the commit that saves them."""
+    item.rendered_at = datetime.now(timezone.utc)
+    item.error = None
+
+
+def finish_if_rendered(batch: GenerationBatch) -> bool:
+    """Mark the batch collected once every item with a cover letter is rendered."""
+    if any(item.cover_letter is not None and item.rendered_at is None for item in batch.items):
+        return False
+    batch.status = "collected"
+    batch.collected_at = datetime.now(timezone.utc)
+    return True
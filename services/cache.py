@@ -0,0 +1,145 @@
+"""
+Content-addressed on-disk cache for Claude responses.
+
+Each entry is keyed on a SHA-256 of the full request (model, parameters, tools and
+messages), so an identical prompt returns the stored text instead of calling the API.
+Entries live in a small SQLite file under data/cache/, expire after a TTL, and the
+least recently used ones are evicted once the store grows past its size limit.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+CACHE_PATH = Path(__file__).parent.parent / "data" / "cache" / "llm.sqlite"
+DEFAULT_TTL_SECONDS = int(os.getenv("JOBB_CACHE_TTL_DAYS", "14")) * 24 * 3600
+DEFAULT_MAX_BYTES = int(os.getenv("JOBB_CACHE_MAX_MB", "200")) * 1024 * 1024
+
+
+def request_key(request: dict) -> str:
+    """Stable hash of a messages.create request body."""
+    payload = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(
+        self,
+        path: Path = CACHE_PATH,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, model TEXT, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_entries_accessed_at ON entries (accessed_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+            self._conn = conn
+        return self._conn
+
+    def _bump(self, conn: sqlite3.Connection, name: str) -> None:
+        conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1)"
+            " ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    def get(self, request: dict) -> str | None:
+        """Return the cached response text for this request, or None on a miss."""
+        key = request_key(request)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] <= self.ttl_seconds:
+                conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+                self._bump(conn, "hits")
+                return row[0]
+            if row:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._bump(conn, "misses")
+            return None
+
+    def set(self, request: dict, value: str) -> None:
+        """Store a response and evict expired / least recently used entries if over budget."""
+        key = request_key(request)
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, model, value, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, request.get("model"), value, size, now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM entries WHERE created_at < ?", (now - self.ttl_seconds,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._bump(conn, "evictions")
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> dict:
+        with self._lock:
+            conn = self._connect()
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            by_model = conn.execute(
+                "SELECT model, COUNT(*), SUM(size) FROM entries GROUP BY model ORDER BY model"
+            ).fetchall()
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+            "by_model": by_model,
+        }
+
+    def clear(self) -> int:
+        """Delete every entry and reset counters. Returns the number of entries removed."""
+        with self._lock:
+            conn = self._connect()
+            removed = conn.execute("DELETE FROM entries").rowcount
+            conn.execute("DELETE FROM counters")
+            conn.execute("VACUUM")
+            return removed
+
+
+_cache: LLMCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> LLMCache:
+    """Return the process-wide cache, created on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache()
+        return _cache
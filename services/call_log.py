@@ -0,0 +1,192 @@
+"""
+Log of every Claude API call, kept in the llm_calls table, and the queries behind
+`jobb stats`.
+
+record() only appends a row to an in-memory buffer. A background thread writes the
+buffer with one INSERT every FLUSH_INTERVAL seconds, or sooner once FLUSH_ROWS rows
+are waiting, and whatever is left is written when the process exits. A failed write
+(for example before the migration has been applied) never fails the command.
+"""
+import atexit
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, text
+from sqlalchemy.exc import SQLAlchemyError
+
+from core.db import get_session
+from models import LLMCall
+
+FLUSH_INTERVAL = 2.0   # seconds
+FLUSH_ROWS = 50
+
+
+def _usage_value(usage, name: str) -> int:
+    value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+    return value or 0
+
+
+def _web_searches(usage) -> int:
+    server_tool_use = usage.get("server_tool_use") if isinstance(usage, dict) else getattr(usage, "server_tool_use", None)
+    return _usage_value(server_tool_use, "web_search_requests") if server_tool_use else 0
+
+
+class CallLog:
+    def __init__(self) -> None:
+        self._rows: list[dict] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._warned = False
+
+    def record(
+        self,
+        stage: str,
+        model: str,
+        usage,
+        latency_ms: float | None = None,
+        ttft_ms: float | None = None,
+        job_id: int | None = None,
+        batch: bool = False,
+    ) -> None:
+        """Queue one call for the log. usage is the response's usage object or a dict of it."""
+        row = {
+            "stage": stage,
+            "job_id": job_id,
+            "model": model,
+            "input_tokens": _usage_value(usage, "input_tokens"),
+            "output_tokens": _usage_value(usage, "output_tokens"),
+            "cache_creation_input_tokens": _usage_value(usage, "cache_creation_input_tokens"),
+            "cache_read_input_tokens": _usage_value(usage, "cache_read_input_tokens"),
+            "web_search_requests": _web_searches(usage),
+            "ttft_ms": ttft_ms,
+            "latency_ms": latency_ms,
+            "batch": batch,
+            "created_at": datetime.now(timezone.utc).replace(tzinfo=None),
+        }
+        with self._lock:
+            self._rows.append(row)
+            waiting = len(self._rows)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="llm-call-log", daemon=True)
+                self._thread.start()
+        if waiting >= FLUSH_ROWS:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(FLUSH_INTERVAL)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Write every queued row now. Returns how many were written."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+            try:
+                with get_session() as session:
+                    session.execute(insert(LLMCall), rows)
+                    session.commit()
+            except SQLAlchemyError as e:
+                if not self._warned:
+                    self._warned = True
+                    print(f"jobb: could not write the LLM call log ({type(e).__name__}); "
+                          "run 'alembic upgrade head'.", file=sys.stderr)
+                return 0
+            return len(rows)
+
+
+_call_log = CallLog()
+atexit.register(_call_log.flush)
+
+
+def get_call_log() -> CallLog:
+    """Return the process-wide call log."""
+    return _call_log
+
+
+# Nearest-rank percentiles with window functions: within each group, the p-th
+# percentile is the smallest value whose rank is at least p * count.
+_STATS_SQL = """
+WITH calls AS (
+    SELECT {key} AS grp, * FROM llm_calls WHERE created_at >= :since
+),
+ranked AS (
+    SELECT grp, latency_ms,
+           ROW_NUMBER() OVER (PARTITION BY grp ORDER BY latency_ms) AS rn,
+           COUNT(*) OVER (PARTITION BY grp) AS n
+    FROM calls WHERE latency_ms IS NOT NULL
+),
+ranked_ttft AS (
+    SELECT grp, ttft_ms,
+           ROW_NUMBER() OVER (PARTITION BY grp ORDER BY ttft_ms) AS rn,
+           COUNT(*) OVER (PARTITION BY grp) AS n
+    FROM calls WHERE ttft_ms IS NOT NULL
+),
+latency AS (
+    SELECT grp,
+           MIN(CASE WHEN rn >= 0.50 * n THEN latency_ms END) AS p50,
+           MIN(CASE WHEN rn >= 0.95 * n THEN latency_ms END) AS p95
+    FROM ranked GROUP BY grp
+),
+ttft AS (
+    SELECT grp, MIN(CASE WHEN rn >= 0.50 * n THEN ttft_ms END) AS p50
+    FROM ranked_ttft GROUP BY grp
+)
+SELECT c.grp, COUNT(*) AS calls,
+       SUM(c.input_tokens), SUM(c.output_tokens),
+       SUM(c.cache_creation_input_tokens), SUM(c.cache_read_input_tokens),
+       SUM(c.web_search_requests),
+       ttft.p50, latency.p50, latency.p95
+FROM calls c
+LEFT JOIN latency ON latency.grp = c.grp
+LEFT JOIN ttft ON ttft.grp = c.grp
+GROUP BY c.grp
+ORDER BY c.grp
+"""
+
+_GROUP_KEYS = {"stage": "stage", "day": "date(created_at)"}
+
+STATS_COLUMNS = (
+    "group", "calls", "input_tokens", "output_tokens", "cache_creation_input_tokens",
+    "cache_read_input_tokens", "web_search_requests", "ttft_p50_ms", "latency_p50_ms", "latency_p95_ms",
+)
+
+
+def call_stats(session, group_by: str, days: int) -> list[dict]:
+    """Per-stage or per-day totals and latency percentiles over the last `days` days."""
+    since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=days)
+    rows = session.execute(text(_STATS_SQL.format(key=_GROUP_KEYS[group_by])), {"since": since})
+    return [dict(zip(STATS_COLUMNS, row)) for row in rows]
+
+
+def application_tokens(session, days: int) -> dict:
+    """
+    Average tokens spent per application: every logged call for jobs that had a CV or
+    cover letter written in the window (their research included), over those jobs.
+    """
+    since = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=days)
+    row = session.execute(text("""
+        SELECT COUNT(DISTINCT job_id),
+               SUM(input_tokens + cache_creation_input_tokens + cache_read_input_tokens),
+               SUM(output_tokens), SUM(web_search_requests)
+        FROM llm_calls
+        WHERE created_at >= :since AND job_id IN (
+            SELECT job_id FROM llm_calls
+            WHERE created_at >= :since AND stage IN ('cv', 'cover_letter') AND job_id IS NOT NULL
+        )
+    """), {"since": since}).one()
+    applications, input_tokens, output_tokens, searches = row
+    if not applications:
+        return {"applications": 0}
+    return {
+        "applications": applications,
+        "input_tokens": input_tokens / applications,
+        "output_tokens": output_tokens / applications,
+        "web_search_requests": searches / applications,
+    }
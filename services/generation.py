@@ -2,20 +2,48 @@
 Uses Claude to generate tailored CV content and cover letters.
 
 Claude receives a full profile + job description and returns structured JSON
-with content ready to be dropped into the HTML template.
+with content ready to be dropped into the HTML template. The CV response is
+streamed, and the cover letter request is started as soon as the CV summary
+has arrived, so the two calls overlap.
+
+Prompts are split so the stable part (profile, guidelines, instructions) sits in
+system blocks marked with cache_control, and only the job-specific content goes
+in the user message. Across a batch of applications the prefix is then read from
+Anthropic's prompt cache instead of being processed again on every call.
 """
+import contextvars
+import hashlib
 import json
 import os
-from dataclasses import dataclass
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass, field
 from pathlib import Path
 
 import anthropic
 from dotenv import load_dotenv
 
 from models import Profile, Job, Research
-
+from services.cache import LLMCache, get_cache
+from services.call_log import get_call_log
+from services.profile_selection import (
+    PROFILE_TOKEN_BUDGET, ProfileSelection, older_roles_line, role_lines, select_profile,
+)
+from services.scheduler import get_scheduler
+from services.tracing import span
+
+MODEL = "claude-sonnet-4-6"
 GUIDELINES_PATH = Path(__file__).parent.parent / "data" / "guidelines" / "cover_letter_style.md"
 
+USAGE_FIELDS = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
 
 def _load_guidelines() -> str | None:
     if GUIDELINES_PATH.exists():
@@ -45,9 +73,79 @@ class CVContent:
 class GeneratedApplication:
     cv: CVContent
     cover_letter: str          # plain text / markdown paragraphs
+    cv_json: str | None = None  # Claude's CV JSON, stored so the cover letter can be redone alone
+    usage: dict[str, int] = field(default_factory=dict)  # summed token counts, see USAGE_FIELDS
+
+
+def _usage_dict(usage) -> dict[str, int]:
+    return {name: getattr(usage, name, None) or 0 for name in USAGE_FIELDS}
+
+
+def add_usage(total: dict[str, int], usage: dict[str, int]) -> dict[str, int]:
+    """Add one usage dict into a running total (in place) and return it."""
+    for name in USAGE_FIELDS:
+        total[name] = total.get(name, 0) + usage.get(name, 0)
+    return total
+
+
+def _profile_content(profile: Profile) -> tuple:
+    """Every profile value that ends up in the prompt, as plain data."""
+    return (
+        profile.full_name, profile.email, profile.phone, profile.location,
+        profile.linkedin_url, profile.github_url, profile.summary, profile.interests,
+        tuple(
+            (w.title, w.company, str(w.start_date), str(w.end_date) if w.end_date else None, w.description)
+            for w in profile.work_experiences
+        ),
+        tuple(
+            (e.degree, e.field, e.institution, str(e.start_date), str(e.end_date) if e.end_date else None)
+            for e in profile.educations
+        ),
+        tuple((s.category, s.name) for s in profile.skills),
+    )
+
+
+def _profile_hash(profile: Profile) -> str:
+    return hashlib.sha256(repr(_profile_content(profile)).encode("utf-8")).hexdigest()
+
+
+# Most recently used serializations. A trimmed profile is keyed per job, so the cache is
+# bounded rather than growing for every job of a long batch run.
+PROFILE_TEXT_CACHE_SIZE = 64
+_profile_text_cache: OrderedDict[str, str] = OrderedDict()
+_profile_text_lock = threading.Lock()
+
+
+def profile_selection(profile: Profile, job: Job, budget: int = PROFILE_TOKEN_BUDGET) -> ProfileSelection:
+    """What of the profile would be sent for job (see services.profile_selection)."""
+    return select_profile(profile, job, budget, render=_render_profile)
+
 
+def _serialize_profile(profile: Profile, job: Job | None = None) -> str:
+    """
+    Serialize the profile for the prompt, trimmed to the token budget for job if one is
+    given. Memoized on a hash of the content so the text is built once per job (once
+    per batch while the full profile fits) and stays byte-identical for prompt caching.
+    """
+    key = _profile_hash(profile)
+    if job is not None:
+        key += hashlib.sha256(f"{PROFILE_TOKEN_BUDGET}\n{job.title}\n{job.description}".encode("utf-8")).hexdigest()
+    with _profile_text_lock:
+        cached = _profile_text_cache.get(key)
+        if cached is not None:
+            _profile_text_cache.move_to_end(key)
+            return cached
 
-def _serialize_profile(profile: Profile) -> str:
+    selection = profile_selection(profile, job) if job is not None else None
+    text = _render_profile(profile, selection)
+    with _profile_text_lock:
+        _profile_text_cache[key] = text
+        if len(_profile_text_cache) > PROFILE_TEXT_CACHE_SIZE:
+            _profile_text_cache.popitem(last=False)
+    return text
+
+
+def _render_profile(profile: Profile, selection: ProfileSelection | None = None) -> str:
     lines = [
         f"Name: {profile.full_name}",
         f"Email: {profile.email}",
@@ -60,11 +158,10 @@ def _serialize_profile(profile: Profile) -> str:
         "",
         "## Work Experience",
     ]
-    for w in profile.work_experiences:
-        end = str(w.end_date) if w.end_date else "present"
-        lines.append(f"- {w.title} at {w.company} ({w.start_date} – {end})")
-        if w.description:
-            lines.append(f"  {w.description}")
+    for w in selection.roles if selection else profile.work_experiences:
+        lines.extend(role_lines(w))
+    if selection and selection.older_roles:
+        lines.append(older_roles_line(selection.older_roles))
 
     lines.append("")
     lines.append("## Education")
@@ -76,7 +173,7 @@ def _serialize_profile(profile: Profile) -> str:
     lines.append("")
     lines.append("## Skills")
     by_cat: dict[str, list[str]] = {}
-    for s in profile.skills:
+    for s in selection.skills if selection else profile.skills:
         by_cat.setdefault(s.category or "General", []).append(s.name)
     for cat, names in by_cat.items():
         lines.append(f"- {cat}: {', '.join(names)}")
@@ -84,22 +181,23 @@ def _serialize_profile(profile: Profile) -> str:
     return "\n".join(lines)
 
 
-def _build_cv_prompt(profile_text: str, job: Job, research_summary: str | None, language: str) -> str:
-    lang_instruction = (
-        "Write everything in Norwegian (Bokmål)." if language == "NO"
-        else "Write everything in English."
-    )
+def _profile_block(profile_text: str) -> dict:
+    # Shared by the CV and cover letter calls, so it is its own cache breakpoint.
+    return {
+        "type": "text",
+        "text": f"You are an expert career coach and CV writer working for this candidate.\n\n## Candidate Profile\n{profile_text}",
+        "cache_control": {"type": "ephemeral"},
+    }
+
 
-    research_section = (
+def _research_section(research_summary: str | None) -> str:
+    return (
         f"\n\n## Company Research\n{research_summary}" if research_summary
         else ""
     )
 
-    return f"""You are an expert career coach and CV writer.
 
-{lang_instruction}
-
-Given the candidate's profile and the job description, generate a tailored CV in JSON format.
+CV_INSTRUCTIONS = """Given the candidate's profile and the job description, generate a tailored CV in JSON format.
 
 The CV should:
 - Highlight experiences and skills most relevant to this specific job
@@ -108,46 +206,68 @@ The CV should:
 - Be honest — do not invent skills or experience
 
 Return ONLY valid JSON, no markdown code fences, with this exact structure:
-{{
+{
   "summary": "tailored professional summary",
   "experiences": [
-    {{
+    {
       "company": "Company Name",
       "title": "Job Title",
       "period": "Jan 2020 – present",
       "bullets": ["Achievement or responsibility", "..."]
-    }}
+    }
   ],
   "educations": [
-    {{
+    {
       "institution": "University Name",
       "degree": "Master",
       "field": "Computer Science",
       "period": "2015 – 2019"
-    }}
+    }
   ],
   "skills": [
-    {{
+    {
       "category": "Programming",
       "names": ["Python", "JavaScript"]
-    }}
+    }
   ],
   "interests": "short interests text"
-}}
+}"""
 
----
 
-## Candidate Profile
-{profile_text}
+COVER_LETTER_INSTRUCTIONS = """Write a compelling, genuine cover letter for this job application. It should:
+- Be 3–4 paragraphs, conversational but professional
+- Open with a strong hook — not "I am applying for..."
+- Reference specific things about the company that make this candidate a good fit
+- Connect the candidate's actual experience to the job's needs
+- Close with confidence, not desperation
+- Sound like a real person, not a template
+
+Return ONLY the cover letter text. No subject line, no date, no salutation header needed."""
+
+
+def _build_cv_prompt(
+    profile_text: str, job: Job, research_summary: str | None, language: str
+) -> tuple[list[dict], str]:
+    """Return (system blocks, user message) for the CV call."""
+    lang_instruction = (
+        "Write everything in Norwegian (Bokmål)." if language == "NO"
+        else "Write everything in English."
+    )
+    system = [
+        _profile_block(profile_text),
+        {"type": "text", "text": CV_INSTRUCTIONS, "cache_control": {"type": "ephemeral"}},
+    ]
+    user = f"""{lang_instruction}
 
 ## Job Description
 Title: {job.title}
 Company: {job.company}
-{research_section}
+{_research_section(research_summary)}
 
 Description:
 {job.description}
 """
+    return system, user
 
 
 def _build_cover_letter_prompt(
@@ -157,15 +277,12 @@ def _build_cover_letter_prompt(
     research_summary: str | None,
     language: str,
     feedback: str | None = None,
-) -> str:
+) -> tuple[list[dict], str]:
+    """Return (system blocks, user message) for the cover letter call."""
     lang_instruction = (
         "Write the cover letter in Norwegian (Bokmål)." if language == "NO"
         else "Write the cover letter in English."
     )
-    research_section = (
-        f"\n\n## Company Research\n{research_summary}" if research_summary
-        else ""
-    )
     guidelines = _load_guidelines()
     guidelines_section = (
         f"\n\n## Writing Style Guidelines (from previous cover letters — use as inspiration, not a template)\n{guidelines}"
@@ -175,78 +292,215 @@ def _build_cover_letter_prompt(
         f"\n\n## Specific Feedback to Apply\n{feedback}"
         if feedback else ""
     )
-
-    return f"""You are an expert career coach.
-
-{lang_instruction}
-
-Write a compelling, genuine cover letter for this job application. It should:
-- Be 3–4 paragraphs, conversational but professional
-- Open with a strong hook — not "I am applying for..."
-- Reference specific things about the company that make this candidate a good fit
-- Connect the candidate's actual experience to the job's needs
-- Close with confidence, not desperation
-- Sound like a real person, not a template
-{guidelines_section}
+    system = [
+        _profile_block(profile_text),
+        {
+            "type": "text",
+            "text": COVER_LETTER_INSTRUCTIONS + guidelines_section,
+            "cache_control": {"type": "ephemeral"},
+        },
+    ]
+    user = f"""{lang_instruction}
 {feedback_section}
 
-Return ONLY the cover letter text. No subject line, no date, no salutation header needed.
-
----
-
-## Candidate Profile
-{profile_text}
-
 ## Tailored Summary (already generated for CV)
 {cv_summary}
 
 ## Job
 Title: {job.title}
 Company: {job.company}
-{research_section}
+{_research_section(research_summary)}
 
 Description:
 {job.description}
 """
-
-
-def generate_application(profile: Profile, job: Job, research: Research | None = None, feedback: str | None = None) -> GeneratedApplication:
+    return system, user
+
+
+class _JSONMemberScanner:
+    """
+    Incremental scanner for a streamed JSON object.
+
+    Feed it text chunks as they arrive; it reports top-level string members
+    (e.g. "summary") the moment their closing quote is seen, without waiting
+    for the rest of the document. Nested values are skipped.
+    """
+
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._buf: list[str] = []
+        self._key: str | None = None
+        self._expect_value = False
+
+    def feed(self, chunk: str) -> list[str]:
+        """Consume a chunk and return the keys whose string values completed in it."""
+        completed = []
+        for ch in chunk:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        text = json.loads('"' + "".join(self._buf) + '"')
+                        if self._expect_value:
+                            self.values[self._key] = text
+                            completed.append(self._key)
+                            self._key, self._expect_value = None, False
+                        else:
+                            self._key = text
+                    continue
+                if self._depth == 1:
+                    self._buf.append(ch)
+            elif ch == '"':
+                self._in_string = True
+                self._buf = []
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 2:
+                    self._expect_value = False
+            elif ch in "}]":
+                self._depth -= 1
+            elif self._depth == 1 and ch == ":":
+                self._expect_value = True
+            elif self._depth == 1 and ch == ",":
+                self._key, self._expect_value = None, False
+        return completed
+
+
+def _stream_cv_json(
+    client: anthropic.Anthropic, request: dict, on_summary, cache: LLMCache | None, job_id: int | None = None
+) -> tuple[dict, dict[str, int]]:
+    """
+    Stream the CV response, calling on_summary(text) as soon as the summary value is complete.
+    Returns (cv_json, usage).
+    """
+    with span("llm: cv", model=request["model"]) as s:
+        cached = cache.get(request) if cache else None
+        if cached is not None:
+            s.attrs["cached"] = True
+            cv_json = json.loads(cached)
+            on_summary(cv_json["summary"])
+            return cv_json, {}
+
+        def stream_once() -> tuple[str, dict[str, int]]:
+            # Restarted from scratch if the scheduler retries a failed stream.
+            scanner = _JSONMemberScanner()
+            chunks: list[str] = []
+            started = time.perf_counter()
+            with client.messages.stream(**request) as stream:
+                for text in stream.text_stream:
+                    if not chunks:
+                        s.attrs["ttft_ms"] = round((time.perf_counter() - started) * 1000)
+                    chunks.append(text)
+                    if "summary" in scanner.feed(text):
+                        on_summary(scanner.values["summary"])
+                usage = stream.get_final_message().usage
+            get_call_log().record(
+                "cv", request["model"], usage, latency_ms=(time.perf_counter() - started) * 1000,
+                ttft_ms=s.attrs.get("ttft_ms"), job_id=job_id,
+            )
+            return "".join(chunks), _usage_dict(usage)
+
+        raw, usage = get_scheduler().call(request, stream_once, usage=lambda result: result[1])
+        s.attrs["output_tokens"] = usage["output_tokens"]
+        cv_json = json.loads(raw)
+        if cache:
+            cache.set(request, raw)
+        return cv_json, usage
+
+
+def _write_cover_letter(
+    client: anthropic.Anthropic, request: dict, cache: LLMCache | None, on_text=None, job_id: int | None = None
+) -> tuple[str, dict[str, int]]:
+    """Stream the cover letter, passing text deltas to on_text if given. Returns (text, usage)."""
+    with span("llm: cover letter", model=request["model"]) as s:
+        cached = cache.get(request) if cache else None
+        if cached is not None:
+            s.attrs["cached"] = True
+            if on_text:
+                on_text(cached)
+            return cached, {}
+
+        def stream_once():
+            started = time.perf_counter()
+            s.attrs.pop("ttft_ms", None)
+            with client.messages.stream(**request) as stream:
+                for delta in stream.text_stream:
+                    s.attrs.setdefault("ttft_ms", round((time.perf_counter() - started) * 1000))
+                    if on_text:
+                        on_text(delta)
+                message = stream.get_final_message()
+            get_call_log().record(
+                "cover_letter", request["model"], message.usage, latency_ms=(time.perf_counter() - started) * 1000,
+                ttft_ms=s.attrs.get("ttft_ms"), job_id=job_id,
+            )
+            return message
+
+        cl_response = get_scheduler().call(request, stream_once)
+        s.attrs["output_tokens"] = cl_response.usage.output_tokens
+        text = cl_response.content[0].text.strip()
+        if cache:
+            cache.set(request, text)
+        return text, _usage_dict(cl_response.usage)
+
+
+def get_client() -> anthropic.Anthropic:
+    """
+    Build a client from ANTHROPIC_API_KEY. ANTHROPIC_BASE_URL, if set, is honoured by
+    the SDK, which is how a local stand-in for the API can be used.
+    """
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
         raise RuntimeError("ANTHROPIC_API_KEY not set in .env")
+    return anthropic.Anthropic(api_key=api_key)
 
-    client = anthropic.Anthropic(api_key=api_key)
-    language = job.language or "NO"
-    profile_text = _serialize_profile(profile)
-    research_summary = research.summary if research else None
 
-    # Step 1: generate CV content
-    cv_prompt = _build_cv_prompt(profile_text, job, research_summary, language)
-    cv_response = client.messages.create(
-        model="claude-sonnet-4-6",
-        max_tokens=4096,
-        messages=[{"role": "user", "content": cv_prompt}],
-    )
-    cv_json = json.loads(cv_response.content[0].text)
+def cv_request(profile_text: str, job: Job, research_summary: str | None, language: str) -> dict:
+    """The messages.create body for the CV call."""
+    system, user = _build_cv_prompt(profile_text, job, research_summary, language)
+    return {
+        "model": MODEL,
+        "max_tokens": 4096,
+        "system": system,
+        "messages": [{"role": "user", "content": user}],
+    }
 
-    # Step 2: generate cover letter
-    cl_prompt = _build_cover_letter_prompt(
-        profile_text, job, cv_json["summary"], research_summary, language, feedback=feedback
-    )
-    cl_response = client.messages.create(
-        model="claude-sonnet-4-6",
-        max_tokens=2048,
-        messages=[{"role": "user", "content": cl_prompt}],
+
+def cover_letter_request(
+    profile_text: str,
+    job: Job,
+    cv_summary: str,
+    research_summary: str | None,
+    language: str,
+    feedback: str | None = None,
+) -> dict:
+    """The messages.create body for the cover letter call."""
+    system, user = _build_cover_letter_prompt(
+        profile_text, job, cv_summary, research_summary, language, feedback=feedback
     )
-    cover_letter_text = cl_response.content[0].text.strip()
+    return {
+        "model": MODEL,
+        "max_tokens": 2048,
+        "system": system,
+        "messages": [{"role": "user", "content": user}],
+    }
 
+
+def cv_content_from_json(profile: Profile, language: str, cv_json: dict) -> CVContent:
+    """Combine Claude's CV JSON with the profile's contact details."""
     # Build skills grouped
     skills_grouped = [
         {"category": s["category"], "names": s["names"]}
         for s in cv_json.get("skills", [])
     ]
 
-    cv_content = CVContent(
+    return CVContent(
         name=profile.full_name,
         email=profile.email,
         phone=profile.phone or "",
@@ -261,4 +515,93 @@ def generate_application(profile: Profile, job: Job, research: Research | None =
         interests=cv_json.get("interests", profile.interests or ""),
     )
 
-    return GeneratedApplication(cv=cv_content, cover_letter=cover_letter_text)
+
+def generate_application(
+    profile: Profile,
+    job: Job,
+    research: Research | None = None,
+    feedback: str | None = None,
+    use_cache: bool = True,
+    on_step=None,
+    on_text=None,
+    full_profile: bool = False,
+) -> GeneratedApplication:
+    """
+    Write the CV and cover letter for job. on_step(description) is called as each request
+    starts and on_text(delta) receives the cover letter text as it streams in. The profile
+    is trimmed to what matters for the job unless full_profile is set.
+    """
+    # Retries are left to the scheduler, which also respects the shared rate limits.
+    client = get_client().with_options(max_retries=0)
+    cache = get_cache() if use_cache else None
+    language = job.language or "NO"
+    with span("profile: load + serialize"):  # the lazy-loaded relationships are read here
+        profile_text = _serialize_profile(profile, None if full_profile else job)
+    research_summary = research.summary if research else None
+
+    cover_letter: Future | None = None
+    # The cover letter worker runs in this context, so its spans nest beside the CV's.
+    worker_context = contextvars.copy_context()
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        def start_cover_letter(cv_summary: str) -> None:
+            nonlocal cover_letter
+            if cover_letter is not None:  # a retried CV stream reports its summary again
+                return
+            with span("prompt: cover letter"):
+                cl_request = cover_letter_request(
+                    profile_text, job, cv_summary, research_summary, language, feedback=feedback
+                )
+            if on_step:
+                on_step("Writing cover letter...")
+            cover_letter = pool.submit(
+                worker_context.run, _write_cover_letter, client, cl_request, cache, on_text, job.id
+            )
+
+        # Step 1: stream CV content; step 2 (cover letter) starts once the summary is in
+        if on_step:
+            on_step("Writing CV...")
+        with span("prompt: cv"):
+            request = cv_request(profile_text, job, research_summary, language)
+        cv_json, cv_usage = _stream_cv_json(client, request, start_cover_letter, cache, job.id)
+        if cover_letter is None:
+            start_cover_letter(cv_json["summary"])
+        cover_letter_text, cl_usage = cover_letter.result()
+
+    cv_content = cv_content_from_json(profile, language, cv_json)
+    usage = add_usage(add_usage({}, cv_usage), cl_usage)
+    return GeneratedApplication(
+        cv=cv_content, cover_letter=cover_letter_text,
+        cv_json=json.dumps(cv_json, ensure_ascii=False), usage=usage,
+    )
+
+
+def generate_cover_letter(
+    profile: Profile,
+    job: Job,
+    cv_json: str,
+    research: Research | None = None,
+    feedback: str | None = None,
+    use_cache: bool = True,
+    on_step=None,
+    on_text=None,
+    full_profile: bool = False,
+) -> GeneratedApplication:
+    """
+    Write only the cover letter, reusing a CV generated earlier (its stored JSON).
+    Skips the CV call entirely; other arguments work as in generate_application.
+    """
+    client = get_client().with_options(max_retries=0)
+    cache = get_cache() if use_cache else None
+    language = job.language or "NO"
+    with span("profile: load + serialize"):
+        profile_text = _serialize_profile(profile, None if full_profile else job)
+    cv = cv_content_from_json(profile, language, json.loads(cv_json))
+    with span("prompt: cover letter"):
+        request = cover_letter_request(
+            profile_text, job, cv.summary, research.summary if research else None, language, feedback=feedback,
+        )
+    if on_step:
+        on_step("Writing cover letter...")
+    text, usage = _write_cover_letter(client, request, cache, on_text, job.id)
+    return GeneratedApplication(cv=cv, cover_letter=text, cv_json=cv_json, usage=usage)
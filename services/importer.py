@@ -0,0 +1,204 @@
+"""
+Bulk import of job postings from CSV, JSONL or directories of saved HTML pages.
+
+Records are streamed through generators and inserted in chunks with
+INSERT ... ON CONFLICT DO NOTHING on Job.dedupe_key, so memory stays constant no
+matter how large the input is and postings that are already stored (same normalized
+URL, or same company/title/description when there is no URL) are skipped.
+"""
+import csv
+import json
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Iterator
+
+from bs4 import BeautifulSoup
+from sqlalchemy.dialects.sqlite import insert
+
+from models import Job, job_dedupe_key
+
+CHUNK_SIZE = 500
+SUPPORTED_SUFFIXES = {".csv", ".jsonl", ".ndjson", ".html", ".htm"}
+
+# Accepted column / key names for each Job field, first match wins.
+FIELD_ALIASES = {
+    "company": ("company", "company_name", "employer", "organization"),
+    "title": ("title", "job_title", "position", "role"),
+    "description": ("description", "job_description", "body", "text"),
+    "url": ("url", "link", "job_url", "posting_url"),
+    "deadline": ("deadline", "apply_by", "closing_date", "application_deadline"),
+    "language": ("language", "lang"),
+    "notes": ("notes", "note"),
+}
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    inserted: int = 0
+    skipped: int = 0      # malformed records, or records missing company, title or description
+
+    @property
+    def duplicates(self) -> int:
+        return self.read - self.skipped - self.inserted
+
+
+def _pick(raw: dict, field: str):
+    lowered = {str(k).strip().lower(): v for k, v in raw.items() if k is not None}
+    for alias in FIELD_ALIASES[field]:
+        value = lowered.get(alias)
+        if value not in (None, ""):
+            return value.strip() if isinstance(value, str) else value
+    return None
+
+
+def _parse_deadline(value) -> date | None:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _to_row(raw: dict, default_language: str) -> dict | None:
+    """
+    Map a raw record onto Job columns, or None if it lacks the required fields or any
+    field holds something other than text or a number (a JSON list or object).
+    """
+    if any(not isinstance(_pick(raw, field), (str, int, float, type(None))) for field in FIELD_ALIASES):
+        return None
+    company, title, description = _pick(raw, "company"), _pick(raw, "title"), _pick(raw, "description")
+    if not (company and title and description):
+        return None
+    notes = _pick(raw, "notes")
+    url = _pick(raw, "url")
+    language = str(_pick(raw, "language") or default_language).upper()[:2]
+    return {
+        "company": str(company)[:200],
+        "title": str(title)[:200],
+        "description": str(description),
+        "url": str(url)[:1000] if url else None,
+        "deadline": _parse_deadline(_pick(raw, "deadline")),
+        "language": language if language in ("NO", "EN") else default_language,
+        "notes": str(notes) if notes is not None else None,
+        "dedupe_key": job_dedupe_key(str(url) if url else None, str(company), str(title), str(description)),
+    }
+
+
+def _is_utf8(value) -> bool:
+    """False for text holding bytes that weren't valid UTF-8 (read with surrogateescape)."""
+    try:
+        value.encode("utf-8")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _iter_csv(path: Path) -> Iterator[dict | None]:
+    """Yield each row, or None for a row the csv module rejects or that isn't valid UTF-8."""
+    with path.open(newline="", encoding="utf-8-sig", errors="surrogateescape") as f:
+        reader = csv.DictReader(f)
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error:
+                yield None
+                continue
+            values = [v for v in row.values() if isinstance(v, str)]
+            yield row if all(_is_utf8(v) for v in values) else None
+
+
+def _iter_jsonl(path: Path) -> Iterator[dict | None]:
+    """Yield each line's record, or None for a line that isn't valid UTF-8 JSON."""
+    with path.open("rb") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line.decode("utf-8"))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    yield None
+
+
+def _meta(soup: BeautifulSoup, *names: str) -> str | None:
+    for name in names:
+        tag = soup.find("meta", attrs={"property": name}) or soup.find("meta", attrs={"name": name})
+        if tag and tag.get("content"):
+            return tag["content"].strip()
+    return None
+
+
+def _iter_html(path: Path) -> Iterator[dict]:
+    """Best-effort extraction from a saved posting page (Open Graph tags, then page content)."""
+    soup = BeautifulSoup(path.read_text(encoding="utf-8", errors="replace"), "html.parser")
+    canonical = soup.find("link", rel="canonical")
+    title = _meta(soup, "og:title", "twitter:title") or (soup.title.string.strip() if soup.title and soup.title.string else None)
+    company = _meta(soup, "og:site_name", "author", "hiringOrganization")
+    for tag in soup(["script", "style", "nav", "header", "footer", "noscript"]):
+        tag.decompose()
+    body = soup.find("main") or soup.find("article") or soup.body or soup
+    description = "\n".join(line.strip() for line in body.get_text("\n").splitlines() if line.strip())
+    yield {
+        "company": company,
+        "title": title,
+        "description": description,
+        "url": (canonical.get("href") if canonical else None) or _meta(soup, "og:url"),
+    }
+
+
+def _iter_file(path: Path) -> Iterator[dict | None]:
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        yield from _iter_csv(path)
+    elif suffix in (".jsonl", ".ndjson"):
+        yield from _iter_jsonl(path)
+    elif suffix in (".html", ".htm"):
+        yield from _iter_html(path)
+
+
+def iter_records(path: Path) -> Iterator[dict | None]:
+    """
+    Yield raw records from a file, or from every supported file under a directory.
+    Malformed rows and lines come through as None and non-object lines as-is; the caller skips them.
+    """
+    if path.is_dir():
+        for child in sorted(path.rglob("*")):
+            if child.is_file() and child.suffix.lower() in SUPPORTED_SUFFIXES:
+                yield from _iter_file(child)
+    else:
+        yield from _iter_file(path)
+
+
+def import_jobs(session, path: Path, default_language: str = "NO", on_chunk=None) -> ImportStats:
+    """
+    Stream records from path into the jobs table in chunks of CHUNK_SIZE.
+    on_chunk(stats) is called after each committed chunk.
+    """
+    stats = ImportStats()
+    statement = insert(Job).on_conflict_do_nothing(index_elements=["dedupe_key"])
+    chunk: list[dict] = []
+
+    def flush() -> None:
+        result = session.connection().execute(statement, chunk)
+        session.commit()
+        stats.inserted += result.rowcount
+        chunk.clear()
+        if on_chunk:
+            on_chunk(stats)
+
+    for raw in iter_records(path):
+        stats.read += 1
+        row = _to_row(raw, default_language) if isinstance(raw, dict) else None
+        if row is None:
+            stats.skipped += 1
+            continue
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            flush()
+    if chunk:
+        flush()
+    return stats
@@ -0,0 +1,162 @@
+"""
+Garbage collection for data/output/.
+
+Every 'jobb apply' writes a new directory named by cli.apply._safe_dirname
+(<company>_<title>_<job id>_<YYYYmmdd_HHMMSS>), and nothing removed old ones. plan_gc()
+decides per directory what to keep:
+
+- directories holding the PDF of a job's newest CV or newest cover letter Document
+  (pdf_path) always stay; older documents don't protect theirs, or every apply
+  iteration would be kept forever;
+- directories of jobs that no longer exist are orphans and go;
+- of the rest, the `keep` newest per job stay (none with referenced_only).
+
+Documents whose PDF is deleted get their pdf_path cleared.
+
+Directories whose names don't follow that pattern were not made by jobb and are left
+alone. Afterwards, assets (services.assets) that no remaining HTML file links to are
+removed too, except very recent ones, which an apply running right now may have stored
+without having written its HTML yet.
+"""
+import re
+import shutil
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from sqlalchemy import select, update
+
+from models import Application, Document, Job
+from services.assets import ASSET_DIR, asset_names
+
+OUTPUT_DIR = Path(__file__).parent.parent / "data" / "output"
+ASSET_GRACE_SECONDS = 3600
+
+# The job id and timestamp _safe_dirname appends.
+_DIRNAME = re.compile(r"_(\d+)_(\d{8}_\d{6})$")
+
+
+@dataclass
+class OutputDir:
+    path: Path
+    job_id: int | None
+    created: str            # _safe_dirname timestamp; sorts chronologically
+    size: int
+    keep: bool = True
+    reason: str = ""        # "referenced", "newest", "old", "unreferenced", "orphan" or "unknown"
+    documents: list[int] = field(default_factory=list)   # ids of Documents whose PDF is in here
+
+
+@dataclass
+class GcPlan:
+    dirs: list[OutputDir] = field(default_factory=list)
+    assets: list[tuple[Path, int]] = field(default_factory=list)   # unreferenced assets, with sizes
+
+    @property
+    def removed(self) -> list[OutputDir]:
+        return [d for d in self.dirs if not d.keep]
+
+    @property
+    def reclaimable(self) -> int:
+        return sum(d.size for d in self.removed) + sum(size for _, size in self.assets)
+
+
+def _tree_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def _documents(session) -> tuple[set[Path], dict[Path, list[int]]]:
+    """
+    Directories holding the PDF of each job's newest CV and newest cover letter, and
+    the ids of all documents per directory.
+    """
+    newest: dict[tuple[int, str], Path] = {}
+    by_dir: dict[Path, list[int]] = {}
+    rows = session.execute(
+        select(Document.id, Application.job_id, Document.type, Document.pdf_path)
+        .join(Application, Application.id == Document.application_id)
+        .where(Document.pdf_path.is_not(None))
+        .order_by(Document.id)
+    )
+    for doc_id, job_id, doc_type, pdf_path in rows:
+        directory = Path(pdf_path).resolve().parent
+        newest[(job_id, doc_type)] = directory     # ids grow with time: the last one wins
+        by_dir.setdefault(directory, []).append(doc_id)
+    return set(newest.values()), by_dir
+
+
+def _scan(session) -> list[OutputDir]:
+    referenced, documents = _documents(session)
+    jobs = set(session.scalars(select(Job.id)))
+
+    dirs: list[OutputDir] = []
+    for path in sorted(OUTPUT_DIR.iterdir()):
+        if not path.is_dir() or path.resolve() == ASSET_DIR.resolve():
+            continue
+        match = _DIRNAME.search(path.name)
+        entry = OutputDir(
+            path=path,
+            job_id=int(match.group(1)) if match else None,
+            created=match.group(2) if match else "",
+            size=_tree_size(path),
+            documents=documents.get(path.resolve(), []),
+        )
+        if match is None:
+            entry.reason = "unknown"
+        elif path.resolve() in referenced:
+            entry.reason = "referenced"
+        elif entry.job_id not in jobs:
+            entry.keep, entry.reason = False, "orphan"
+        dirs.append(entry)
+    return dirs
+
+
+def plan_gc(session, keep: int = 3, referenced_only: bool = False) -> GcPlan:
+    """Work out what 'jobb gc' would delete, without deleting anything."""
+    plan = GcPlan()
+    if not OUTPUT_DIR.exists():
+        return plan
+    plan.dirs = _scan(session)
+
+    by_job: dict[int, list[OutputDir]] = {}
+    for d in plan.dirs:
+        if d.job_id is not None and d.reason != "orphan":
+            by_job.setdefault(d.job_id, []).append(d)
+    for dirs in by_job.values():
+        for rank, d in enumerate(sorted(dirs, key=lambda d: d.created, reverse=True)):
+            if d.reason == "referenced":
+                continue
+            if referenced_only:
+                d.keep, d.reason = False, "unreferenced"
+            elif rank < keep:
+                d.reason = "newest"
+            else:
+                d.keep, d.reason = False, "old"
+
+    if ASSET_DIR.exists():
+        used: set[str] = set()
+        for d in plan.dirs:
+            if d.keep:
+                for html_path in d.path.rglob("*.html"):
+                    used |= asset_names(html_path.read_text(encoding="utf-8", errors="replace"))
+        cutoff = time.time() - ASSET_GRACE_SECONDS
+        for path in sorted(ASSET_DIR.iterdir()):
+            st = path.stat()
+            if path.is_file() and path.name not in used and st.st_mtime < cutoff:
+                plan.assets.append((path, st.st_size))
+    return plan
+
+
+def run_gc(session, plan: GcPlan) -> int:
+    """Delete what plan marks for removal and unlink its documents. Returns the bytes freed."""
+    freed = 0
+    for d in plan.removed:
+        shutil.rmtree(d.path, ignore_errors=True)
+        freed += d.size
+        if d.documents:
+            session.execute(update(Document).where(Document.id.in_(d.documents)).values(pdf_path=None))
+    session.commit()
+    for path, size in plan.assets:
+        path.unlink(missing_ok=True)
+        freed += size
+    return freed
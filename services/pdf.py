@@ -1,19 +1,266 @@
 """
 Renders CV and cover letter to HTML and PDF using Jinja2 templates + Playwright (Chromium).
+
+A single Chromium instance is kept warm for the lifetime of the process. Playwright's
+async API runs on a dedicated event-loop thread owned by PdfRenderer, so callers stay
+synchronous while several documents can be printed at once on separate pages.
+
+Printed PDFs are cached under data/cache/pdf/, keyed on a SHA-256 of the HTML and the
+print settings. Rendering HTML that has been printed before copies the stored PDF
+instead of starting the browser.
+
+The stylesheets and the photo are shared assets (services.assets). The saved HTML
+links to them; they are inlined only for printing. Their names are content hashes, so
+the HTML alone still decides the PDF.
 """
-import base64
+import asyncio
+import atexit
+import contextvars
+import filecmp
+import hashlib
+import json
+import os
+import shutil
+import threading
+from dataclasses import dataclass
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from jinja2 import Environment, FileSystemLoader
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
 
-from services.generation import CVContent
+from services.assets import inline_assets, store_asset
+from services.photo import photo_href
+from services.tracing import span
+
+if TYPE_CHECKING:
+    # Type-only: importing services.generation pulls in anthropic, which 'jobb render' doesn't need.
+    from services.generation import CVContent
 
 TEMPLATES_DIR = Path(__file__).parent.parent / "templates"
 OUTPUT_DIR = Path(__file__).parent.parent / "data" / "output"
-PROFILE_DIR = Path(__file__).parent.parent / "data" / "profile"
+RENDER_CACHE_DIR = Path(__file__).parent.parent / "data" / "cache" / "pdf"
+RENDER_CACHE_MAX_BYTES = int(os.getenv("JOBB_RENDER_CACHE_MB", "200")) * 1024 * 1024
+RENDER_VERSION = 1   # bump when a change outside the HTML (fonts, Chromium flags) alters the output
+
+PDF_OPTIONS = {
+    "format": "A4",
+    "margin": {"top": "0", "right": "0", "bottom": "0", "left": "0"},
+    "print_background": True,
+}
 
 _jinja = Environment(loader=FileSystemLoader(str(TEMPLATES_DIR)), autoescape=True)
+_stylesheets: dict[bytes, str] = {}    # CSS contents -> asset href
+_stylesheet_lock = threading.Lock()
+
+
+def render_key(html_str: str) -> str:
+    """Hash of everything that decides the printed PDF: the HTML and the print settings."""
+    settings = json.dumps({"pdf": PDF_OPTIONS, "version": RENDER_VERSION}, sort_keys=True)
+    return hashlib.sha256(f"{settings}\n{html_str}".encode("utf-8")).hexdigest()
+
+
+def _cache_path(key: str) -> Path:
+    return RENDER_CACHE_DIR / f"{key}.pdf"
+
+
+def _restore(key: str, out_path: Path) -> bool:
+    """Put the cached PDF for key at out_path. False if there is none."""
+    cached = _cache_path(key)
+    if not cached.exists():
+        return False
+    if not (out_path.exists() and filecmp.cmp(cached, out_path, shallow=False)):
+        shutil.copyfile(cached, out_path)
+    os.utime(cached)  # recency for pruning
+    return True
+
+
+def _store(key: str, pdf_path: Path) -> None:
+    RENDER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = RENDER_CACHE_DIR / f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.copyfile(pdf_path, tmp)
+    os.replace(tmp, _cache_path(key))
+
+
+def prune_render_cache(max_bytes: int = RENDER_CACHE_MAX_BYTES) -> int:
+    """Delete the least recently used cached PDFs until the cache fits. Returns bytes freed."""
+    if not RENDER_CACHE_DIR.exists():
+        return 0
+    entries = sorted(
+        ((p.stat(), p) for p in RENDER_CACHE_DIR.glob("*.pdf")),
+        key=lambda entry: entry[0].st_mtime,
+    )
+    total = sum(st.st_size for st, _ in entries)
+    freed = 0
+    for st, path in entries:
+        if total - freed <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        freed += st.st_size
+    return freed
+
+
+@dataclass
+class RenderedFile:
+    html_path: Path
+    pdf_path: Path
+    cached: bool = False            # PDF came from the render cache
+    error: Exception | None = None
+
+
+class PdfRenderer:
+    """
+    Owns one Playwright driver and one lazily launched Chromium browser.
+
+    Every document gets its own short-lived browser context and page, so renders never
+    share state, while the expensive browser startup is paid once per process.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._playwright = None
+        self._browser = None
+        self._browser_lock: asyncio.Lock | None = None
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="pdf-renderer", daemon=True)
+                thread.start()
+                self._loop, self._thread = loop, thread
+            return self._loop
+
+    def _run(self, coro):
+        loop = self._ensure_loop()
+        # Run in the caller's context so tracing spans nest under the caller's span.
+        context = contextvars.copy_context()
+
+        async def in_context():
+            return await loop.create_task(coro, context=context)
+
+        return asyncio.run_coroutine_threadsafe(in_context(), loop).result()
+
+    async def _get_browser(self):
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+        async with self._browser_lock:
+            if self._browser is None or not self._browser.is_connected():
+                with span("chromium: launch"):
+                    if self._playwright is None:
+                        self._playwright = await async_playwright().start()
+                    self._browser = await self._playwright.chromium.launch()
+        return self._browser
+
+    async def _print(self, browser, html_str: str, out_path: Path) -> None:
+        context = await browser.new_context()
+        try:
+            page = await context.new_page()
+            with span("page.set_content", wait_until="networkidle"):
+                await page.set_content(inline_assets(html_str), wait_until="networkidle")
+            with span("page.pdf"):
+                await page.pdf(path=str(out_path), **PDF_OPTIONS)
+        finally:
+            await context.close()
+
+    async def _render_one(self, html_str: str, out_path: Path, browser=None, force: bool = False) -> bool:
+        """Print html_str to out_path unless the render cache has it. True if it was printed."""
+        with span(f"pdf: {out_path.name}") as s:
+            key = render_key(html_str)
+            if not force and _restore(key, out_path):
+                s.attrs["cached"] = True
+                return False
+            await self._print(browser or await self._get_browser(), html_str, out_path)
+            _store(key, out_path)
+            return True
+
+    async def _render_all(self, documents: list[tuple[str, Path]]) -> list[Path]:
+        await asyncio.gather(*(self._render_one(html_str, out_path) for html_str, out_path in documents))
+        return [out_path for _, out_path in documents]
+
+    async def _render_pool(self, documents: list[tuple[str, Path]], workers: int, force: bool, on_done) -> list:
+        """
+        Print documents on `workers` browsers, each taking the next document when it is free.
+        Returns, per document, True (printed), False (from the cache) or the exception raised.
+        """
+        results: list = [None] * len(documents)
+        queue: asyncio.Queue = asyncio.Queue()
+        for i in range(len(documents)):
+            queue.put_nowait(i)
+
+        shared = await self._get_browser()
+        extra = await asyncio.gather(*(self._playwright.chromium.launch() for _ in range(workers - 1)))
+
+        async def worker(browser) -> None:
+            while not queue.empty():
+                i = queue.get_nowait()
+                html_str, out_path = documents[i]
+                try:
+                    results[i] = await self._render_one(html_str, out_path, browser, force)
+                except Exception as e:
+                    results[i] = e
+                if on_done:
+                    on_done(i, results[i])
+
+        try:
+            await asyncio.gather(*(worker(browser) for browser in [shared, *extra]))
+        finally:
+            await asyncio.gather(*(browser.close() for browser in extra), return_exceptions=True)
+        return results
+
+    def render(self, html_str: str, out_path: Path) -> Path:
+        """Print one HTML string to a PDF file."""
+        self._run(self._render_one(html_str, out_path))
+        return out_path
+
+    def render_many(self, documents: list[tuple[str, Path]]) -> list[Path]:
+        """Print several (html, pdf_path) pairs concurrently, each on its own page."""
+        if not documents:
+            return []
+        return self._run(self._render_all(documents))
+
+    def render_pool(self, documents: list[tuple[str, Path]], workers: int = 4, force: bool = False, on_done=None) -> list:
+        """
+        Print many documents across a pool of browser processes. on_done(index, result)
+        is called from the renderer thread as each one finishes. See _render_pool.
+        """
+        if not documents:
+            return []
+        return self._run(self._render_pool(documents, max(1, min(workers, len(documents))), force, on_done))
+
+    async def _shutdown(self) -> None:
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def close(self) -> None:
+        """Close the browser and stop the event-loop thread. Safe to call more than once."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=10)
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+            loop.close()
+            self._browser_lock = None
+
+
+_renderer = PdfRenderer()
+atexit.register(_renderer.close)
+
+
+def get_renderer() -> PdfRenderer:
+    """Return the process-wide renderer."""
+    return _renderer
 
 
 def _ensure_output_dir(subdir: str) -> Path:
@@ -22,30 +269,49 @@ def _ensure_output_dir(subdir: str) -> Path:
     return path
 
 
-def _get_photo_data_uri() -> str | None:
-    """Return a base64 data URI for the profile photo, or None if not found."""
-    for name in ("photo.jpg", "photo.jpeg", "photo.png", "photo.webp"):
-        photo_path = PROFILE_DIR / name
-        if photo_path.exists():
-            ext = photo_path.suffix.lstrip(".")
-            mime = "image/jpeg" if ext in ("jpg", "jpeg") else f"image/{ext}"
-            data = base64.b64encode(photo_path.read_bytes()).decode()
-            return f"data:{mime};base64,{data}"
-    return None
+def _get_photo_href() -> str | None:
+    """Return the asset href of the thumbnailed profile photo, or None if not found."""
+    return photo_href()
+
+
+def _stylesheet(template: str) -> str:
+    """Asset href of the stylesheet next to template (cv.html -> cv.css)."""
+    css = (TEMPLATES_DIR / template).with_suffix(".css").read_bytes()
+    with _stylesheet_lock:
+        href = _stylesheets.get(css)
+        if href is None:
+            href = _stylesheets[css] = store_asset(css, ".css")
+        return href
 
 
 def _html_to_pdf(html_str: str, out_path: Path) -> None:
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page()
-        page.set_content(html_str, wait_until="networkidle")
-        page.pdf(
-            path=str(out_path),
-            format="A4",
-            margin={"top": "0", "right": "0", "bottom": "0", "left": "0"},
-            print_background=True,
+    _renderer.render(html_str, out_path)
+
+
+def _cv_html(cv: "CVContent") -> str:
+    with span("jinja: cv.html"):
+        photo = _get_photo_href()
+        template = _jinja.get_template("cv.html")
+        return template.render(cv=cv, photo=photo, stylesheet=_stylesheet("cv.html"))
+
+
+def _cover_letter_html(cv: "CVContent", cover_letter_text: str, job_title: str, job_company: str) -> str:
+    paragraphs = [p.strip() for p in cover_letter_text.split("\n\n") if p.strip()]
+
+    with span("jinja: cover_letter.html"):
+        template = _jinja.get_template("cover_letter.html")
+        return template.render(
+            name=cv.name,
+            email=cv.email,
+            phone=cv.phone,
+            location=cv.location,
+            linkedin_url=cv.linkedin_url,
+            language=cv.language,
+            stylesheet=_stylesheet("cover_letter.html"),
+            job_title=job_title,
+            job_company=job_company,
+            paragraphs=paragraphs,
         )
-        browser.close()
 
 
 def html_to_pdf(html_path: Path) -> Path:
@@ -56,11 +322,48 @@ def html_to_pdf(html_path: Path) -> Path:
     return out_path
 
 
-def render_cv(cv: CVContent, output_subdir: str) -> tuple[Path, Path]:
+def render_files(html_paths: list[Path], workers: int = 4, force: bool = False, on_done=None) -> list[RenderedFile]:
+    """
+    Convert saved HTML files to PDFs next to them. Files whose HTML was printed before
+    are restored from the render cache without touching the browser (unless force);
+    the rest are printed across `workers` browsers. on_done(RenderedFile) is called as
+    each file finishes. Failures are reported per file rather than raised.
+    """
+    results: list[RenderedFile] = []
+    pending: list[tuple[str, Path]] = []
+    pending_files: list[RenderedFile] = []
+    for html_path in html_paths:
+        item = RenderedFile(html_path=html_path, pdf_path=html_path.with_suffix(".pdf"))
+        results.append(item)
+        try:
+            html_str = html_path.read_text(encoding="utf-8")
+            if not force and _restore(render_key(html_str), item.pdf_path):
+                item.cached = True
+            else:
+                pending.append((html_str, item.pdf_path))
+                pending_files.append(item)
+                continue
+        except OSError as e:
+            item.error = e
+        if on_done:
+            on_done(item)
+
+    def printed(i: int, result) -> None:
+        item = pending_files[i]
+        if isinstance(result, Exception):
+            item.error = result
+        if on_done:
+            on_done(item)
+
+    _renderer.render_pool(pending, workers=workers, force=True, on_done=printed)
+    if pending:
+        prune_render_cache()
+    return results
+
+
+def render_cv(cv: "CVContent", output_subdir: str) -> tuple[Path, Path]:
     """Render CV to both HTML and PDF. Returns (pdf_path, html_path)."""
-    photo = _get_photo_data_uri()
-    template = _jinja.get_template("cv.html")
-    html_str = template.render(cv=cv, photo=photo)
+    html_str = _cv_html(cv)
 
     out_dir = _ensure_output_dir(output_subdir)
     html_path = out_dir / "cv.html"
@@ -72,27 +375,14 @@ def render_cv(cv: CVContent, output_subdir: str) -> tuple[Path, Path]:
 
 
 def render_cover_letter(
-    cv: CVContent,
+    cv: "CVContent",
     cover_letter_text: str,
     job_title: str,
     job_company: str,
     output_subdir: str,
 ) -> tuple[Path, Path]:
     """Render cover letter to both HTML and PDF. Returns (pdf_path, html_path)."""
-    paragraphs = [p.strip() for p in cover_letter_text.split("\n\n") if p.strip()]
-
-    template = _jinja.get_template("cover_letter.html")
-    html_str = template.render(
-        name=cv.name,
-        email=cv.email,
-        phone=cv.phone,
-        location=cv.location,
-        linkedin_url=cv.linkedin_url,
-        language=cv.language,
-        job_title=job_title,
-        job_company=job_company,
-        paragraphs=paragraphs,
-    )
+    html_str = _cover_letter_html(cv, cover_letter_text, job_title, job_company)
 
     out_dir = _ensure_output_dir(output_subdir)
     html_path = out_dir / "cover_letter.html"
@@ -101,3 +391,29 @@ def render_cover_letter(
     html_path.write_text(html_str, encoding="utf-8")
     _html_to_pdf(html_str, pdf_path)
     return pdf_path, html_path
+
+
+def render_application(
+    cv: "CVContent",
+    cover_letter_text: str,
+    job_title: str,
+    job_company: str,
+    output_subdir: str,
+) -> tuple[tuple[Path, Path], tuple[Path, Path]]:
+    """
+    Render CV and cover letter together, printing both PDFs at the same time.
+    Returns ((cv_pdf, cv_html), (cover_letter_pdf, cover_letter_html)).
+    """
+    cv_html = _cv_html(cv)
+    cl_html = _cover_letter_html(cv, cover_letter_text, job_title, job_company)
+
+    out_dir = _ensure_output_dir(output_subdir)
+    cv_html_path = out_dir / "cv.html"
+    cl_html_path = out_dir / "cover_letter.html"
+    cv_pdf_path = out_dir / "cv.pdf"
+    cl_pdf_path = out_dir / "cover_letter.pdf"
+
+    cv_html_path.write_text(cv_html, encoding="utf-8")
+    cl_html_path.write_text(cl_html, encoding="utf-8")
+    _renderer.render_many([(cv_html, cv_pdf_path), (cl_html, cl_pdf_path)])
+    return (cv_pdf_path, cv_html_path), (cl_pdf_path, cl_html_path)
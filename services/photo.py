@@ -0,0 +1,81 @@
+"""
+Profile photo pipeline for the CV header.
+
+The source photo is usually a full-size camera image, but the CV only draws it as a
+72×72 px circle. The first render crops it to a square and downsizes it to print
+resolution; the thumbnail is written to data/cache/photo/ keyed on the source path,
+mtime and size. The CV links to a copy in the shared asset store (services.assets),
+and the href is kept in memory for later renders.
+"""
+import hashlib
+import io
+import threading
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from services.assets import store_asset
+
+PROFILE_DIR = Path(__file__).parent.parent / "data" / "profile"
+THUMB_DIR = Path(__file__).parent.parent / "data" / "cache" / "photo"
+PHOTO_NAMES = ("photo.jpg", "photo.jpeg", "photo.png", "photo.webp")
+
+# 72 CSS px is 0.75 in on paper; 300 DPI gives 225 px, rounded up.
+THUMB_PX = 240
+JPEG_QUALITY = 85
+
+_hrefs: dict[str, str] = {}
+_lock = threading.Lock()
+
+
+def find_photo() -> Path | None:
+    """Return the profile photo in data/profile/, or None if there isn't one."""
+    for name in PHOTO_NAMES:
+        photo_path = PROFILE_DIR / name
+        if photo_path.exists():
+            return photo_path
+    return None
+
+
+def _source_key(photo_path: Path) -> str:
+    stat = photo_path.stat()
+    raw = f"{photo_path.resolve()}|{stat.st_mtime_ns}|{stat.st_size}|{THUMB_PX}|{JPEG_QUALITY}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:24]
+
+
+def _make_thumbnail(photo_path: Path) -> bytes:
+    with Image.open(photo_path) as img:
+        img = ImageOps.exif_transpose(img).convert("RGB")
+        img = ImageOps.fit(img, (THUMB_PX, THUMB_PX), method=Image.Resampling.LANCZOS)
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        return buf.getvalue()
+
+
+def thumbnail_path(photo_path: Path) -> Path:
+    """Path to the cached thumbnail for this photo, creating it if needed."""
+    out = THUMB_DIR / f"{_source_key(photo_path)}.jpg"
+    if not out.exists():
+        THUMB_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = out.with_suffix(".tmp")
+        tmp.write_bytes(_make_thumbnail(photo_path))
+        tmp.replace(out)
+    return out
+
+
+def photo_href() -> str | None:
+    """Return the asset href of the thumbnailed profile photo, or None if there is no photo."""
+    photo_path = find_photo()
+    if photo_path is None:
+        return None
+
+    key = _source_key(photo_path)
+    with _lock:
+        cached = _hrefs.get(key)
+    if cached is not None:
+        return cached
+
+    href = store_asset(thumbnail_path(photo_path).read_bytes(), ".jpg")
+    with _lock:
+        _hrefs[key] = href
+    return href
@@ -0,0 +1,134 @@
+"""
+Chooses which parts of the profile go into the prompts for one job.
+
+Every work experience and skill is scored locally against the job title and
+description: the overlap of their terms, weighted by how often the job mentions each
+term, and for roles discounted by age. While the full profile fits PROFILE_TOKEN_BUDGET
+it is sent unchanged, so the prompt stays identical across jobs and the prompt cache
+keeps working. Past the budget, the best roles (the current one always) are kept in
+full up to MAX_ROLES, the rest are summarized together on one line, and the remaining
+budget is filled with skills, the ones the job mentions first.
+"""
+import math
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date
+
+from models import Job, Profile, Skill, WorkExperience
+from services.ranking import tokenize
+
+PROFILE_TOKEN_BUDGET = int(os.getenv("JOBB_PROFILE_TOKENS", "1500"))
+MAX_ROLES = 5
+ROLE_HALF_LIFE_YEARS = 10   # a role that ended this long ago counts half as much
+CHARS_PER_TOKEN = 4         # same rough estimate the scheduler uses
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def period(start: date, end: date | None) -> str:
+    return f"{start} – {end or 'present'}"
+
+
+def role_lines(w: WorkExperience) -> list[str]:
+    lines = [f"- {w.title} at {w.company} ({period(w.start_date, w.end_date)})"]
+    if w.description:
+        lines.append(f"  {w.description}")
+    return lines
+
+
+def older_roles_line(roles: list[WorkExperience]) -> str:
+    """Roles left out in full, compressed to one line."""
+    items = "; ".join(f"{w.title}, {w.company} ({w.start_date.year}–{w.end_date.year if w.end_date else 'now'})" for w in roles)
+    return f"- Other roles: {items}"
+
+
+@dataclass
+class ProfileSelection:
+    roles: list[WorkExperience]                 # written out in full, in profile order
+    older_roles: list[WorkExperience]           # summarized on one line
+    skills: list[Skill]
+    dropped_skills: list[Skill]
+    full_tokens: int
+    tokens: int = 0
+    scores: dict[int, float] = field(default_factory=dict)   # id(entry) -> relevance
+
+    @property
+    def trimmed(self) -> bool:
+        return bool(self.older_roles or self.dropped_skills)
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.full_tokens - self.tokens
+
+
+def _weights(job: Job) -> dict[str, float]:
+    counts = Counter(tokenize(f"{job.title}\n{job.description}"))
+    return {term: 1 + math.log(n) for term, n in counts.items()}
+
+
+def _relevance(text: str, weights: dict[str, float]) -> float:
+    terms = set(tokenize(text))
+    if not terms:
+        return 0.0
+    return sum(weights.get(t, 0.0) for t in terms) / math.sqrt(len(terms))
+
+
+def _recency(w: WorkExperience, today: date) -> float:
+    years = ((today - w.end_date).days / 365.25) if w.end_date else 0.0
+    return 0.5 ** (max(years, 0.0) / ROLE_HALF_LIFE_YEARS)
+
+
+def select_profile(profile: Profile, job: Job, budget: int = PROFILE_TOKEN_BUDGET, render=None) -> ProfileSelection:
+    """
+    Pick the roles and skills to send for job. render(profile, selection) must produce
+    the prompt text, so every estimate is of the text that is actually sent.
+    """
+    roles = list(profile.work_experiences)
+    skills = list(profile.skills)
+    everything = ProfileSelection(roles, [], skills, [], full_tokens=0)
+    full_tokens = estimate_tokens(render(profile, everything))
+    everything.full_tokens = everything.tokens = full_tokens
+    if full_tokens <= budget:
+        return everything
+
+    weights = _weights(job)
+    today = date.today()
+    scores: dict[int, float] = {}
+    for w in roles:
+        scores[id(w)] = _relevance(f"{w.title}\n{w.description or ''}", weights) * _recency(w, today)
+    for s in skills:
+        scores[id(s)] = _relevance(s.name, weights)
+
+    # Fixed part: everything but roles and skills, plus the worst case of one summary line.
+    base = estimate_tokens(render(profile, ProfileSelection([], roles, [], skills, full_tokens)))
+    remaining = budget - base
+
+    newest = max(roles, key=lambda w: (w.end_date is None, w.end_date or today, w.start_date), default=None)
+    ranked = sorted(roles, key=lambda w: (w is not newest, -scores[id(w)]))
+    kept_roles: set[int] = set()
+    for w in ranked:
+        cost = estimate_tokens("\n".join(role_lines(w)))
+        if w is newest or (len(kept_roles) < MAX_ROLES and cost <= remaining):
+            kept_roles.add(id(w))
+            remaining -= cost
+
+    kept_skills: set[int] = set()
+    for s in sorted(skills, key=lambda s: -scores[id(s)]):  # stable: unmentioned skills keep profile order
+        cost = estimate_tokens(f"{s.name}, ")
+        if cost <= remaining:
+            kept_skills.add(id(s))
+            remaining -= cost
+
+    selection = ProfileSelection(
+        roles=[w for w in roles if id(w) in kept_roles],
+        older_roles=[w for w in roles if id(w) not in kept_roles],
+        skills=[s for s in skills if id(s) in kept_skills],
+        dropped_skills=[s for s in skills if id(s) not in kept_skills],
+        full_tokens=full_tokens,
+        scores=scores,
+    )
+    selection.tokens = estimate_tokens(render(profile, selection))
+    return selection
@@ -0,0 +1,248 @@
+"""
+Local BM25 ranking of stored job postings against the profile, before any API calls.
+
+Every job's title and description is tokenized once into a sparse term-count matrix
+(COO arrays: row, term, count) that is kept under data/cache/ and refreshed
+incrementally: only jobs that are new or whose text_version moved (a trigger bumps it
+on every title or description update) are re-tokenized, and deleted jobs are dropped. Scoring the profile against all jobs is then a single
+vectorized NumPy pass over the matrix entries.
+"""
+import math
+import os
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import select
+
+from models import Job, Profile
+
+INDEX_PATH = Path(__file__).parent.parent / "data" / "cache" / "rank_index.npz"
+FETCH_CHUNK = 500
+EXPLAIN_ROWS = 200   # matched terms are only collected for this many top results
+
+# BM25 parameters (Robertson/Sparck Jones defaults).
+K1 = 1.2
+B = 0.75
+
+# Keeps "c++", "c#" and "node.js"-style pieces together; digits-only tokens are dropped.
+_TOKEN_RE = re.compile(r"[^\W_][\w+#]*")
+STOPWORDS = frozenset(
+    # English
+    "a an and are as at be by for from has have in is it its of on or our that the their this to"
+    " we will with you your who can all any also more other such not into than"
+    # Norwegian
+    " og i på er en et av til for med som det den de vi du har vil skal kan om ved fra"
+    " eller hos seg sin sitt sine oss våre vår ditt din dine etter under over mot ikke"
+    .split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS and not t.isdigit()]
+
+
+def profile_terms(profile: Profile) -> Counter:
+    """Term counts for the profile material that goes into prompts: summary, roles and skills."""
+    parts = [profile.summary or ""]
+    for w in profile.work_experiences:
+        parts.append(w.title)
+        parts.append(w.description or "")
+    parts.extend(s.name for s in profile.skills)
+    return Counter(tokenize("\n".join(parts)))
+
+
+@dataclass
+class TermIndex:
+    source: str = ""                     # database URL the index was built from
+    vocab: dict[str, int] = field(default_factory=dict)
+    job_ids: np.ndarray = field(default_factory=lambda: np.empty(0, np.int64))      # sorted
+    text_versions: np.ndarray = field(default_factory=lambda: np.empty(0, np.int64))  # change detection
+    doc_lengths: np.ndarray = field(default_factory=lambda: np.empty(0, np.float32))
+    rows: np.ndarray = field(default_factory=lambda: np.empty(0, np.int32))
+    terms: np.ndarray = field(default_factory=lambda: np.empty(0, np.int32))
+    counts: np.ndarray = field(default_factory=lambda: np.empty(0, np.float32))
+
+    @classmethod
+    def load(cls, path: Path = INDEX_PATH) -> "TermIndex":
+        if not path.exists():
+            return cls()
+        with np.load(path) as data:
+            if "text_versions" not in data.files:   # written before text_version existed
+                return cls()
+            return cls(
+                source=str(data["source"]),
+                vocab={term: i for i, term in enumerate(data["vocab"].tolist())},
+                job_ids=data["job_ids"],
+                text_versions=data["text_versions"],
+                doc_lengths=data["doc_lengths"],
+                rows=data["rows"],
+                terms=data["terms"],
+                counts=data["counts"],
+            )
+
+    def save(self, path: Path = INDEX_PATH) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp,
+            source=np.array(self.source),
+            vocab=np.array(list(self.vocab), dtype=str),
+            job_ids=self.job_ids,
+            text_versions=self.text_versions,
+            doc_lengths=self.doc_lengths,
+            rows=self.rows,
+            terms=self.terms,
+            counts=self.counts,
+        )
+        os.replace(tmp, path)
+
+    def _keep(self, keep: np.ndarray) -> None:
+        """Drop the jobs where keep is False, renumbering the remaining matrix rows."""
+        new_row = np.cumsum(keep, dtype=np.int64) - 1
+        entry_mask = keep[self.rows]
+        self.rows = new_row[self.rows[entry_mask]].astype(np.int32)
+        self.terms = self.terms[entry_mask]
+        self.counts = self.counts[entry_mask]
+        self.job_ids = self.job_ids[keep]
+        self.text_versions = self.text_versions[keep]
+        self.doc_lengths = self.doc_lengths[keep]
+
+    def _append(self, docs: list[tuple[int, int, list[str]]]) -> None:
+        """Add (job_id, text_version, tokens) documents, then restore job_id order."""
+        offset = len(self.job_ids)
+        rows, terms, counts = [], [], []
+        for i, (_, _, tokens) in enumerate(docs):
+            for term, count in Counter(tokens).items():
+                rows.append(offset + i)
+                terms.append(self.vocab.setdefault(term, len(self.vocab)))
+                counts.append(count)
+        self.rows = np.concatenate([self.rows, np.array(rows, np.int32)])
+        self.terms = np.concatenate([self.terms, np.array(terms, np.int32)])
+        self.counts = np.concatenate([self.counts, np.array(counts, np.float32)])
+        self.job_ids = np.concatenate([self.job_ids, np.array([d[0] for d in docs], np.int64)])
+        self.text_versions = np.concatenate([self.text_versions, np.array([d[1] for d in docs], np.int64)])
+        self.doc_lengths = np.concatenate([self.doc_lengths, np.array([len(d[2]) for d in docs], np.float32)])
+
+        order = np.argsort(self.job_ids, kind="stable")
+        position = np.empty_like(order)
+        position[order] = np.arange(len(order))
+        self.rows = position[self.rows].astype(np.int32)
+        self.job_ids = self.job_ids[order]
+        self.text_versions = self.text_versions[order]
+        self.doc_lengths = self.doc_lengths[order]
+
+
+def refresh_index(session, index: TermIndex) -> tuple[TermIndex, int]:
+    """
+    Bring index in line with the jobs table. Returns the index and how many jobs were
+    added, re-tokenized or removed. Unchanged jobs are recognised by id and text_version;
+    an index built from another database is discarded.
+    """
+    source = str(session.get_bind().url)
+    if index.source != source:
+        index = TermIndex(source=source)
+
+    current = session.execute(select(Job.id, Job.text_version).order_by(Job.id)).all()
+    ids = np.array([r[0] for r in current], np.int64)
+    versions = np.array([r[1] for r in current], np.int64)
+
+    # Old rows survive only if the job still exists with the same text version.
+    pos = np.searchsorted(ids, index.job_ids)
+    found = pos < len(ids)
+    found[found] = ids[pos[found]] == index.job_ids[found]
+    found[found] = versions[pos[found]] == index.text_versions[found]
+    removed = int((~np.isin(index.job_ids, ids)).sum())
+    if not found.all():
+        index._keep(found)
+
+    stale = ids[~np.isin(ids, index.job_ids)].tolist()
+    for start in range(0, len(stale), FETCH_CHUNK):
+        chunk = stale[start:start + FETCH_CHUNK]
+        docs = [
+            (job_id, version, tokenize(f"{title}\n{description}"))
+            for job_id, version, title, description in session.execute(
+                select(Job.id, Job.text_version, Job.title, Job.description).where(Job.id.in_(chunk))
+            )
+        ]
+        index._append(docs)
+    return index, removed + len(stale)
+
+
+@dataclass
+class RankResult:
+    job_ids: np.ndarray          # best match first
+    scores: np.ndarray
+    matched: dict[int, list[str]]  # job id -> strongest matching terms, for the returned top rows
+    changed: int                 # jobs added to, updated in or removed from the index this run
+    elapsed: float               # seconds spent scoring (excluding index refresh)
+
+
+def term_weights(index: TermIndex, query: Counter) -> np.ndarray:
+    """Query weight times BM25 idf for every vocabulary term (zero for terms not in query)."""
+    weights = np.zeros(len(index.vocab), np.float32)
+    for term, count in query.items():
+        term_id = index.vocab.get(term)
+        if term_id is not None:
+            weights[term_id] = 1.0 + math.log(count)
+    n_docs = len(index.job_ids)
+    doc_freq = np.bincount(index.terms, minlength=len(index.vocab)).astype(np.float32)
+    return weights * np.log1p((n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+
+
+def _contributions(index: TermIndex, weights: np.ndarray, entries: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(rows, terms, BM25 contribution) for the matrix entries selected by entries that match the query."""
+    entry_weight = weights[index.terms[entries]]
+    hit = entry_weight > 0
+    rows = index.rows[entries][hit]
+    terms = index.terms[entries][hit]
+    tf = index.counts[entries][hit]
+    norm = K1 * (1 - B + B * index.doc_lengths[rows] / index.doc_lengths.mean())
+    return rows, terms, entry_weight[hit] * tf * (K1 + 1) / (tf + norm)
+
+
+def score(index: TermIndex, weights: np.ndarray) -> np.ndarray:
+    """BM25 score of every indexed job, in one pass over the matrix entries."""
+    n_docs = len(index.job_ids)
+    if not n_docs or not weights.any():
+        return np.zeros(n_docs, np.float32)
+    rows, _, values = _contributions(index, weights, slice(None))
+    return np.bincount(rows, weights=values, minlength=n_docs)
+
+
+def _matched_terms(index: TermIndex, weights: np.ndarray, rows: np.ndarray, per_job: int) -> dict[int, list[str]]:
+    """The per_job terms contributing most to each of the given rows' scores."""
+    terms_by_id = list(index.vocab)
+    matched: dict[int, list[tuple[float, str]]] = {}
+    for row, term_id, value in zip(*_contributions(index, weights, np.isin(index.rows, rows))):
+        matched.setdefault(int(index.job_ids[row]), []).append((float(value), terms_by_id[term_id]))
+    return {job_id: [t for _, t in sorted(pairs, reverse=True)[:per_job]] for job_id, pairs in matched.items()}
+
+
+def rank_jobs(session, profile: Profile, top: int = 0, exclude_ids=(), terms_per_job: int = 5) -> RankResult:
+    """Rank all stored jobs against profile, best first. top=0 returns every job."""
+    index, changed = refresh_index(session, TermIndex.load(INDEX_PATH))
+    if changed or not INDEX_PATH.exists():
+        index.save(INDEX_PATH)
+
+    start = time.perf_counter()
+    weights = term_weights(index, profile_terms(profile))
+    scores = score(index, weights)
+    candidates = np.arange(len(index.job_ids))
+    if len(exclude_ids):
+        candidates = candidates[~np.isin(index.job_ids, np.fromiter(exclude_ids, np.int64))]
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    if top:
+        order = order[:top]
+    elapsed = time.perf_counter() - start
+
+    return RankResult(
+        job_ids=index.job_ids[order],
+        scores=scores[order],
+        matched=_matched_terms(index, weights, order[:EXPLAIN_ROWS], terms_per_job),
+        changed=changed,
+        elapsed=elapsed,
+    )
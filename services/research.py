@@ -1,57 +1,382 @@
 """
 Uses Claude's built-in web search to research a company for a job application.
-Claude searches the web autonomously and returns a structured summary.
+
+Research happens at two levels. The web-search pass is per company: it is stored in
+CompanyResearch under a normalized company key and reused by every job at that
+company until it is older than the TTL. The role-specific pass is a short call without
+web search that relates the company research to one job description.
+
+research_job handles one job synchronously. research_jobs runs many jobs concurrently
+on one AsyncAnthropic client and commits each job's research as soon as it is done,
+from a worker thread so the event loop never waits on the database.
 """
+import asyncio
 import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 
 import anthropic
 from dotenv import load_dotenv
 
-from models import Job
+from core.db import get_session
+from models import CompanyResearch, Job, Research, company_key
+from services.cache import get_cache
+from services.call_log import get_call_log
+from services.scheduler import get_scheduler
+from services.tracing import span
 
 load_dotenv()
 
+MODEL = "claude-sonnet-4-6"
+RESEARCH_TTL = timedelta(days=int(os.getenv("JOBB_RESEARCH_TTL_DAYS", "30")))
 
-def research_company(job: Job) -> str:
-    """
-    Ask Claude to research the company using its built-in web search tool.
-    Returns a structured summary string to be stored in Research.summary.
-    """
+# What research_job did for a job.
+REUSED = "reused"    # job already had notes built on fresh company research: no API call
+ROLE_ONLY = "role"   # fresh company research reused, only the role-specific notes were written
+FULL = "full"        # company research (re)run with web search, then role notes
+
+
+def _api_key() -> str:
     api_key = os.getenv("ANTHROPIC_API_KEY")
     if not api_key:
         raise RuntimeError("ANTHROPIC_API_KEY not set in .env")
+    return api_key
+
+
+def _response_text(response) -> str:
+    # Extract the final text response — skip server_tool_use and web_search_tool_result blocks
+    text_parts = [block.text for block in response.content if block.type == "text"]
+    return "\n\n".join(text_parts).strip()
+
+
+def _stage(request: dict) -> str:
+    """Call log stage: the web-search company call, or the role notes."""
+    return "research" if request.get("tools") else "role_notes"
+
+
+def _cached_call(request: dict, use_cache: bool, on_text=None, job_id: int | None = None) -> str:
+    """Send request (streaming text deltas to on_text, if given) unless it is cached."""
+    stage = _stage(request)
+    with span(f"llm: {stage}", model=request["model"]) as s:
+        cache = get_cache() if use_cache else None
+        cached = cache.get(request) if cache else None
+        if cached is not None:
+            s.attrs["cached"] = True
+            if on_text:
+                on_text(cached)
+            return cached
+
+        client = anthropic.Anthropic(api_key=_api_key(), max_retries=0)
+
+        def stream_once():
+            started = time.perf_counter()
+            s.attrs.pop("ttft_ms", None)
+            with client.messages.stream(**request) as stream:
+                for delta in stream.text_stream:
+                    s.attrs.setdefault("ttft_ms", round((time.perf_counter() - started) * 1000))
+                    if on_text:
+                        on_text(delta)
+                message = stream.get_final_message()
+            get_call_log().record(
+                stage, request["model"], message.usage, latency_ms=(time.perf_counter() - started) * 1000,
+                ttft_ms=s.attrs.get("ttft_ms"), job_id=job_id,
+            )
+            return message
 
-    client = anthropic.Anthropic(api_key=api_key)
+        response = get_scheduler().call(request, stream_once)
+        s.attrs["output_tokens"] = response.usage.output_tokens
+        text = _response_text(response)
+        if cache:
+            cache.set(request, text)
+        return text
 
-    job_context = f"Job title: {job.title}\n"
-    if job.description:
-        job_context += f"\nJob description excerpt:\n{job.description[:800]}"
 
-    prompt = f"""Research the company "{job.company}" for a job applicant who is applying for the role of {job.title}.
+async def _cached_call_async(
+    client: anthropic.AsyncAnthropic, request: dict, use_cache: bool, job_id: int | None = None,
+) -> str:
+    stage = _stage(request)
+    with span(f"llm: {stage}", model=request["model"]) as s:
+        cache = get_cache() if use_cache else None
+        cached = cache.get(request) if cache else None
+        if cached is not None:
+            s.attrs["cached"] = True
+            return cached
 
-{job_context}
+        async def create():
+            started = time.perf_counter()
+            message = await client.messages.create(**request)
+            get_call_log().record(
+                stage, request["model"], message.usage, latency_ms=(time.perf_counter() - started) * 1000,
+                job_id=job_id,
+            )
+            return message
+
+        response = await get_scheduler().call_async(request, create)
+        s.attrs["output_tokens"] = response.usage.output_tokens
+        text = _response_text(response)
+        if cache:
+            cache.set(request, text)
+        return text
+
+
+def company_request(company: str) -> dict:
+    """messages.create body for the company-level web-search research."""
+    prompt = f"""Research the company "{company}" for a job applicant.
 
 Search for and gather:
 1. What the company does — products, services, industry, size, customers
 2. Company culture, values, and work environment
 3. Recent news or developments (last 12 months)
-4. Technology stack or tools they use (if relevant to this role)
+4. Technology stack or tools they use
 5. Reputation as an employer — Glassdoor ratings or employee sentiment if available
 6. Key leadership, notable projects, or recent milestones
 
-Then write a structured research summary with clear sections. Be specific and factual — only include what you found. This summary will be used when writing a tailored CV and cover letter for this job application."""
+Then write a structured research summary with clear sections. Be specific and factual — only include what you found. This summary will be reused for every role the applicant applies to at this company, so keep it about the company rather than any one position."""
 
-    response = client.messages.create(
-        model="claude-sonnet-4-6",
-        max_tokens=4096,
-        tools=[{
+    return {
+        "model": MODEL,
+        "max_tokens": 4096,
+        "tools": [{
             "type": "web_search_20250305",
             "name": "web_search",
             "max_uses": 5,
         }],
-        messages=[{"role": "user", "content": prompt}],
+        "messages": [{"role": "user", "content": prompt}],
+    }
+
+
+def role_request(company: str, title: str, description: str, company_summary: str) -> dict:
+    """messages.create body for the role-specific notes. No web search."""
+    prompt = f"""Below is research about the company "{company}" and a job posting there for the role of {title}.
+
+## Company Research
+{company_summary}
+
+## Job Description
+{description[:4000]}
+
+Write short role-specific notes for the applicant (at most ~200 words): which of the company's products, teams, technologies and values matter most for this role, and what the CV and cover letter should emphasize. Only use facts from the research and the job description."""
+
+    return {
+        "model": MODEL,
+        "max_tokens": 1024,
+        "messages": [{"role": "user", "content": prompt}],
+    }
+
+
+def research_company(company: str, use_cache: bool = True, on_text=None, job_id: int | None = None) -> str:
+    """
+    Ask Claude to research the company using its built-in web search tool.
+    Returns a structured summary string to be stored in CompanyResearch.summary.
+    job_id, if given, is the job the research was run for (for the call log).
+    """
+    return _cached_call(company_request(company), use_cache, on_text, job_id)
+
+
+def research_role(job: Job, company_summary: str, use_cache: bool = True, on_text=None) -> str:
+    """Relate existing company research to one job posting."""
+    request = role_request(job.company, job.title, job.description, company_summary)
+    return _cached_call(request, use_cache, on_text, job.id)
+
+
+def _now() -> datetime:
+    # Timestamps are stored as naive UTC.
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def is_fresh(company: CompanyResearch, ttl: timedelta = RESEARCH_TTL) -> bool:
+    return company.researched_at >= _now() - ttl
+
+
+def _is_current(record: Research | None, company: CompanyResearch | None) -> bool:
+    """True if record's notes were written from company research that is still fresh."""
+    return (
+        company is not None and is_fresh(company)
+        and record is not None and bool(record.summary)
+        and record.company_research_id == company.id and record.scraped_at >= company.researched_at
     )
 
-    # Extract the final text response — skip server_tool_use and web_search_tool_result blocks
-    text_parts = [block.text for block in response.content if block.type == "text"]
-    return "\n\n".join(text_parts).strip()
+
+def _save_company(session, company: CompanyResearch | None, key: str, name: str, summary: str) -> CompanyResearch:
+    if company is None:
+        company = CompanyResearch(company_key=key, company=name)
+        session.add(company)
+    company.summary = summary
+    company.researched_at = _now()
+    return company
+
+
+def _save_role(session, record: Research | None, job_id: int, company: CompanyResearch, notes: str) -> Research:
+    if record is None:
+        record = Research(job_id=job_id)
+        session.add(record)
+    record.company_research = company
+    record.role_notes = notes
+    record.summary = f"{company.summary}\n\n## Role-specific notes\n{notes}"
+    record.scraped_at = _now()
+    return record
+
+
+def research_job(
+    session, job: Job, refresh: bool = False, use_cache: bool = True, on_step=None, on_text=None,
+) -> tuple[Research, str]:
+    """
+    Bring job's Research up to date and return it with what was done (REUSED, ROLE_ONLY
+    or FULL). Company research is only re-run when missing, older than RESEARCH_TTL, or
+    refresh is set. on_step(description) is called before each API call and on_text(delta)
+    with the response text as it streams in. Does not commit.
+    """
+    key = company_key(job.company)
+    with span("db: load research"):
+        company = session.query(CompanyResearch).filter_by(company_key=key).first()
+        record = session.query(Research).filter_by(job_id=job.id).first()
+    if not refresh and _is_current(record, company):
+        return record, REUSED
+
+    outcome = ROLE_ONLY
+    if refresh or company is None or not is_fresh(company):
+        if on_step:
+            on_step(f"Researching {job.company} with web search...")
+        summary = research_company(job.company, use_cache=use_cache and not refresh, on_text=on_text, job_id=job.id)
+        company = _save_company(session, company, key, job.company, summary)
+        outcome = FULL
+
+    if on_step:
+        on_step(f"Writing notes for {job.title}...")
+    notes = research_role(job, company.summary, use_cache=use_cache, on_text=on_text)
+    return _save_role(session, record, job.id, company, notes), outcome
+
+
+@dataclass
+class _JobInfo:
+    id: int
+    company: str
+    title: str
+    description: str
+    key: str
+    current: bool            # research already up to date
+    company_summary: str | None  # fresh stored company research, if any
+
+
+def _load_jobs(job_ids: list[int], refresh: bool) -> tuple[list[_JobInfo], list[int]]:
+    """Snapshot what the async workers need, so no session stays open across API calls."""
+    with get_session() as session:
+        jobs = session.query(Job).filter(Job.id.in_(job_ids)).all()
+        by_key = {
+            c.company_key: c
+            for c in session.query(CompanyResearch).filter(
+                CompanyResearch.company_key.in_({company_key(j.company) for j in jobs})
+            )
+        }
+        records = {r.job_id: r for r in session.query(Research).filter(Research.job_id.in_(job_ids))}
+
+        order = {job_id: i for i, job_id in enumerate(job_ids)}
+        infos = []
+        for job in sorted(jobs, key=lambda j: order[j.id]):
+            key = company_key(job.company)
+            company = by_key.get(key)
+            fresh = company is not None and is_fresh(company) and not refresh
+            infos.append(_JobInfo(
+                id=job.id, company=job.company, title=job.title, description=job.description, key=key,
+                current=not refresh and _is_current(records.get(job.id), company),
+                company_summary=company.summary if fresh else None,
+            ))
+    missing = sorted(set(job_ids) - {i.id for i in infos})
+    return infos, missing
+
+
+def _store_company(key: str, name: str, summary: str) -> None:
+    """Save and commit company research in a session of its own (called off the event loop)."""
+    with get_session() as session:
+        company = session.query(CompanyResearch).filter_by(company_key=key).first()
+        _save_company(session, company, key, name, summary)
+        session.commit()
+
+
+def _store_role(job_id: int, key: str, notes: str) -> None:
+    """Save and commit a job's role notes in a session of its own (called off the event loop)."""
+    with get_session() as session:
+        company = session.query(CompanyResearch).filter_by(company_key=key).one()
+        record = session.query(Research).filter_by(job_id=job_id).first()
+        _save_role(session, record, job_id, company, notes)
+        session.commit()
+
+
+async def research_jobs(
+    job_ids: list[int],
+    concurrency: int = 4,
+    refresh: bool = False,
+    use_cache: bool = True,
+    on_update=None,
+    on_done=None,
+) -> dict[int, str | Exception]:
+    """
+    Research many jobs concurrently, with at most `concurrency` API calls in flight.
+    Jobs at the same company share one web-search call. Each job's research is
+    committed as soon as it finishes, so an interrupted run keeps completed work.
+    on_update(job_id, description) reports progress and on_done(job_id, result) is
+    called once per job. Returns job id -> outcome (REUSED, ROLE_ONLY, FULL) or the
+    exception that job failed with.
+    """
+    with span("db: load jobs", jobs=len(job_ids)):
+        infos, missing = _load_jobs(job_ids, refresh)
+    results: dict[int, str | Exception] = {}
+    for job_id in missing:
+        results[job_id] = LookupError(f"Job {job_id} not found")
+        if on_done:
+            on_done(job_id, results[job_id])
+    client = anthropic.AsyncAnthropic(api_key=_api_key(), max_retries=0)
+    limit = asyncio.Semaphore(concurrency)
+    company_tasks: dict[str, asyncio.Task] = {}
+
+    def update(job_id: int, text: str) -> None:
+        if on_update:
+            on_update(job_id, text)
+
+    async def company_summary(info: _JobInfo) -> str:
+        async with limit:
+            update(info.id, f"Researching {info.company} with web search...")
+            summary = await _cached_call_async(client, company_request(info.company), use_cache and not refresh, info.id)
+        with span("db: save company research"):
+            await asyncio.to_thread(_store_company, info.key, info.company, summary)
+        return summary
+
+    async def run(info: _JobInfo) -> str:
+        if info.current:
+            update(info.id, "Up to date")
+            return REUSED
+
+        outcome = ROLE_ONLY
+        summary = info.company_summary
+        if summary is None:
+            if info.key not in company_tasks:
+                company_tasks[info.key] = asyncio.create_task(company_summary(info))
+                outcome = FULL
+            else:
+                update(info.id, f"Waiting for {info.company} research...")
+            summary = await company_tasks[info.key]
+
+        async with limit:
+            update(info.id, f"Writing notes for {info.title}...")
+            request = role_request(info.company, info.title, info.description, summary)
+            notes = await _cached_call_async(client, request, use_cache, info.id)
+        with span("db: save role notes"):
+            await asyncio.to_thread(_store_role, info.id, info.key, notes)
+        return outcome
+
+    async def guarded(info: _JobInfo) -> None:
+        try:
+            with span(f"research #{info.id}", company=info.company) as s:
+                results[info.id] = await run(info)
+                s.attrs["outcome"] = results[info.id]
+        except Exception as e:
+            results[info.id] = e
+        if on_done:
+            on_done(info.id, results[info.id])
+
+    try:
+        await asyncio.gather(*(guarded(info) for info in infos))
+    finally:
+        await client.close()
+    return results
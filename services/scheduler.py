@@ -0,0 +1,292 @@
+"""
+Rate-limit-aware scheduling for every Anthropic call.
+
+Before a request is sent, the scheduler takes tokens from three buckets that refill
+continuously: requests per minute, input tokens per minute and output tokens per
+minute. Input tokens are estimated from the request size and output tokens reserved
+at max_tokens (as the API itself does); both are corrected from the response's usage.
+Bucket state lives in a small SQLite file under data/cache/, so several jobb commands
+running at once share one budget.
+
+Failed calls are retried with jittered exponential backoff. A retry-after header on a
+429 pauses every process until it has passed.
+
+Calls have a priority lane. Background calls, such as batch apply and research --all,
+may only draw each bucket down to BACKGROUND_RESERVE of its capacity. The rest is
+left for interactive calls, so a single `jobb apply` is never starved.
+"""
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import anthropic
+
+from services.tracing import span
+
+STATE_PATH = Path(__file__).parent.parent / "data" / "cache" / "ratelimit.sqlite"
+
+# Account limits; the defaults are the entry tier for Sonnet.
+REQUESTS_PER_MINUTE = int(os.getenv("JOBB_RPM", "50"))
+INPUT_TOKENS_PER_MINUTE = int(os.getenv("JOBB_INPUT_TPM", "30000"))
+OUTPUT_TOKENS_PER_MINUTE = int(os.getenv("JOBB_OUTPUT_TPM", "8000"))
+
+INTERACTIVE = 0
+BACKGROUND = 1
+BACKGROUND_RESERVE = 0.25   # share of each bucket that background calls leave untouched
+
+MAX_ATTEMPTS = int(os.getenv("JOBB_MAX_ATTEMPTS", "6"))
+BACKOFF_BASE = 1.0          # seconds; doubled per attempt, full jitter
+BACKOFF_MAX = 60.0
+CHARS_PER_TOKEN = 4         # rough input-size estimate, corrected after the call
+
+_RETRYABLE_STATUS = {408, 409, 429}
+_RETRYABLE_ERROR_TYPES = {"rate_limit_error", "overloaded_error", "api_error"}
+
+
+def estimate_cost(request: dict) -> dict[str, float]:
+    """Tokens a messages.create body will take from each bucket, before the call."""
+    size = len(json.dumps([request.get("system"), request.get("messages"), request.get("tools")], ensure_ascii=False))
+    return {"requests": 1, "input": size / CHARS_PER_TOKEN, "output": request.get("max_tokens", 0)}
+
+
+def _error_type(error: Exception) -> str | None:
+    body = getattr(error, "body", None)
+    if isinstance(body, dict):
+        inner = body.get("error")
+        return inner.get("type") if isinstance(inner, dict) else body.get("type")
+    return None
+
+
+def _retry_after(error: Exception) -> float | None:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, anthropic.APIConnectionError):  # includes timeouts
+        return True
+    if isinstance(error, anthropic.APIStatusError):
+        should_retry = error.response.headers.get("x-should-retry")
+        if should_retry in ("true", "false"):
+            return should_retry == "true"
+        return (
+            error.status_code in _RETRYABLE_STATUS or error.status_code >= 500
+            or _error_type(error) in _RETRYABLE_ERROR_TYPES
+        )
+    return False
+
+
+def _usage_tokens(usage) -> tuple[float, float] | None:
+    """(input, output) tokens that count against the limits; cache reads don't."""
+    if usage is None:
+        return None
+    get = usage.get if isinstance(usage, dict) else lambda name, default=0: getattr(usage, name, default)
+    input_tokens = (get("input_tokens", 0) or 0) + (get("cache_creation_input_tokens", 0) or 0)
+    return float(input_tokens), float(get("output_tokens", 0) or 0)
+
+
+class Scheduler:
+    def __init__(
+        self,
+        path: Path = STATE_PATH,
+        requests_per_minute: int = REQUESTS_PER_MINUTE,
+        input_tokens_per_minute: int = INPUT_TOKENS_PER_MINUTE,
+        output_tokens_per_minute: int = OUTPUT_TOKENS_PER_MINUTE,
+    ) -> None:
+        self.path = path
+        self.capacity = {
+            "requests": float(requests_per_minute),
+            "input": float(input_tokens_per_minute),
+            "output": float(output_tokens_per_minute),
+        }
+        self.priority = INTERACTIVE
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                " name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE TABLE IF NOT EXISTS pause (id INTEGER PRIMARY KEY CHECK (id = 1), until REAL NOT NULL)")
+            self._conn = conn
+        return self._conn
+
+    def _levels(self, conn: sqlite3.Connection, now: float) -> dict[str, float]:
+        """Current bucket levels after refill. Unknown buckets start full."""
+        stored = dict(
+            (name, (tokens, updated_at))
+            for name, tokens, updated_at in conn.execute("SELECT name, tokens, updated_at FROM buckets")
+        )
+        levels = {}
+        for name, capacity in self.capacity.items():
+            tokens, updated_at = stored.get(name, (capacity, now))
+            levels[name] = min(capacity, tokens + (now - updated_at) * capacity / 60)
+        return levels
+
+    def _write(self, conn: sqlite3.Connection, levels: dict[str, float], now: float) -> None:
+        conn.executemany(
+            "INSERT INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)"
+            " ON CONFLICT(name) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+            [(name, tokens, now) for name, tokens in levels.items()],
+        )
+
+    def try_acquire(self, cost: dict[str, float], priority: int | None = None) -> float:
+        """
+        Take cost from the buckets if they can cover it. Returns 0 on success, otherwise
+        the number of seconds until they are expected to.
+        """
+        priority = self.priority if priority is None else priority
+        reserve = BACKGROUND_RESERVE if priority == BACKGROUND else 0.0
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = conn.execute("SELECT until FROM pause WHERE id = 1").fetchone()
+                if row and row[0] > now:
+                    return row[0] - now
+
+                levels = self._levels(conn, now)
+                wait = 0.0
+                for name, capacity in self.capacity.items():
+                    floor = capacity * reserve
+                    # A request larger than the usable capacity waits for a full bucket.
+                    needed = min(cost.get(name, 0), capacity - floor)
+                    if levels[name] - needed < floor:
+                        wait = max(wait, (floor + needed - levels[name]) * 60 / capacity)
+                if wait:
+                    return wait
+
+                for name in self.capacity:
+                    levels[name] -= cost.get(name, 0)
+                self._write(conn, levels, now)
+                return 0.0
+            finally:
+                conn.execute("COMMIT")
+
+    def settle(self, cost: dict[str, float], usage) -> None:
+        """Correct the input/output reservation once real usage is known (None = failed call)."""
+        actual = _usage_tokens(usage)
+        actual_input, actual_output = actual if actual else (0.0, 0.0)
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                levels = self._levels(conn, now)
+                levels["input"] += cost.get("input", 0) - actual_input
+                levels["output"] += cost.get("output", 0) - actual_output
+                for name, capacity in self.capacity.items():
+                    levels[name] = min(capacity, levels[name])
+                self._write(conn, levels, now)
+            finally:
+                conn.execute("COMMIT")
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller, in every process, for the given time (from a retry-after header)."""
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT INTO pause (id, until) VALUES (1, ?)"
+                " ON CONFLICT(id) DO UPDATE SET until = max(until, excluded.until)",
+                (time.time() + seconds,),
+            )
+
+    def retry_delay(self, error: Exception, attempt: int) -> float | None:
+        """Seconds to wait before retrying after error, or None if it should be raised."""
+        if attempt >= MAX_ATTEMPTS or not is_retryable(error):
+            return None
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            if getattr(error, "status_code", None) == 429:
+                self.pause(retry_after)
+            return retry_after + random.uniform(0, 1)
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1)))
+
+    def call(self, request: dict, fn, usage=lambda result: getattr(result, "usage", None), priority: int | None = None):
+        """
+        Run fn() (which sends request) once the rate limits allow it, retrying transient
+        failures. usage(result) extracts the response usage to correct the reservation.
+        """
+        cost = estimate_cost(request)
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            if (wait := self.try_acquire(cost, priority)) > 0:
+                with span("rate-limit wait"):
+                    while wait > 0:
+                        time.sleep(min(wait, 5.0) + random.uniform(0, 0.05))
+                        wait = self.try_acquire(cost, priority)
+            try:
+                result = fn()
+            except Exception as e:
+                self.settle(cost, None)
+                delay = self.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                with span("retry backoff", attempt=attempt, error=type(e).__name__):
+                    time.sleep(delay)
+                continue
+            self.settle(cost, usage(result))
+            return result
+
+    async def call_async(self, request: dict, fn, usage=lambda result: getattr(result, "usage", None), priority: int | None = None):
+        """
+        Async counterpart of call: fn() returns an awaitable. The bucket updates run in a
+        worker thread, so a BEGIN IMMEDIATE waiting on another process's lock doesn't
+        hold up the other coroutines on the loop.
+        """
+        cost = estimate_cost(request)
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            if (wait := await asyncio.to_thread(self.try_acquire, cost, priority)) > 0:
+                with span("rate-limit wait"):
+                    while wait > 0:
+                        await asyncio.sleep(min(wait, 5.0) + random.uniform(0, 0.05))
+                        wait = await asyncio.to_thread(self.try_acquire, cost, priority)
+            try:
+                result = await fn()
+            except Exception as e:
+                await asyncio.to_thread(self.settle, cost, None)
+                delay = await asyncio.to_thread(self.retry_delay, e, attempt)
+                if delay is None:
+                    raise
+                with span("retry backoff", attempt=attempt, error=type(e).__name__):
+                    await asyncio.sleep(delay)
+                continue
+            await asyncio.to_thread(self.settle, cost, usage(result))
+            return result
+
+
+_scheduler: Scheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> Scheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = Scheduler()
+        return _scheduler
+
+
+def set_priority(priority: int) -> None:
+    """Set the lane for this process's calls (INTERACTIVE or BACKGROUND)."""
+    get_scheduler().priority = priority
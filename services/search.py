@@ -0,0 +1,108 @@
+"""
+Full-text search over jobs, research summaries and generated documents.
+
+Backed by the FTS5 indexes created in migration 84c846cf879b (jobs_fts,
+research_fts, documents_fts), which triggers keep in sync with their source tables.
+Since fb2a7c58c52d they read their text through views that decompress it (jobb_text()).
+Results from all sources are ranked together by bm25 and come with a highlighted
+snippet, so nothing has to be loaded into Python to find a match.
+"""
+import re
+from dataclasses import dataclass
+
+from sqlalchemy import text
+
+SOURCES = ("jobs", "research", "documents")
+
+# Sentinels wrapped around matches by snippet(); the caller turns them into markup.
+HIGHLIGHT_START = "\x02"
+HIGHLIGHT_END = "\x03"
+
+_SNIPPET = f"'{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '…', 16"
+
+# Per source: rank all matches by bm25 in the FTS index, keep the top :limit rowids,
+# and only then join the source rows and build snippets for those few.
+_SOURCE_QUERY = """
+    SELECT {columns},
+           snippet({fts}, {snippet_column}, {snippet}) AS snippet,
+           {bm25} AS rank
+    FROM {fts} {joins}
+    WHERE {fts} MATCH :query
+      AND {fts}.rowid IN (SELECT rowid FROM {fts} WHERE {fts} MATCH :query ORDER BY {bm25} LIMIT :limit)
+"""
+
+_QUERIES = {
+    # bm25 weights: a hit in the title counts more than one in the description
+    "jobs": _SOURCE_QUERY.format(
+        fts="jobs_fts",
+        columns="'job' AS source, j.id AS job_id, j.id AS row_id, j.company, j.title, NULL AS detail",
+        joins="JOIN jobs j ON j.id = jobs_fts.rowid",
+        snippet_column=-1,
+        snippet=_SNIPPET,
+        bm25="bm25(jobs_fts, 5.0, 3.0, 1.0)",
+    ),
+    "research": _SOURCE_QUERY.format(
+        fts="research_fts",
+        columns="'research' AS source, j.id AS job_id, r.id AS row_id, j.company, j.title, NULL AS detail",
+        joins="JOIN research r ON r.id = research_fts.rowid JOIN jobs j ON j.id = r.job_id",
+        snippet_column=0,
+        snippet=_SNIPPET,
+        bm25="bm25(research_fts)",
+    ),
+    "documents": _SOURCE_QUERY.format(
+        fts="documents_fts",
+        columns="'document' AS source, j.id AS job_id, d.id AS row_id, j.company, j.title, d.type AS detail",
+        joins=(
+            "JOIN documents d ON d.id = documents_fts.rowid "
+            "JOIN applications a ON a.id = d.application_id "
+            "JOIN jobs j ON j.id = a.job_id"
+        ),
+        snippet_column=0,
+        snippet=_SNIPPET,
+        bm25="bm25(documents_fts)",
+    ),
+}
+
+
+@dataclass
+class SearchHit:
+    source: str            # "job", "research" or "document"
+    job_id: int
+    row_id: int
+    company: str
+    title: str
+    detail: str | None     # document type for documents
+    snippet: str
+    rank: float            # bm25, lower is better
+
+
+def to_match_expression(query: str) -> str:
+    """
+    Turn free text into an FTS5 expression: every word must match, words are quoted so
+    punctuation like C++ or node.js can't break the syntax, and a trailing * keeps
+    prefix matching (kube*).
+    """
+    terms = []
+    for word in query.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*").replace('"', '""')
+        if word:
+            terms.append(f'"{word}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def search(session, query: str, sources=SOURCES, limit: int = 20, raw: bool = False) -> list[SearchHit]:
+    """Ranked hits across the requested sources. raw=True passes query through as FTS5 syntax."""
+    match = query if raw else to_match_expression(query)
+    if not match:
+        return []
+    union = " UNION ALL ".join(_QUERIES[s] for s in sources)
+    rows = session.execute(
+        text(f"SELECT * FROM ({union}) ORDER BY rank LIMIT :limit"),
+        {"query": match, "limit": limit},
+    )
+    return [SearchHit(**row._mapping) for row in rows]
+
+
+def collapse_whitespace(snippet: str) -> str:
+    return re.sub(r"\s+", " ", snippet).strip()
@@ -0,0 +1,148 @@
+"""
+Lightweight span timing for the apply and research pipelines.
+
+Code marks a stage with `with span("llm: cv", model=MODEL) as s:` and may add details
+to s.attrs while it runs. Nothing is recorded unless a trace is active (see tracing()),
+so instrumented code only pays for creating a small object when profiling is off.
+
+Spans from every thread of the process land in the same trace. The enclosing span is
+tracked with contextvars, so work that carries its caller's context (asyncio tasks, the
+PDF renderer thread, the cover letter worker) is nested under the span that started it.
+"""
+import contextvars
+import json
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+@dataclass
+class Span:
+    name: str
+    start: float                 # seconds since the trace started
+    thread: str
+    id: int = 0
+    parent_id: int | None = None
+    depth: int = 0
+    end: float | None = None
+    attrs: dict = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else self.start) - self.start
+
+
+class Trace:
+    def __init__(self, command: str) -> None:
+        self.command = command
+        self.started_at = datetime.now(timezone.utc)
+        self.spans: list[Span] = []
+        self._t0 = time.perf_counter()
+        self._end: float | None = None
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def new_id(self) -> int:
+        with self._lock:
+            self._next_id += 1
+            return self._next_id - 1
+
+    def now(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def finish(self) -> None:
+        if self._end is None:
+            self._end = self.now()
+
+    @property
+    def total(self) -> float:
+        return self._end if self._end is not None else self.now()
+
+    def ordered(self) -> list[Span]:
+        """Spans depth-first, children after their parent, siblings by start time."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        ids = {s.id for s in spans}
+        children: dict[int | None, list[Span]] = {}
+        for s in spans:
+            children.setdefault(s.parent_id if s.parent_id in ids else None, []).append(s)
+        ordered: list[Span] = []
+        stack = list(reversed(children.get(None, [])))
+        while stack:
+            s = stack.pop()
+            ordered.append(s)
+            stack.extend(reversed(children.get(s.id, [])))
+        return ordered
+
+    def to_dict(self) -> dict:
+        spans = self.ordered()
+        return {
+            "command": self.command,
+            "started_at": self.started_at.isoformat(),
+            "total_ms": round(self.total * 1000, 1),
+            "spans": [
+                {
+                    "id": s.id,
+                    "parent_id": s.parent_id,
+                    "name": s.name,
+                    "start_ms": round(s.start * 1000, 1),
+                    "duration_ms": round(s.duration * 1000, 1),
+                    "depth": s.depth,
+                    "thread": s.thread,
+                    "attrs": s.attrs,
+                }
+                for s in spans
+            ],
+        }
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2, default=str), encoding="utf-8")
+
+
+_active: Trace | None = None
+_current: contextvars.ContextVar[Span | None] = contextvars.ContextVar("current_span", default=None)
+
+
+@contextmanager
+def tracing(command: str):
+    """Record spans from the whole process into a new Trace while the block runs."""
+    global _active
+    trace = Trace(command)
+    previous, _active = _active, trace
+    try:
+        yield trace
+    finally:
+        trace.finish()
+        _active = previous
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time the enclosed block as one stage. Yields the Span so callers can add attrs."""
+    trace = _active
+    if trace is None:
+        yield Span(name, 0.0, threading.current_thread().name, attrs=attrs)
+        return
+    parent = _current.get()
+    record = Span(
+        name, trace.now(), threading.current_thread().name, id=trace.new_id(),
+        parent_id=parent.id if parent else None, depth=parent.depth + 1 if parent else 0, attrs=attrs,
+    )
+    token = _current.set(record)
+    try:
+        yield record
+    except BaseException as e:
+        record.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        _current.reset(token)
+        record.end = trace.now()
+        trace.add(record)
@@ -0,0 +1,51 @@
+"""
+Local stand-in for the Message Batches endpoints of the Anthropic client.
+
+FakeAnthropic provides client.messages.batches.create / retrieve / results with the
+attributes services.batches reads. Batches stay "in_progress" until end() is called;
+their results come from respond(custom_id, params), which returns the reply text, or
+None for a request that errored.
+"""
+import itertools
+from types import SimpleNamespace
+
+
+class FakeBatches:
+    def __init__(self, respond) -> None:
+        self.respond = respond
+        self.requests: dict[str, list[dict]] = {}
+        self.ended: set[str] = set()
+        self._ids = itertools.count(1)
+
+    def create(self, requests: list[dict]):
+        batch_id = f"msgbatch_fake_{next(self._ids)}"
+        self.requests[batch_id] = list(requests)
+        return SimpleNamespace(id=batch_id, processing_status="in_progress")
+
+    def end(self) -> None:
+        """Let every batch submitted so far finish."""
+        self.ended |= set(self.requests)
+
+    def retrieve(self, batch_id: str):
+        status = "ended" if batch_id in self.ended else "in_progress"
+        return SimpleNamespace(id=batch_id, processing_status=status)
+
+    def results(self, batch_id: str):
+        if batch_id not in self.ended:
+            raise RuntimeError(f"batch {batch_id} has not ended")
+        for request in self.requests[batch_id]:
+            text = self.respond(request["custom_id"], request["params"])
+            if text is None:
+                result = SimpleNamespace(type="errored", error="fake error")
+            else:
+                result = SimpleNamespace(type="succeeded", message=SimpleNamespace(
+                    model=request["params"]["model"],
+                    content=[SimpleNamespace(type="text", text=text)],
+                    usage=SimpleNamespace(input_tokens=100, output_tokens=50),
+                ))
+            yield SimpleNamespace(custom_id=request["custom_id"], result=result)
+
+
+class FakeAnthropic:
+    def __init__(self, respond) -> None:
+        self.messages = SimpleNamespace(batches=FakeBatches(respond))
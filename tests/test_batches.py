@@ -0,0 +1,144 @@
+"""
+End-to-end test of 'jobb apply --batch' against the fake batch endpoints: submit the
+CV batch, poll until the cover letters are in, and render, including a render that
+fails and one that is interrupted, both of which the next poll must finish.
+
+    python -m unittest tests.test_batches
+"""
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["JOBB_DB"] = str(Path(_tmp.name) / "test.sqlite")   # before core.db is imported
+
+from typer.testing import CliRunner  # noqa: E402
+
+import cli.batch  # noqa: E402
+from cli.main import app  # noqa: E402
+from core.db import engine, get_session  # noqa: E402
+from models import Application, Base, Document, GenerationBatch, Job, Profile  # noqa: E402
+from services.batches import submit_cv_batch  # noqa: E402
+from services.call_log import get_call_log  # noqa: E402
+from services.generation import CV_INSTRUCTIONS  # noqa: E402
+from tests.fake_anthropic import FakeAnthropic  # noqa: E402
+
+CV_JSON = json.dumps({"summary": "Backend developer.", "experiences": [], "skills": [], "interests": ""})
+
+
+def respond(custom_id: str, params: dict) -> str | None:
+    if custom_id == "job-3":
+        return None                                     # this job's CV request errors
+    if CV_INSTRUCTIONS[:40] in json.dumps(params["system"]):
+        return CV_JSON
+    return f"Cover letter for {custom_id}."
+
+
+class BatchFlowTest(unittest.TestCase):
+    def setUp(self) -> None:
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        with get_session() as session:
+            session.add(Profile(full_name="Kari Nordmann", email="kari@example.com"))
+            for i in range(1, 4):
+                session.add(Job(id=i, company=f"Company {i}", title="Developer", description="Python.", language="EN"))
+            session.commit()
+
+        self.client = FakeAnthropic(respond)
+        self.renders: list[str] = []
+        self.render_errors: dict[str, BaseException] = {}   # company -> exception to raise once
+        self.out = Path(_tmp.name) / self.id()
+        self.out.mkdir(parents=True, exist_ok=True)
+        self._patch("get_client", lambda: self.client)
+        self._patch("render_application", self._render)
+
+    def tearDown(self) -> None:
+        get_call_log().flush()
+
+    def _patch(self, name: str, value) -> None:
+        original = getattr(cli.batch, name)
+        setattr(cli.batch, name, value)
+        self.addCleanup(setattr, cli.batch, name, original)
+
+    def _render(self, cv, cover_letter, job_title, job_company, subdir):
+        error = self.render_errors.pop(job_company, None)
+        if error is not None:
+            raise error
+        self.renders.append(job_company)
+        paths = []
+        for name in ("cv", "cover_letter"):
+            pdf = self.out / f"{subdir}-{name}.pdf"
+            pdf.write_bytes(b"%PDF")
+            paths.append((pdf, pdf.with_suffix(".html")))
+        return tuple(paths)
+
+    def _poll(self):
+        return CliRunner().invoke(app, ["batch", "poll"])
+
+    def _submit(self) -> None:
+        with get_session() as session:
+            profile = session.query(Profile).first()
+            jobs = session.query(Job).order_by(Job.id).all()
+            submit_cv_batch(self.client, session, profile, jobs)
+
+    def _state(self) -> tuple[list[tuple[str, str]], dict[int, int]]:
+        with get_session() as session:
+            batches = [(b.stage, b.status) for b in session.query(GenerationBatch).order_by(GenerationBatch.id)]
+            documents = {}
+            for job_id, in session.query(Application.job_id).join(Document, Document.application_id == Application.id):
+                documents[job_id] = documents.get(job_id, 0) + 1
+        return batches, documents
+
+    def _run_to_cover_letters(self) -> None:
+        self._submit()
+        result = self._poll()
+        self.assertIn("still in_progress", result.output)
+
+        self.client.messages.batches.end()
+        result = self._poll()
+        self.assertIn("CVs collected", result.output)
+        self.assertIn("Job 3: errored", result.output)
+        self.assertEqual(self._state()[0], [("cv", "collected"), ("cover_letter", "in_progress")])
+        self.client.messages.batches.end()
+
+    def test_submit_poll_collect(self) -> None:
+        self._run_to_cover_letters()
+
+        result = self._poll()
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(self._state(), ([("cv", "collected"), ("cover_letter", "collected")], {1: 2, 2: 2}))
+
+        result = self._poll()
+        self.assertIn("No batches waiting", result.output)
+
+    def test_failed_render_is_retried(self) -> None:
+        self._run_to_cover_letters()
+        self.render_errors["Company 2"] = RuntimeError("no browser")
+
+        result = self._poll()
+        self.assertIn("Job 2: render failed: RuntimeError: no browser", result.output)
+        self.assertEqual(self._state(), ([("cv", "collected"), ("cover_letter", "rendering")], {1: 2}))
+
+        result = self._poll()
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(self._state(), ([("cv", "collected"), ("cover_letter", "collected")], {1: 2, 2: 2}))
+        self.assertEqual(self.renders, ["Company 1", "Company 2"])
+
+    def test_interrupted_render_is_resumed(self) -> None:
+        self._run_to_cover_letters()
+        self.render_errors["Company 2"] = KeyboardInterrupt()
+
+        result = self._poll()
+        self.assertEqual(result.exit_code, 130, result.output)   # click turns Ctrl-C into Abort
+        self.assertEqual(self._state(), ([("cv", "collected"), ("cover_letter", "rendering")], {1: 2}))
+
+        result = self._poll()
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(self._state(), ([("cv", "collected"), ("cover_letter", "collected")], {1: 2, 2: 2}))
+        self.assertEqual(self.renders, ["Company 1", "Company 2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+'jobb job import' skips malformed records in the middle of a file, counting them,
+and still imports every valid record around them.
+
+    python -m unittest tests.test_importer
+"""
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["JOBB_DB"] = str(Path(_tmp.name) / "test.sqlite")   # before core.db is imported
+
+from core.db import engine, get_session  # noqa: E402
+from models import Base, Job  # noqa: E402
+from services.importer import import_jobs  # noqa: E402
+
+
+def _job(n: int, **extra) -> dict:
+    return {"company": f"Company {n}", "title": "Developer", "description": f"Python {n}.", **extra}
+
+
+class ImportTest(unittest.TestCase):
+    def setUp(self) -> None:
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        self.dir = Path(_tmp.name) / self.id()
+        self.dir.mkdir(parents=True, exist_ok=True)
+
+    def _import(self, path: Path):
+        with get_session() as session:
+            stats = import_jobs(session, path)
+        with get_session() as session:
+            companies = [c for c, in session.query(Job.company).order_by(Job.id)]
+        return stats, companies
+
+    def test_jsonl_bad_records_are_skipped(self) -> None:
+        path = self.dir / "jobs.jsonl"
+        lines = [
+            json.dumps(_job(1, notes="Apply soon")),
+            json.dumps(_job(2, notes=["not", "text"])),
+            json.dumps(_job(3, url=12345, notes=42)),
+            "{not json",
+            json.dumps([1, 2]),
+        ]
+        path.write_bytes("\n".join(lines).encode() + b'\n{"company": "\xff"}\n' + json.dumps(_job(4)).encode())
+
+        stats, companies = self._import(path)
+
+        self.assertEqual((stats.read, stats.inserted, stats.skipped), (7, 3, 4))
+        self.assertEqual(companies, ["Company 1", "Company 3", "Company 4"])
+        with get_session() as session:
+            job = session.query(Job).filter_by(company="Company 3").one()
+            self.assertEqual((job.url, job.notes), ("12345", "42"))
+
+    def test_csv_bad_row_is_skipped(self) -> None:
+        path = self.dir / "jobs.csv"
+        path.write_bytes(
+            b"company,title,description\n"
+            b"Company 1,Developer,Python.\n"
+            b"Company \xff,Developer,Python.\n"
+            b"Company 3,Developer,Python.\n"
+        )
+
+        stats, companies = self._import(path)
+
+        self.assertEqual((stats.read, stats.inserted, stats.skipped), (3, 2, 1))
+        self.assertEqual(companies, ["Company 1", "Company 3"])
+
+
+if __name__ == "__main__":
+    unittest.main()